@@ -6,7 +6,11 @@ import json
 import time
 import numpy as np
 import dsmq.client
+from myrtle.agents.tools.dtypes import dtype_policy
+from myrtle.agents.tools.snapshot_archive import SnapshotWriter
 from myrtle.config import mq_host, mq_port
+from myrtle.sensors import SparseSensors
+from myrtle.trace import TraceWriter
 
 # How long to wait in between attempts to read from the message queue.
 # For now this is hard coded.
@@ -15,6 +19,30 @@ from myrtle.config import mq_host, mq_port
 # latency increase in the world -> agent communication.
 _polling_delay = 0.001  # seconds
 
+# The fraction of the world's loop period that the agent allows itself
+# for choosing actions, before falling back to a quick answer.
+# The rest is margin for handing the actions off to the world.
+_default_deadline_fraction = 0.8
+# How quickly the running estimate of act() duration follows changes.
+_act_duration_update_rate = 0.1
+# The attributes that tie an agent to a particular run. A warm start
+# keeps its own, rather than taking them from the trained agent.
+_run_attributes = [
+    "q_action",
+    "q_reward",
+    "q_sensor",
+    "deadline",
+    "act_duration",
+    "sensors_sent_timestamp",
+    "fallback_sent",
+    "fallback_actions",
+    "n_fallbacks",
+    "rng",
+    "trace",
+    "mq",
+    "mq_initialized",
+]
+
 
 class BaseAgent:
     name = "Base agent"
@@ -30,20 +58,74 @@ class BaseAgent:
         q_action=None,
         q_reward=None,
         q_sensor=None,
+        loop_period=None,
+        deadline_fraction=_default_deadline_fraction,
+        seed=None,
+        trace_path=None,
+        dtypes="full",
     ):
         self.n_sensors = n_sensors
         self.n_actions = n_actions
         self.n_rewards = n_rewards
 
+        # The dtypes the agent keeps its arrays in, a `DtypePolicy`
+        # or the name of one, "full" or "compact".
+        # See `myrtle.agents.tools.dtypes`.
+        self.dtypes = dtype_policy(dtypes)
+
+        # Draw random numbers from the agent's own generator. If no seed
+        # is given, one is drawn from NumPy's global random state,
+        # so that `np.random.seed()` still makes runs repeatable.
+        if seed is None:
+            seed = np.random.randint(2**31)
+        self.rng = np.random.default_rng(seed)
+
+        # If there's a `trace_path`, record every step there.
+        # See `myrtle.trace`.
+        if trace_path is None:
+            self.trace = None
+        else:
+            self.trace = TraceWriter(trace_path)
+
+        # When the world runs on a wall clock, actions that arrive after
+        # the end of the loop period don't get applied in time. Give the
+        # agent a budget for each step, measured from when the world sent
+        # the sensors. `loop_period` is in seconds. If it's None,
+        # there is no deadline.
+        if loop_period is None:
+            self.deadline = None
+        else:
+            self.deadline = deadline_fraction * loop_period
+        # A running estimate of how long act() takes, in seconds.
+        self.act_duration = 0.0
+        self.sensors_sent_timestamp = 0
+        self.fallback_sent = False
+        self.fallback_actions = None
+        self.n_fallbacks = 0
+
         self.q_action = q_action
         self.q_reward = q_reward
         self.q_sensor = q_sensor
 
+        self._sensors = None
+        self._sparse_sensors = None
+        self.sensors_are_sparse = False
+
         # Initialize the mq as part of `run()` because it allows
         # process "spawn" method process forking to work, allowing
         # this code to run on macOS in addition to Linux.
         self.mq_initialized = False
 
+    def __getstate__(self):
+        # The mq client and the trace's open files can't be pickled.
+        # A copy, like one passed to another process partway through a run,
+        # connects to the mq on its own and doesn't record a trace.
+        state = self.__dict__.copy()
+        state.pop("mq", None)
+        state["mq_initialized"] = False
+        state["trace"] = None
+        return state
+
     def initialize_mq(self):
         if not self.mq_initialized:
             self.mq = dsmq.client.connect(mq_host, mq_port)
@@ -64,6 +146,7 @@ class BaseAgent:
                 self.i_step += 1
                 self.receive_sensors_timestamp = 0
                 self.send_actions_timestamp = 0
+                self.fallback_sent = False
                 step_loop_complete = False
                 # Polling loop, waiting for new inputs
                 while not (step_loop_complete or episode_complete or run_complete):
@@ -75,28 +158,243 @@ class BaseAgent:
                     # whether the agent needs to be reset or terminated.
                     episode_complete, run_complete = self.control_check()
 
-                self.choose_action()
-                self.write_agent_step()
+                self.previous_actions = self.actions
+                if self.has_split_steps():
+                    # Get the action out the door as soon as possible,
+                    # then learn from the most recent transition while
+                    # waiting on the world.
+                    self.perceive()
+                    self.check_deadline()
+                    self.timed_act(self.act)
+                    self.write_agent_step()
+                    self.learn()
+                else:
+                    # There's no telling how much of choose_action()
+                    # is perceiving, so the deadline gets checked
+                    # before any of it, with the whole of it counted as acting.
+                    self.check_deadline()
+                    self.timed_act(self.choose_action)
+                    self.write_agent_step()
+                self.record_step()
 
         self.close()
 
     def reset(self):
         self.sensors = np.zeros(self.n_sensors)
-        self.rewards = [0] * self.n_rewards
-        self.actions = np.zeros(self.n_actions)
+        self.rewards = np.zeros(self.n_rewards)
+        self.actions = self.zero_actions()
+
+    def zero_actions(self):
+        """
+        An all-zeros action array, in the agent's action dtype.
+        """
+        return np.zeros(self.n_actions, dtype=self.dtypes.actions)
+
+    def zero_values(self, shape):
+        """
+        An all-zeros array for values, curiosities, features,
+        and the like, in the agent's value dtype.
+        """
+        return np.zeros(shape, dtype=self.dtypes.values)
+
+    def zero_counts(self, shape):
+        """
+        An all-zeros array of counts, in the agent's count dtype.
+        """
+        return np.zeros(shape, dtype=self.dtypes.counts)
+
+    def warm_start(self, trained):
+        """
+        Pick up where another agent of the same kind left off, like one
+        trained offline with `myrtle.offline`. Everything it learned,
+        and its parameters, carry over. This agent keeps its own
+        connections to the world, deadline, random number generator,
+        trace, and snapshot archives.
+
+        Anything this agent runs in the background, like a structure
+        learner, gets closed before it's replaced, so its thread
+        doesn't linger.
+        """
+        for name, value in vars(trained).items():
+            if name in _run_attributes:
+                continue
+            outgoing = getattr(self, name, None)
+            if isinstance(outgoing, SnapshotWriter):
+                continue
+            if outgoing is not value and hasattr(outgoing, "close"):
+                outgoing.close()
+            setattr(self, name, value)
+
+    @property
+    def sensors(self):
+        """
+        The most recent sensor readings as a dense array.
+        If the world sent a sparse frame, the dense array only gets built
+        the first time it's asked for.
+        """
+        if self._sensors is None and self._sparse_sensors is not None:
+            self._sensors = self._sparse_sensors.to_dense()
+        return self._sensors
+
+    @sensors.setter
+    def sensors(self, sensors):
+        # Accept either a dense array or a SparseSensors frame.
+        # Whichever arrives is the original and the other view is derived
+        # from it when needed.
+        if isinstance(sensors, SparseSensors):
+            self._sensors = None
+            self._sparse_sensors = sensors
+            self.sensors_are_sparse = True
+        else:
+            self._sensors = sensors
+            self._sparse_sensors = None
+            self.sensors_are_sparse = False
+
+    @property
+    def sparse_sensors(self):
+        """
+        The most recent sensor readings as a `SparseSensors` frame,
+        listing only the non-zero sensors. Agents that only need
+        the active sensors can use this to skip work on the rest.
+        """
+        if self._sparse_sensors is None and self._sensors is not None:
+            self._sparse_sensors = SparseSensors.from_dense(self._sensors)
+        return self._sparse_sensors
+
+    def sensor_key(self):
+        """
+        The sensor readings as bytes, for agents that keep a table of states.
+        It is built from whichever form the sensors arrived in, so it
+        stays the same for a given state, as long as the world keeps
+        sending the same form.
+        """
+        if self.sensors_are_sparse:
+            return self._sparse_sensors.tobytes()
+        return self._sensors.tobytes()
+
+    def copy_sensors(self):
+        """
+        A copy of the sensor readings, in the form they arrived in.
+        Both forms have a `tobytes()` that matches `sensor_key()`.
+        """
+        if self.sensors_are_sparse:
+            return self._sparse_sensors.copy()
+        return self._sensors.copy()
 
     def choose_action(self):
+        """
+        Learn from the most recent transition and choose the next action,
+        all in one go. This is handy for testing and for running an agent
+        outside of `run()`.
+
+        An agent's work on each step is split into three parts.
+        `perceive()` turns the latest sensor readings into whatever
+        internal state the agent needs for choosing actions.
+        `act()` chooses the next set of actions.
+        `learn()` updates the agent based on the most recent transition--
+        `self.previous_actions` followed by `self.sensors` and `self.rewards`.
+        During `run()`, `learn()` is deferred until after the actions
+        have been sent to the world, keeping it off the latency-critical path.
+        Here it comes before `act()`, so that the action choice reflects
+        the most recent learning.
+
+        Extend this class and implement your own `perceive()`, `act()`,
+        and `learn()`. For agents that override `choose_action()` instead,
+        `run()` falls back to calling it before sending the actions.
+        """
+        # Before the first step there are no previous actions.
+        self.previous_actions = getattr(self, "actions", self.zero_actions())
+        self.perceive()
+        self.learn()
+        self.act()
+
+    def has_split_steps(self):
+        """
+        Agents written before acting and learning were split apart
+        only override choose_action(). They get run the old way.
+        """
+        return type(self).choose_action is BaseAgent.choose_action
+
+    def perceive(self):
+        pass
+
+    def act(self):
         # Pick a random action.
-        self.actions = np.zeros(self.n_actions)
-        i_action = np.random.choice(self.n_actions)
+        self.actions = self.zero_actions()
+        i_action = self.rng.integers(self.n_actions)
         self.actions[i_action] = 1
 
+    def learn(self):
+        pass
+
+    def timed_act(self, act):
+        """
+        Call act(), updating the running estimate of how long it takes.
+        """
+        act_start = time.time()
+        act()
+        self.act_duration += _act_duration_update_rate * (
+            time.time() - act_start - self.act_duration
+        )
+
+    def record_step(self):
+        if self.trace is not None:
+            self.trace.record(
+                self.i_episode, self.i_step, self.sensors, self.rewards, self.actions
+            )
+
+    def check_deadline(self):
+        """
+        If there isn't enough time left in this step's budget to finish
+        act(), send a fallback action to the world right away. The agent
+        still finishes its work, but the world has something sensible
+        to apply in time, rather than an all-zeros action.
+        Once a fallback has gone out, the actions the agent chooses
+        for that step are dropped, so that the world doesn't apply two
+        sets of actions. The fallback takes their place, as
+        the actions taken for that step.
+
+        This gets called between perceive() and act(). Agents with long
+        running perceive() or act() methods can also call it along the way.
+        """
+        if self.deadline is None or self.fallback_sent:
+            return
+
+        elapsed = time.time() - self.sensors_sent_timestamp
+        if elapsed + self.act_duration > self.deadline:
+            self.fallback_actions = self.fallback_action()
+            self.q_action.put(self.fallback_actions)
+            self.fallback_sent = True
+            self.n_fallbacks += 1
+
+    def time_to_spare(self):
+        """
+        How much of this step's budget is left, in seconds. Agents can use it
+        during learn() for optional extra work, like replaying
+        past experience, while they would otherwise be waiting on the world.
+        If there is no deadline, there is no time to spare.
+        """
+        if self.deadline is None:
+            return 0.0
+        return self.deadline - (time.time() - self.sensors_sent_timestamp)
+
+    def fallback_action(self):
+        """
+        A quick answer for when the agent is running late. By default,
+        repeat the previous actions. Override this with a cheap policy lookup
+        if there is a better option.
+        """
+        return self.previous_actions
+
     def read_world_step(self):
         # It's possible that there may be no sensor information available.
         # If not, just skip to the next iteration of the loop.
         sensor_success = False
         while not self.q_sensor.empty():
-            self.sensors = self.q_sensor.get_nowait()
+            # The world sends the time the sensors went out along with them.
+            # The agent may not get around to reading them until a while
+            # after they arrive, if it was still learning from the last step.
+            self.sensors, self.sensors_sent_timestamp = self.q_sensor.get_nowait()
             sensor_success = True
             self.receive_sensors_timestamp = time.time()
 
@@ -106,7 +404,11 @@ class BaseAgent:
         return sensor_success
 
     def write_agent_step(self):
-        self.q_action.put(self.actions)
+        if self.fallback_sent:
+            # The world already has the fallback for this step.
+            self.actions = self.fallback_actions
+        else:
+            self.q_action.put(self.actions)
         self.send_actions_timestamp = time.time()
 
         msg = json.dumps(
@@ -116,6 +418,7 @@ class BaseAgent:
                 "actions": self.actions.tolist(),
                 "ts_recv": int(1e6 * self.receive_sensors_timestamp),
                 "ts_send": int(1e6 * self.send_actions_timestamp),
+                "fallback": self.fallback_sent,
             }
         )
         self.mq.put("agent_step", msg)
@@ -134,12 +437,17 @@ class BaseAgent:
         return episode_complete, run_complete
 
     def close(self):
+        if self.trace is not None:
+            self.trace.close()
+
         # If mq clients have been initialized, close them down.
         try:
             self.mq.close()
         except AttributeError:
             pass
 
-        # Close down the Queue that the agent feeds
-        self.q_action.close()
-        self.q_action.cancel_join_thread()
+        # Close down the Queue that the agent feeds, if it has one.
+        # Agents run on a virtual clock don't.
+        if self.q_action is not None:
+            self.q_action.close()
+            self.q_action.cancel_join_thread()
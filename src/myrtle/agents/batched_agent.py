@@ -0,0 +1,58 @@
+"""
+Chooses a single random action at each step, independently for each
+instance of a batched world.
+"""
+
+import numpy as np
+from myrtle.agents.base_agent import BaseAgent
+
+
+class BatchedAgent(BaseAgent):
+    """
+    Extend this class to make agents for batched worlds, like
+    `BatchedPendulum`, that simulate `n_worlds` independent instances
+    in one process.
+
+    `n_sensors`, `n_actions`, and `n_rewards` are per instance.
+    Sensors, actions, and rewards all have one row per instance, for example
+    `self.sensors` is (n_worlds, n_sensors). `perceive()`, `act()`,
+    and `learn()` work on all the rows at once. Other than that, everything
+    runs just like it does for a `BaseAgent`.
+
+    `bench.run()` passes `n_worlds` along from the world.
+
+    Batched versions of the baseline agents, like `BatchedGreedyStateBlind`,
+    hold one copy of the agent for each instance, with their state stacked
+    into arrays. Their parameters can be given per instance, so that
+    one run compares several settings side by side.
+    """
+
+    name = "Batched random agent"
+
+    def __init__(self, **kwargs):
+        self.init_common(**kwargs)
+
+    def init_common(self, n_worlds=1, **kwargs):
+        super().init_common(**kwargs)
+        self.n_worlds = int(n_worlds)
+
+    def per_instance(self, value):
+        """
+        Turn a parameter, given either as a single value or as one
+        value per instance, into an array with one value per instance.
+        """
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.n_worlds,)).copy()
+
+    def reset(self):
+        self.sensors = np.zeros((self.n_worlds, self.n_sensors))
+        self.rewards = np.zeros((self.n_worlds, self.n_rewards))
+        self.actions = self.zero_actions()
+
+    def zero_actions(self):
+        return np.zeros((self.n_worlds, self.n_actions), dtype=self.dtypes.actions)
+
+    def act(self):
+        # Pick a random action for each instance.
+        i_actions = self.rng.integers(self.n_actions, size=self.n_worlds)
+        self.actions = self.zero_actions()
+        self.actions[np.arange(self.n_worlds), i_actions] = 1
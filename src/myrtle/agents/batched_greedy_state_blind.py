@@ -0,0 +1,54 @@
+"""
+Selects the action with the highest historical return, independently for
+each instance of a batched world. Doesn't look at the sensors at all.
+"""
+
+import numpy as np
+from myrtle.agents.batched_agent import BatchedAgent
+from myrtle.rewards import total_reward
+
+
+class BatchedGreedyStateBlind(BatchedAgent):
+    """
+    One copy of `GreedyStateBlind` for each instance of a batched world,
+    with their running returns and action counts stacked into
+    (n_worlds, n_actions) arrays. All the actions are chosen at once.
+
+    With an `epsilon`, each copy is a `GreedyStateBlindEpsilon` instead.
+    `epsilon` can be a single value, or one per instance,
+    like `np.linspace(0.0, 0.3, n_worlds)`.
+    """
+
+    name = "Batched Greedy State-Blind"
+
+    def __init__(self, epsilon=0.0, **kwargs):
+        self.init_common(**kwargs)
+
+        self.epsilon = self.per_instance(epsilon)
+
+    def reset(self):
+        super().reset()
+
+        # Initialize these as ones to avoid any numerical wonkery.
+        shape = (self.n_worlds, self.n_actions)
+        self.total_return = np.ones(shape, dtype=self.dtypes.values)
+        self.action_count = np.ones(shape, dtype=self.dtypes.counts)
+
+    def learn(self):
+        # Update the running total of actions taken and how much reward they generate.
+        reward = total_reward(self.rewards, axis=-1)
+        self.total_return += reward[:, np.newaxis] * self.previous_actions
+        self.action_count += self.previous_actions
+
+    def act(self):
+        # Make the most of existing experience
+        return_rate = self.total_return / self.action_count
+        i_actions = np.argmax(return_rate, axis=1)
+
+        # Explore to gain new experience
+        explore = self.rng.random(self.n_worlds) < self.epsilon
+        i_random = self.rng.integers(self.n_actions, size=self.n_worlds)
+        i_actions = np.where(explore, i_random, i_actions)
+
+        self.actions = self.zero_actions()
+        self.actions[np.arange(self.n_worlds), i_actions] = 1
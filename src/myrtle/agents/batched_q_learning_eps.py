@@ -0,0 +1,105 @@
+import numpy as np
+from myrtle.agents.batched_agent import BatchedAgent
+from myrtle.agents.tools.q_table import QTable
+from myrtle.rewards import total_reward
+
+
+class BatchedQLearningEpsilon(BatchedAgent):
+    """
+    One copy of `QLearningEpsilon` for each instance of a batched world.
+
+    `epsilon`, `discount_factor`, and `learning_rate` can each be
+    a single value, or one per instance, for comparing several settings
+    in a single run.
+
+    All the copies keep their values in one `QTable`. Each state is keyed
+    by the instance's index along with its sensor readings, so the copies
+    don't share what they learn. Finding the rows takes one dict lookup
+    per instance. Everything else, the value updates and the action choices,
+    is done for all the instances at once, with fancy indexing into
+    the table's array.
+
+    Unlike `QLearningEpsilon`, there's no replay.
+    """
+
+    name = "Batched Epsilon-Greedy Q-Learning"
+
+    def __init__(
+        self,
+        action_threshold=0.5,
+        epsilon=0.2,
+        discount_factor=0.5,
+        learning_rate=0.01,
+        **kwargs,
+    ):
+        self.init_common(**kwargs)
+
+        self.epsilon = self.per_instance(epsilon)
+        self.discount_factor = self.per_instance(discount_factor)
+        self.learning_rate = self.per_instance(learning_rate)
+
+        # Q-Learning assumes that actions are binary \in {0, 1},
+        # but just in case a world slips in fractional actions add a threshold.
+        self.action_threshold = action_threshold
+
+        self.q_values = QTable(self.n_actions, dtype=self.dtypes.values)
+
+    def reset(self):
+        super().reset()
+        self.rows = self.state_rows(self.sensors)
+        self.previous_rows = self.rows
+
+    def state_rows(self, sensors):
+        """
+        Find each instance's row in the table, adding rows for new states.
+        """
+        return np.array(
+            [self.q_values.row((i, sensors[i].tobytes())) for i in range(self.n_worlds)]
+        )
+
+    def perceive(self):
+        self.rows = self.state_rows(self.sensors)
+
+    def learn(self):
+        # Look up the values only after all the rows are found.
+        # Adding rows can reallocate the array.
+        values = self.q_values.values
+        reward = total_reward(self.rewards, axis=-1)
+
+        # Find the maximum expected value to come out of the next action.
+        max_values = np.max(values[self.rows], axis=1)
+
+        # Find the actions that were taken. There's at most one per instance.
+        # Before the first action, there are none.
+        taken = self.previous_actions > self.action_threshold
+        i_worlds = np.where(np.any(taken, axis=1))[0]
+        previous_actions = np.argmax(taken[i_worlds], axis=1)
+
+        rows = self.previous_rows[i_worlds]
+        learning_rate = self.learning_rate[i_worlds]
+        values[rows, previous_actions] = (1 - learning_rate) * values[
+            rows, previous_actions
+        ] + learning_rate * (
+            reward[i_worlds] + self.discount_factor[i_worlds] * max_values[i_worlds]
+        )
+
+        self.previous_rows = self.rows
+
+    def act(self):
+        values = self.q_values.values[self.rows]
+
+        # Make the most of existing experience.
+        # In the case where there are multiple matches for the highest value,
+        # randomly pick one of them. Scoring the tied actions with random
+        # numbers does this for all the instances at once.
+        max_values = np.max(values, axis=1, keepdims=True)
+        ties = self.rng.random(values.shape) * (values == max_values)
+        i_actions = np.argmax(ties, axis=1)
+
+        # Explore to gain new experience
+        explore = self.rng.random(self.n_worlds) < self.epsilon
+        i_random = self.rng.integers(self.n_actions, size=self.n_worlds)
+        i_actions = np.where(explore, i_random, i_actions)
+
+        self.actions = self.zero_actions()
+        self.actions[np.arange(self.n_worlds), i_actions] = 1
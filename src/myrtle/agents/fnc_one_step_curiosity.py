@@ -2,7 +2,10 @@ import os
 import numpy as np
 from cartographer.model import NaiveCartographer as Model
 from myrtle.agents.base_agent import BaseAgent
+from myrtle.agents.tools.prediction_cache import PredictionCache
+from myrtle.agents.tools.snapshot_archive import SnapshotWriter
 from myrtle.config import log_directory
+from myrtle.rewards import rewards_to_list, total_reward
 
 
 class FNCOneStepCuriosity(BaseAgent):
@@ -25,6 +28,9 @@ class FNCOneStepCuriosity(BaseAgent):
         feature_decay_rate=0.35,
         trace_decay_rate=0.3,
         reward_update_rate=0.3,
+        prediction_cache_size=0,
+        prediction_refresh_fraction=0.05,
+        prediction_resolution=0.1,
         fnc_snapshot_flag=False,
         fnc_snapshot_interval=int(1e4),
         **kwargs,
@@ -44,6 +50,16 @@ class FNCOneStepCuriosity(BaseAgent):
         # fuzzy naive cartographer.
         self.fnc_snapshot_flag = fnc_snapshot_flag
         self.fnc_snapshot_interval = fnc_snapshot_interval
+        self.fnc_snapshots = SnapshotWriter(os.path.join(log_directory, "fnc"))
+
+        # In worlds where the same features show up repeatedly,
+        # the model's predictions can be reused. Disabled when the size is 0.
+        self.prediction_cache = PredictionCache(
+            self.model,
+            max_size=prediction_cache_size,
+            refresh_fraction=prediction_refresh_fraction,
+            resolution=prediction_resolution,
+        )
 
         # A weight that affects how much influence curiosity has on the
         # agent's decision making process. It gets accumulated across all actions,
@@ -68,53 +84,122 @@ class FNCOneStepCuriosity(BaseAgent):
 
         self.action_threshold = action_threshold
 
+        # What finish_choice() needs to know about
+        # the most recent action choice.
+        self.last_choice = None
+
         # How often to report progress
         self.report_steps = int(1e4)
 
     def reset(self):
         self.sensors = np.zeros(self.n_sensors)
         self.previous_sensors = np.zeros(self.n_sensors)
-        self.actions = np.zeros(self.n_actions)
-        self.rewards = [0] * self.n_rewards
-        self.curiosities = np.zeros((self.n_sensors, self.n_actions + 2))
+        # The last actions of the previous episode haven't reached the model
+        # yet. They get passed along in the first learn() of this one.
+        self.unlearned_actions = getattr(self, "actions", None)
+        self.actions = self.zero_actions()
+        self.rewards = np.zeros(self.n_rewards)
+        self.curiosities = self.zero_values((self.n_sensors, self.n_actions + 2))
+
+    def perceive(self):
+        # Anticipate the model's feature activities. These include a decayed
+        # version of previous activities, combined with the most recent
+        # sensor values, the same way the model will calculate them
+        # when it learns from this step.
+        aged_activities = self.model.feature_activities * (
+            1 - self.model.feature_decay_rate
+        )
+        self.feature_activities = np.maximum(self.sensors, aged_activities)
+
+    def learn(self):
+        # Catch up on the bookkeeping from the last action choice
+        # in time for the next one.
+        self.finish_choice()
+
+        # The model learns about an action after the features
+        # that went into choosing it, and before the outcome.
+        # On the first step of an episode, that's the last action
+        # of the previous episode, if there was one.
+        if self.i_step > 0:
+            self.model.update_actions(self.previous_actions)
+        elif self.unlearned_actions is not None:
+            self.model.update_actions(self.unlearned_actions)
+        self.unlearned_actions = None
+        # The model marks missing rewards with None.
+        self.model.update_sensors_and_rewards(
+            self.sensors, rewards_to_list(self.rewards)
+        )
+        self.prediction_cache.update()
 
-    def choose_action(self):
-        # Update the running total of actions taken and how much reward they generate.
-        reward = 0.0
-        for reward_channel in self.rewards:
-            if reward_channel is not None:
-                reward += reward_channel
+        # Make sure to make a copy here, so that previous_sensors and sensors don't
+        # end up pointing at the same Numpy Array object.
+        self.previous_sensors = self.sensors.copy()
 
-        self.model.update_sensors_and_rewards(self.sensors, self.rewards)
+    def act(self):
+        # Update the running total of actions taken and how much reward they generate.
+        reward = total_reward(self.rewards)
 
         # Plan using one-step lookahead.
         # Choose a single action to take on this time step by looking ahead
         # to the expected immediate reward it would return, and including
         # any curiosity that would be satisfied.
-        predictions, predicted_rewards, uncertainties = self.model.predict()
+        (
+            self.predictions,
+            self.predicted_rewards,
+            uncertainties,
+        ) = self.prediction_cache.predict(sensors=self.feature_activities)
+
+        # Only a handful of sensors are active at any one time.
+        # Only the rows of the curiosity array belonging to active sensors
+        # can change, so gather those, work with them, and scatter them back.
+        # If the world sends sparse sensors, they are already listed.
+        i_active = self.sparse_sensors.indices
+        active_sensors = self.sparse_sensors.values
 
         # Calculate the curiosity associated with each action.
         # There's a small amount of intrinsic reward associated with
         # satisfying curiosity.
-        curiosities = np.max(self.curiosities * self.sensors[:, np.newaxis], axis=0)
+        # Inactive sensors contribute a zero curiosity, if there are any.
+        if i_active.size < self.curiosities.shape[0]:
+            initial = 0.0
+        else:
+            initial = None
+        curiosities = np.max(
+            self.curiosities[i_active] * active_sensors[:, np.newaxis],
+            axis=0,
+            initial=initial,
+        )
 
         # Find the most valuable action, including the influence of curiosity.
         # Ignore the "average" action from the model.
         # It will always be in the final position.
-        max_value = np.max((predicted_rewards + curiosities)[:-1])
+        max_value = np.max((self.predicted_rewards + curiosities)[:-1])
         # In the case where there are multiple matches for the highest value,
         # randomly pick one of them. This is especially useful
         # in the beginning when all the values are zero.
-        i_action = np.random.choice(
-            np.where((predicted_rewards + curiosities)[:-1] == max_value)[0]
+        i_action = self.rng.choice(
+            np.where((self.predicted_rewards + curiosities)[:-1] == max_value)[0]
         )
 
-        self.actions = np.zeros(self.n_actions)
+        self.actions = self.zero_actions()
         # If the "do nothing" has the highest expected value, then do nothing.
         if i_action < self.n_actions:
             self.actions[i_action] = 1
 
-        self.model.update_actions(self.actions)
+        # Everything else that follows from this choice waits for learn(),
+        # after the actions have gone out.
+        self.last_choice = (reward, i_active, active_sensors, uncertainties, i_action)
+
+    def finish_choice(self):
+        """
+        Do the bookkeeping that follows from the most recent action choice,
+        updating the curiosities and taking any snapshots that are due.
+        None of it affects the choice, so it's kept out of act().
+        """
+        if self.last_choice is None:
+            return
+        reward, i_active, active_sensors, uncertainties, i_action = self.last_choice
+        self.last_choice = None
 
         # Update the running estimate of the average reward.
         alpha = self.reward_scale_update_rate
@@ -125,32 +210,29 @@ class FNCOneStepCuriosity(BaseAgent):
         # Update the curiosities--increment them by the uncertainty,
         # raised to the power of the exploitation factor,
         # scaled to match the average reward.
-        self.curiosities += (
+        self.curiosities[i_active] += (
             uncertainties**self.exploitation_factor
-            * self.sensors[:, np.newaxis]
+            * active_sensors[:, np.newaxis]
             * self.curiosity_scale
             * self.reward_scale
         )
         # Reset the curiosity counter on the selected state-action pairs.
-        self.curiosities[:, i_action] *= 1.0 - self.sensors
+        self.curiosities[i_active, i_action] *= 1.0 - active_sensors
 
-        # Make sure to make a copy here, so that previous_sensors and sensors don't
-        # end up pointing at the same Numpy Array object.
-        self.previous_sensors = self.sensors.copy()
+        self.snapshot()
 
+    def snapshot(self):
         if self.fnc_snapshot_flag and self.i_step % self.fnc_snapshot_interval == 0:
-            os.makedirs(os.path.join(log_directory, "fnc"), exist_ok=True)
-
-            np.save(
-                os.path.join(log_directory, "fnc", "curiosities.npy"), self.curiosities
-            )
-            np.save(os.path.join(log_directory, "fnc", "predictions.npy"), predictions)
-            np.save(
-                os.path.join(log_directory, "fnc", "predicted_reward.npy"),
-                predicted_rewards,
-            )
-            np.save(os.path.join(log_directory, "fnc", "sensors.npy"), self.sensors)
-            np.save(
-                os.path.join(log_directory, "fnc", "previous_sensors.npy"),
-                self.previous_sensors,
+            self.fnc_snapshots.snapshot(
+                self.i_step,
+                self.i_episode,
+                curiosities=self.curiosities,
+                predictions=self.predictions,
+                predicted_reward=self.predicted_rewards,
+                sensors=self.sensors,
+                previous_sensors=self.previous_sensors,
             )
+
+    def close(self):
+        self.fnc_snapshots.close()
+        super().close()
@@ -0,0 +1,25 @@
+"""
+Serves actions from a policy exported from a trained tabular agent,
+with `myrtle.agents.tools.frozen_policy.export_policy()`.
+It doesn't explore and it doesn't learn.
+"""
+
+from myrtle.agents.base_agent import BaseAgent
+from myrtle.agents.tools.frozen_policy import FrozenPolicy
+
+
+class FrozenPolicyAgent(BaseAgent):
+    name = "Frozen policy"
+
+    def __init__(self, policy_path=None, **kwargs):
+        self.init_common(**kwargs)
+        self.policy = FrozenPolicy(policy_path)
+
+    def act(self):
+        self.actions = self.zero_actions()
+        i_action = self.policy.action(self.sensor_key())
+        if i_action is None:
+            # In a state the trained agent never saw, or one where all its
+            # actions were equally good, pick at random, as it would have.
+            i_action = self.rng.integers(self.n_actions)
+        self.actions[i_action] = 1
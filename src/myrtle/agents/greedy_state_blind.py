@@ -5,6 +5,7 @@ Doesn't look at the sensors at all when making this decision.
 
 import numpy as np
 from myrtle.agents.base_agent import BaseAgent
+from myrtle.rewards import total_reward
 
 
 class GreedyStateBlind(BaseAgent):
@@ -15,24 +16,22 @@ class GreedyStateBlind(BaseAgent):
 
     def reset(self):
         self.sensors = np.zeros(self.n_sensors)
-        self.rewards = [0] * self.n_rewards
-        self.actions = np.zeros(self.n_actions)
+        self.rewards = np.zeros(self.n_rewards)
+        self.actions = self.zero_actions()
 
         # Initialize these as ones to avoid any numerical wonkery.
-        self.total_return = np.ones(self.n_actions)
-        self.action_count = np.ones(self.n_actions)
+        self.total_return = np.ones(self.n_actions, dtype=self.dtypes.values)
+        self.action_count = np.ones(self.n_actions, dtype=self.dtypes.counts)
 
-    def choose_action(self):
+    def learn(self):
         # Update the running total of actions taken and how much reward they generate.
-        reward = 0.0
-        for reward_channel in self.rewards:
-            if reward_channel is not None:
-                reward += reward_channel
-        reward_by_action = reward * self.actions
+        reward = total_reward(self.rewards)
+        reward_by_action = reward * self.previous_actions
         self.total_return += reward_by_action
-        self.action_count += self.actions
+        self.action_count += self.previous_actions
 
-        self.actions = np.zeros(self.n_actions)
+    def act(self):
+        self.actions = self.zero_actions()
         return_rate = self.total_return / self.action_count
         i_action = np.argmax(return_rate)
         self.actions[i_action] = 1
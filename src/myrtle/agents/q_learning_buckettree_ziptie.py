@@ -1,8 +1,15 @@
 import numpy as np
 from myrtle.agents.base_agent import BaseAgent
-from myrtle.agents.tools import publish_buckettrees_info, publish_ziptie_info
+from myrtle.agents.tools.block_ziptie import BlockZiptie
+from myrtle.agents.tools.ziptie_structure import ZiptieStructureLearner
+from myrtle.agents.tools import (
+    buckettree_channel,
+    publish_buckettrees_info,
+    publish_ziptie_info,
+    ziptie_channel,
+)
+from myrtle.rewards import total_reward
 from buckettree.bucket_tree import BucketTree
-from ziptie.algo import Ziptie
 
 
 class QLearningBuckettreeZiptie(BaseAgent):
@@ -17,6 +24,9 @@ class QLearningBuckettreeZiptie(BaseAgent):
         n_features=None,
         max_buckets=100,
         ziptie_threshold=100.0,
+        ziptie_structure_interval=1,
+        ziptie_background_learning=False,
+        introspection_bytes_per_second=50_000,
         **kwargs,
     ):
         self.init_common(**kwargs)
@@ -27,26 +37,39 @@ class QLearningBuckettreeZiptie(BaseAgent):
         else:
             self.n_max_features = n_features
 
-        self.ziptie = Ziptie(
+        # Make it so that a sensor can't form features with itself.
+        # If allowed, this results in a large number
+        # of superfluous features. Each sensor's bins form a block
+        # of cables that aren't allowed to nucleate bundles together.
+        self.ziptie = BlockZiptie(
             n_cables=self.n_sensor_bins,
+            block_size=max_buckets,
             n_bundles_max=self.n_max_features,
             threshold=ziptie_threshold,
         )
-        self.ziptie_publish_frequency = 1000
+
+        # Nucleating and growing bundles can happen less often than every step,
+        # or in a background thread, to keep it off the action latency path.
+        self.ziptie_learner = ZiptieStructureLearner(
+            self.ziptie,
+            structure_interval=ziptie_structure_interval,
+            background=ziptie_background_learning,
+        )
+        # Live views of the Ziptie and BucketTrees get published only while
+        # a report is subscribed, and within a shared bandwidth budget.
+        self.ziptie_publish_frequency = 100
+        self.ziptie_channel = ziptie_channel(
+            bytes_per_second=introspection_bytes_per_second / 2
+        )
 
         self.buckettrees = []
         for i_sensor in range(self.n_sensors):
             self.buckettrees.append(BucketTree(max_buckets=max_buckets))
 
-            # Make it so that a sensor can't form features with itself.
-            # If allowed, this results in a large number
-            # of superfluous features.
-            self.ziptie.nucleation_mask[
-                i_sensor * max_buckets : (i_sensor + 1) * max_buckets,
-                i_sensor * max_buckets : (i_sensor + 1) * max_buckets,
-            ] = 0
-
         self.buckettree_publish_frequency = 100
+        self.buckettree_channel = buckettree_channel(
+            bytes_per_second=introspection_bytes_per_second / 2
+        )
 
         # A weight that affects how much influence curiosity has on the
         # agent's decision making process. It gets accumulated across all actions,
@@ -66,68 +89,42 @@ class QLearningBuckettreeZiptie(BaseAgent):
         # Because we can't hash on Numpy arrays for the dict,
         # always use features.tobytes() as the key.
         self.q_values = {
-            np.zeros(self.n_max_features).tobytes(): np.zeros(self.n_actions)
+            self.zero_values(self.n_max_features).tobytes(): self.zero_values(
+                self.n_actions
+            )
         }
 
         # Store state-action counts as a dict, too.
         self.counts = {
-            np.zeros(self.n_max_features).tobytes(): np.zeros(self.n_actions)
+            self.zero_values(self.n_max_features).tobytes(): self.zero_counts(
+                self.n_actions
+            )
         }
         # And the curiosity associated with each state-action pair as well.
         self.curiosities = {
-            np.zeros(self.n_max_features).tobytes(): np.zeros(self.n_actions)
+            self.zero_values(self.n_max_features).tobytes(): self.zero_values(
+                self.n_actions
+            )
         }
 
     def reset(self):
         self.sensors = np.zeros(self.n_sensors)
-        self.features = np.zeros(self.n_max_features)
+        self.features = self.zero_values(self.n_max_features)
         self.previous_state = self.features.tobytes()
-        self.actions = np.zeros(self.n_actions)
-        self.rewards = [0] * self.n_rewards
-
-    def choose_action(self):
-        # Update the running total of actions taken and how much reward they generate.
-        reward = 0.0
-        for reward_channel in self.rewards:
-            if reward_channel is not None:
-                reward += reward_channel
+        self.actions = self.zero_actions()
+        self.rewards = np.zeros(self.n_rewards)
 
+    def perceive(self):
         binned = []
         for i in range(self.n_sensors):
             binned.append(self.buckettrees[i].bin(self.sensors[i]))
-
-        # commented out for now
-        if False and self.i_step % self.buckettree_publish_frequency == 0:
-            publish_buckettrees_info(
-                self.buckettrees,
-                self.mq,
-                self.i_step,
-                self.i_episode,
-            )
-
         self.sensors_binned = np.concatenate(tuple(binned))
 
-        if self.ziptie.n_bundles < self.n_max_features:
-            self.ziptie.create_new_bundles()
-            self.ziptie.grow_bundles()
-
-        features = self.ziptie.update_bundles(self.sensors_binned)
-
-        # commented out for now
-        if False and self.i_step % self.ziptie_publish_frequency == 0:
-            publish_ziptie_info(
-                self.ziptie,
-                self.mq,
-                self.i_step,
-                self.i_episode,
-                self.sensors_binned.size,
-                self.n_max_features,
-            )
-
-        self.features = np.zeros(self.n_max_features)
+        features = self.ziptie_learner.step(self.sensors_binned)
+        self.features = self.zero_values(self.n_max_features)
         self.features[: features.size] = features
 
-        state = self.features.tobytes()
+        self.state = self.features.tobytes()
         # Avoid treating state as concatenated sensors + features with Q-learning.
         # Q-learning combines sensors to get state already, so that makes the
         # ziptie redundant.
@@ -135,19 +132,46 @@ class QLearningBuckettreeZiptie(BaseAgent):
         # whether ziptie is working as desired.
         # state = np.concatenate((self.sensors, self.features)).tobytes()
 
-        if state not in self.q_values:
-            self.q_values[state] = np.zeros(self.n_actions)
-            self.counts[state] = np.zeros(self.n_actions)
-            self.curiosities[state] = np.zeros(self.n_actions)
+        if self.state not in self.q_values:
+            self.q_values[self.state] = self.zero_values(self.n_actions)
+            self.counts[self.state] = self.zero_counts(self.n_actions)
+            self.curiosities[self.state] = self.zero_values(self.n_actions)
+
+    def learn(self):
+        # Update the running total of actions taken and how much reward they generate.
+        reward = total_reward(self.rewards)
+
+        # The message queue only exists once the agent is running.
+        if self.mq_initialized:
+            if self.i_step % self.buckettree_publish_frequency == 0:
+                publish_buckettrees_info(
+                    self.buckettrees,
+                    self.mq,
+                    self.buckettree_channel,
+                    self.i_step,
+                    self.i_episode,
+                )
+            if self.i_step % self.ziptie_publish_frequency == 0:
+                # The structure learner may be changing the Ziptie
+                # in the background.
+                with self.ziptie_learner.lock:
+                    publish_ziptie_info(
+                        self.ziptie,
+                        self.mq,
+                        self.ziptie_channel,
+                        self.i_step,
+                        self.i_episode,
+                    )
 
         # Find the maximum expected value to come out of the next action.
-        values = self.q_values[state]
-        max_value = np.max(values)
+        max_value = np.max(self.q_values[self.state])
 
         # Find the actions that were taken.
         # (In it's current implementation, there will never be more than one.)
         try:
-            previous_action = np.where(self.actions > self.action_threshold)[0][0]
+            previous_action = np.where(
+                self.previous_actions > self.action_threshold
+            )[0][0]
             if self.counts[self.previous_state][previous_action] == 0:
                 self.q_values[self.previous_state][previous_action] = (
                     reward + self.discount_factor * max_value
@@ -163,14 +187,18 @@ class QLearningBuckettreeZiptie(BaseAgent):
             # This is true for the first iteration.
             pass
 
+        self.previous_state = self.state
+
+    def act(self):
+        state = self.state
+        values = self.q_values[state]
+
         # Calculate the curiosity associated with each action.
         # There's a small amount of intrinsic reward associated with
         # satisfying curiosity.
         count = self.counts[state]
         uncertainty = 1 / (count + 1)
-        self.curiosities[state] = (
-            self.curiosities[state] + uncertainty * self.curiosity_scale
-        )
+        self.curiosities[state] += uncertainty * self.curiosity_scale
         curiosity = self.curiosities[state]
 
         # Find the most valuable action, including the influence of curiosity
@@ -179,16 +207,15 @@ class QLearningBuckettreeZiptie(BaseAgent):
         # In the case where there are multiple matches for the highest value,
         # randomly pick one of them. This is especially useful
         # in the beginning when all the values are zero.
-        i_action = np.random.choice(np.where((values + curiosity) == max_value)[0])
+        i_action = self.rng.choice(np.where((values + curiosity) == max_value)[0])
 
-        self.actions = np.zeros(self.n_actions)
+        self.actions = self.zero_actions()
         self.actions[i_action] = 1
 
         # Reset the curiosity counter on the selected state-action pair.
         self.curiosities[state][i_action] = 0
         self.counts[state][i_action] += 1
 
-        # Make sure to make a copy here, so that previous_sensors and sensors don't
-        # end up pointing at the same Numpy Array object.
-        # self.previous_sensors = self.sensors_and_features.copy()
-        self.previous_state = state
+    def close(self):
+        self.ziptie_learner.close()
+        super().close()
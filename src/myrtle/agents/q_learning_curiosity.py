@@ -1,8 +1,27 @@
 import numpy as np
 from myrtle.agents.base_agent import BaseAgent
+from myrtle.agents.tools.q_table import QTable
+from myrtle.agents.tools.replay_buffer import ReplayBuffer, replay_q_learning
+from myrtle.agents.tools.shared_tables import lock_rows
+from myrtle.agents.tools.tile_coder import make_tile_coder, update_tiled_q_values
+from myrtle.rewards import total_reward
 
 
 class QLearningCuriosity(BaseAgent):
+    """
+    With `tile_coding=True`, the sensors are tile coded rather than
+    used as exact keys, as in `QLearningTileCoding`. `sensor_lows`,
+    `sensor_highs`, `n_tilings`, `n_tiles`, and `n_rows` go to the
+    `TileCoder`. Replay works on exact keys, so it's skipped then.
+
+    Tile coded tables have a fixed size, so they can also be shared
+    by copies of the agent in several processes, through
+    `share_tables()`. See `myrtle.async_q`.
+    """
+
+    # The tile coded tables that share_tables() swaps for shared ones.
+    tiled_tables = ("q_values", "counts", "curiosities")
+
     name = "Q-Learning with Curiosity"
 
     def __init__(
@@ -11,6 +30,16 @@ class QLearningCuriosity(BaseAgent):
         curiosity_scale=1.0,
         discount_factor=0.5,
         learning_rate=0.01,
+        replay_capacity=10_000,
+        replay_batch_size=32,
+        max_replay_batches=100,
+        prioritized_replay=False,
+        tile_coding=False,
+        sensor_lows=None,
+        sensor_highs=None,
+        n_tilings=8,
+        n_tiles=8,
+        n_rows=4096,
         **kwargs,
     ):
         self.init_common(**kwargs)
@@ -28,45 +57,94 @@ class QLearningCuriosity(BaseAgent):
         # but just in case a world slips in fractional actions add a threshold.
         self.action_threshold = action_threshold
 
-        # Store the value table as a dictionary.
-        # Keys are sets of sensor readings.
-        # Because we can't hash on Numpy arrays for the dict,
-        # always use sensor_array.tobytes() as the key.
-        self.q_values = {np.zeros(self.n_sensors).tobytes(): np.zeros(self.n_actions)}
+        # When the world runs on a wall clock, the agent spends much of each
+        # step waiting. Keep a record of past transitions and use the spare
+        # time to replay batches of them. A `max_replay_batches` of 0 turns
+        # replay off.
+        self.replay_buffer = ReplayBuffer(
+            capacity=replay_capacity, prioritized=prioritized_replay, rng=self.rng
+        )
+        self.replay_batch_size = replay_batch_size
+        self.max_replay_batches = max_replay_batches
+        self.n_replay_batches = 0
 
-        # Store state-action counts as a dict, too.
-        self.counts = {np.zeros(self.n_sensors).tobytes(): np.zeros(self.n_actions)}
-        # And the curiosity associated with each state-action pair as well.
-        self.curiosities = {
-            np.zeros(self.n_sensors).tobytes(): np.zeros(self.n_actions)
-        }
+        if tile_coding:
+            self.tile_coder = make_tile_coder(
+                self.n_sensors,
+                sensor_lows,
+                sensor_highs,
+                n_tilings=n_tilings,
+                n_tiles=n_tiles,
+                n_rows=n_rows,
+            )
+            # Values, counts, and curiosities are all stored by row.
+            # A state's are the averages over its rows.
+            self.q_values = self.zero_values((n_rows, self.n_actions))
+            self.counts = self.zero_counts((n_rows, self.n_actions))
+            self.curiosities = self.zero_values((n_rows, self.n_actions))
+            # Set by share_tables(), when other processes learn into
+            # the same tables.
+            self.shared_tables = None
+        else:
+            self.tile_coder = None
+
+            # Store the value table as a QTable, which works like a dictionary.
+            # Keys are sets of sensor readings.
+            # Because we can't hash on Numpy arrays for the dict,
+            # always use sensor_array.tobytes() as the key.
+            self.q_values = QTable(self.n_actions, dtype=self.dtypes.values)
+            self.q_values[np.zeros(self.n_sensors).tobytes()] = np.zeros(
+                self.n_actions
+            )
+
+            # Store state-action counts as a dict, too.
+            self.counts = {
+                np.zeros(self.n_sensors).tobytes(): self.zero_counts(self.n_actions)
+            }
+            # And the curiosity associated with each state-action pair as well.
+            self.curiosities = {
+                np.zeros(self.n_sensors).tobytes(): self.zero_values(self.n_actions)
+            }
 
     def reset(self):
         self.sensors = np.zeros(self.n_sensors)
         self.previous_sensors = np.zeros(self.n_sensors)
-        self.actions = np.zeros(self.n_actions)
-        self.rewards = [0] * self.n_rewards
+        self.actions = self.zero_actions()
+        self.rewards = np.zeros(self.n_rewards)
+        if self.tile_coder is not None:
+            self.rows = self.tile_coder.encode(self.sensors)
+            self.previous_rows = self.rows
 
-    def choose_action(self):
-        # Update the running total of actions taken and how much reward they generate.
-        reward = 0.0
-        for reward_channel in self.rewards:
-            if reward_channel is not None:
-                reward += reward_channel
+    def perceive(self):
+        if self.tile_coder is not None:
+            self.rows = self.tile_coder.encode(self.sensors)
+            return
 
-        if self.sensors.tobytes() not in self.q_values:
-            self.q_values[self.sensors.tobytes()] = np.zeros(self.n_actions)
-            self.counts[self.sensors.tobytes()] = np.zeros(self.n_actions)
-            self.curiosities[self.sensors.tobytes()] = np.zeros(self.n_actions)
+        # Because we can't hash on Numpy arrays for the dicts,
+        # use the bytes of the sensors as the key.
+        self.state = self.sensor_key()
+        if self.state not in self.q_values:
+            self.q_values[self.state] = self.zero_values(self.n_actions)
+            self.counts[self.state] = self.zero_counts(self.n_actions)
+            self.curiosities[self.state] = self.zero_values(self.n_actions)
+
+    def learn(self):
+        if self.tile_coder is not None:
+            self.learn_tiled()
+            return
+
+        # Update the running total of actions taken and how much reward they generate.
+        reward = total_reward(self.rewards)
 
         # Find the maximum expected value to come out of the next action.
-        values = self.q_values[self.sensors.tobytes()]
-        max_value = np.max(values)
+        max_value = np.max(self.q_values[self.state])
 
         # Find the actions that were taken.
         # (In it's current implementation, there will never be more than one.)
         try:
-            previous_action = np.where(self.actions > self.action_threshold)[0][0]
+            previous_action = np.where(
+                self.previous_actions > self.action_threshold
+            )[0][0]
             if self.counts[self.previous_sensors.tobytes()][previous_action] == 0:
                 self.q_values[self.previous_sensors.tobytes()][previous_action] = (
                     reward + self.discount_factor * max_value
@@ -77,24 +155,121 @@ class QLearningCuriosity(BaseAgent):
                 ) * self.q_values[self.previous_sensors.tobytes()][
                     previous_action
                 ] + self.learning_rate * (reward + self.discount_factor * max_value)
+            self.replay_buffer.add(
+                self.q_values.row(self.previous_sensors.tobytes()),
+                previous_action,
+                reward,
+                self.q_values.row(self.state),
+            )
         except IndexError:
             # Catch the case where there has been no action.
             # This is true for the first iteration.
             pass
 
+        # Make sure to make a copy here, so that previous_sensors and sensors don't
+        # end up pointing at the same Numpy Array object.
+        # Keep them in the form they arrived in, so that their keys match.
+        self.previous_sensors = self.copy_sensors()
+
+        self.replay()
+
+    def learn_tiled(self):
+        reward = total_reward(self.rewards)
+        try:
+            previous_action = np.where(
+                self.previous_actions > self.action_threshold
+            )[0][0]
+            with lock_rows(self.shared_tables, self.previous_rows):
+                update_tiled_q_values(
+                    self.q_values,
+                    self.previous_rows,
+                    previous_action,
+                    self.rows,
+                    reward,
+                    self.learning_rate,
+                    self.discount_factor,
+                )
+        except IndexError:
+            # Catch the case where there has been no action.
+            # This is true for the first iteration.
+            pass
+
+        self.previous_rows = self.rows
+
+    def share_tables(self, tables):
+        """
+        Learn into `tables`, a `SharedTables` that copies of this agent
+        in other processes are learning into too, rather than into
+        this agent's own tables. Only tile coded agents can share.
+        """
+        for name in self.tiled_tables:
+            setattr(self, name, tables[name])
+        self.shared_tables = tables
+
+    def replay(self):
+        # Keep learning from past transitions until the step's time runs out.
+        if self.replay_buffer.size == 0:
+            return
+        for _ in range(self.max_replay_batches):
+            if self.time_to_spare() <= 0:
+                break
+            replay_q_learning(
+                self.replay_buffer,
+                self.q_values,
+                self.replay_batch_size,
+                self.learning_rate,
+                self.discount_factor,
+            )
+            self.n_replay_batches += 1
+
+    def merge(self, others):
+        """
+        Combine what other copies of this agent, each trained on
+        different experience, have learned, as in
+        `myrtle.offline.train_sharded()`. Visit counts add up,
+        and curiosities get averaged, like the values.
+        """
+        if self.tile_coder is not None:
+            agents = [self] + list(others)
+            self.q_values = np.mean([agent.q_values for agent in agents], axis=0)
+            self.counts = np.sum([agent.counts for agent in agents], axis=0)
+            self.curiosities = np.mean(
+                [agent.curiosities for agent in agents], axis=0
+            )
+            return
+
+        self.q_values.merge([other.q_values for other in others])
+
+        curiosities = {}
+        for agent in [self] + list(others):
+            for state, count in agent.counts.items():
+                if state in curiosities:
+                    self.counts[state] = self.counts[state] + count
+                    curiosities[state].append(agent.curiosities[state])
+                else:
+                    self.counts[state] = count.copy()
+                    curiosities[state] = [agent.curiosities[state]]
+        self.curiosities = {
+            state: np.mean(values, axis=0) for state, values in curiosities.items()
+        }
+
+    def act(self):
+        if self.tile_coder is not None:
+            self.act_tiled()
+            return
+
+        values = self.q_values[self.state]
+
         # Calculate the curiosity associated with each action.
         # There's a small amount of intrinsic reward associated with
         # satisfying curiosity.
-        count = self.counts[self.sensors.tobytes()]
+        count = self.counts[self.state]
         # uncertainty = 1 / (np.minimum(count, 1000) ** .5 + 1)
         # uncertainty = 1 / (count ** .5 + 1)
         # uncertainty = 1 / (count**2 + 1)
         uncertainty = 1 / (count + 1)
-        self.curiosities[self.sensors.tobytes()] = (
-            self.curiosities[self.sensors.tobytes()]
-            + uncertainty * self.curiosity_scale
-        )
-        curiosity = self.curiosities[self.sensors.tobytes()]
+        self.curiosities[self.state] += uncertainty * self.curiosity_scale
+        curiosity = self.curiosities[self.state]
 
         # Find the most valuable action, including the influence of curiosity
         max_value = np.max(values + curiosity)
@@ -102,15 +277,37 @@ class QLearningCuriosity(BaseAgent):
         # In the case where there are multiple matches for the highest value,
         # randomly pick one of them. This is especially useful
         # in the beginning when all the values are zero.
-        i_action = np.random.choice(np.where((values + curiosity) == max_value)[0])
+        i_action = self.rng.choice(np.where((values + curiosity) == max_value)[0])
 
-        self.actions = np.zeros(self.n_actions)
+        self.actions = self.zero_actions()
         self.actions[i_action] = 1
 
         # Reset the curiosity counter on the selected state-action pair.
-        self.curiosities[self.sensors.tobytes()][i_action] = 0
-        self.counts[self.sensors.tobytes()][i_action] += 1
+        self.curiosities[self.state][i_action] = 0
+        self.counts[self.state][i_action] += 1
 
-        # Make sure to make a copy here, so that previous_sensors and sensors don't
-        # end up pointing at the same Numpy Array object.
-        self.previous_sensors = self.sensors.copy()
+    def act_tiled(self):
+        values = np.mean(self.q_values[self.rows], axis=0)
+
+        # Curiosities and counts are read and written back as a unit,
+        # so when the tables are shared, hold the rows for all of it.
+        with lock_rows(self.shared_tables, self.rows):
+            count = np.mean(self.counts[self.rows], axis=0)
+            uncertainty = 1 / (count + 1)
+            # Two tilings can share a row. np.add.at gives it both of their
+            # increments, where fancy indexing would keep only one.
+            np.add.at(
+                self.curiosities, self.rows, uncertainty * self.curiosity_scale
+            )
+            curiosity = np.mean(self.curiosities[self.rows], axis=0)
+
+            max_value = np.max(values + curiosity)
+            i_action = self.rng.choice(
+                np.where((values + curiosity) == max_value)[0]
+            )
+
+            self.curiosities[self.rows, i_action] = 0
+            np.add.at(self.counts, (self.rows, i_action), 1)
+
+        self.actions = self.zero_actions()
+        self.actions[i_action] = 1
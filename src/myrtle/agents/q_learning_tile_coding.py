@@ -0,0 +1,26 @@
+from myrtle.agents.q_learning_curiosity import QLearningCuriosity
+
+
+class QLearningTileCoding(QLearningCuriosity):
+    """
+    Q-Learning with curiosity, for worlds with continuous sensors.
+
+    Rather than keying a table on the exact sensor readings, which
+    in a continuous world are almost never repeated, the sensors are
+    tile coded into one row per tiling. Each state-action value is
+    the average of its rows' values, and each update nudges all of them.
+    The table has a fixed number of rows, so memory doesn't grow
+    with the number of states visited.
+
+    `sensor_lows` and `sensor_highs` set the range that the tiles cover.
+    They default to [0, 1] for each sensor. Readings outside
+    the range still work. They land in tiles further out.
+
+    This is `QLearningCuriosity` with `tile_coding=True`.
+    `QLearningEpsilon` takes the same option.
+    """
+
+    name = "Q-Learning with Curiosity and Tile Coding"
+
+    def __init__(self, **kwargs):
+        super().__init__(**({"tile_coding": True} | kwargs))
@@ -21,10 +21,10 @@ class RandomMultiAction(BaseAgent):
             np.maximum(self.n_actions, avg_actions + 1)
         )
 
-    def choose_action(self):
+    def act(self):
         # Pick whether to include each action independently
-        self.actions = np.random.choice(
+        self.actions = self.rng.choice(
             [0, 1],
             size=self.n_actions,
             p=[1 - self.action_prob, self.action_prob],
-        )
+        ).astype(self.dtypes.actions)
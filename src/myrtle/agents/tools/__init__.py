@@ -0,0 +1,9 @@
+from myrtle.agents.tools.introspection import (
+    IntrospectionChannel,
+    buckettree_channel,
+    publish_buckettrees_info,
+    publish_ziptie_info,
+    retrieve_buckettree_info,
+    retrieve_ziptie_info,
+    ziptie_channel,
+)
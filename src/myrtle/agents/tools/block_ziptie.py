@@ -0,0 +1,746 @@
+import numpy as np
+from numba import njit
+from ziptie.algo import Ziptie
+from myrtle.agents.tools.snapshot_archive import DeferredArray
+
+# The kernels release the GIL, so that a ZiptieStructureLearner
+# can run them on a background thread while the agent keeps going.
+#
+# The pair energy tables are open-addressing hash tables.
+# Their capacity is always a power of two, and it gets doubled
+# whenever one is more than half full.
+_initial_capacity = 2**12
+_max_load_factor = 0.5
+_empty_key = -1
+
+
+class BlockZiptie(Ziptie):
+    """
+    A Ziptie whose cables come in contiguous blocks of `block_size`,
+    where cables in the same block are never allowed to nucleate a bundle
+    together. This is the case when each block holds the bins of a single
+    sensor's BucketTree. A sensor that forms features with itself
+    produces a large number of superfluous features.
+
+    The stock Ziptie keeps dense (n_cables, n_cables) nucleation energy and
+    nucleation mask arrays and dense (n_bundles_max, n_cables) agglomeration
+    energy and agglomeration mask arrays, and sweeps through them on each step.
+    Here the energies are only stored for the cable-cable and bundle-cable
+    pairs that have been co-active at least once, and the masks are
+    represented by the block structure plus the pairs that have been
+    blocked explicitly. On each step only the pairs that are both active
+    and allowed get touched, so memory and time scale with the number of
+    active cables rather than the size of the dense arrays.
+
+    The bundles it creates are identical to those of a stock Ziptie
+    whose nucleation mask has the block diagonal zeroed out.
+    """
+
+    def __init__(self, n_cables=16, block_size=1, **kwargs):
+        # Ziptie.__init__() allocates the dense arrays along with everything
+        # else. Let it set up a Ziptie with no cables, so that they take
+        # no space, and then fill in the cable arrays that are still needed.
+        super().__init__(n_cables=0, **kwargs)
+        self.n_cables = n_cables
+        self.block_size = int(block_size)
+
+        self.cable_activities = np.zeros(self.n_cables)
+        self.remaining_cable_activities = np.zeros(self.n_cables)
+        self.mapping = -np.ones((self.n_bundles_max, self.n_cables), dtype=int)
+
+        # Dense copies are still available for reporting, through
+        # nucleation_energy_dense(), nucleation_mask_dense(),
+        # agglomeration_energy_dense(), and agglomeration_mask_dense().
+        self.nucleation_energy = None
+        self.nucleation_mask = None
+        self.agglomeration_energy = None
+        self.agglomeration_mask = None
+
+        # Cable pairs (i_cable_a, i_cable_b), with i_cable_a > i_cable_b.
+        # This matches the lower-triangular half of the dense array
+        # that the stock Ziptie populates.
+        self.nucleation_pairs = PairTable(self.n_cables)
+        # Bundle-cable pairs (i_bundle, i_cable).
+        self.agglomeration_pairs = PairTable(self.n_cables)
+
+        # For each cable, the other cables it has nucleated a bundle with.
+        self.blocked_partners = {}
+
+        # Whether any pair may have crossed its threshold.
+        # This saves a scan of the pair tables on most threshold checks.
+        self.nucleation_ready = False
+        self.agglomeration_ready = False
+
+    def create_new_bundles(self):
+        """
+        If the right conditions have been reached, create a new bundle.
+
+        This follows Ziptie.create_new_bundles() step for step,
+        including its use of the random number generator.
+        """
+        if self.n_bundles == self.n_bundles_max:
+            return
+
+        # Incrementally accumulate nucleation energy.
+        i_active = np.flatnonzero(self.cable_activities)
+        pairs = self.nucleation_pairs
+        pairs.reserve(i_active.size * (i_active.size - 1) // 2)
+        n_new_pairs, over_threshold = nucleation_energy_gather_sparse(
+            i_active,
+            self.cable_activities,
+            self.n_cables,
+            self.block_size,
+            self.nucleation_threshold,
+            pairs.keys,
+            pairs.energy,
+            pairs.allowed,
+            pairs.occupied,
+            pairs.n_pairs,
+        )
+        pairs.n_pairs += n_new_pairs
+        self.nucleation_ready = self.nucleation_ready or over_threshold
+
+        if np.random.sample() > self.nucleation_check_fraction:
+            return
+
+        if not self.nucleation_ready:
+            return
+
+        key = pairs.first_over_threshold(self.nucleation_threshold)
+        if key == _empty_key:
+            self.nucleation_ready = False
+            return
+
+        i_cable_a, i_cable_b = divmod(key, self.n_cables)
+        i_bundle = self.n_bundles
+        self.n_bundles += 1
+        self.n_cables_by_bundle[i_bundle] = 2
+        self.mapping[i_bundle, :2] = np.array([i_cable_a, i_cable_b], dtype=int)
+
+        # Reset the accumulated nucleation and agglomeration energy
+        # for the two cables involved.
+        pairs.clear(i_cable_a, i_cable_a)
+        pairs.clear(i_cable_b, i_cable_b)
+        self.agglomeration_pairs.clear(i_col=i_cable_a)
+        self.agglomeration_pairs.clear(i_col=i_cable_b)
+
+        # Prevent the two cables from accumulating nucleation energy
+        # in the future.
+        self._block_pair(i_cable_a, i_cable_b)
+
+        # The new bundle should not accumulate agglomeration energy
+        # with any of the cables that any of its constituent cables
+        # are blocked from nucleating with.
+        blocked = np.union1d(
+            self.blocked_cables(i_cable_a), self.blocked_cables(i_cable_b)
+        )
+        self.agglomeration_pairs.block(i_bundle, blocked)
+
+        if self.debug:
+            print()
+            print(f"    new bundle  with cables {i_cable_a} and {i_cable_b}")
+            self.info()
+
+    def grow_bundles(self):
+        """
+        Update an estimate of co-activity between all cables and bundles.
+
+        This is Ziptie.grow_bundles() with the dense agglomeration array
+        operations swapped out for their sparse equivalents.
+        """
+        if self.n_bundles == self.n_bundles_max:
+            return
+
+        # Incrementally accumulate agglomeration growth energy.
+        i_active_bundles = np.flatnonzero(self.bundle_activities[: self.n_bundles])
+        i_active_cables = np.flatnonzero(self.cable_activities)
+        pairs = self.agglomeration_pairs
+        pairs.reserve(i_active_bundles.size * i_active_cables.size)
+        n_new_pairs, over_threshold = agglomeration_energy_gather_sparse(
+            i_active_bundles,
+            self.bundle_activities,
+            i_active_cables,
+            self.cable_activities,
+            self.n_cables,
+            self.agglomeration_threshold,
+            pairs.keys,
+            pairs.energy,
+            pairs.allowed,
+            pairs.occupied,
+            pairs.n_pairs,
+        )
+        pairs.n_pairs += n_new_pairs
+        self.agglomeration_ready = self.agglomeration_ready or over_threshold
+
+        if np.random.sample() > self.agglomeration_check_fraction:
+            return
+
+        if self.n_bundles == 0:
+            return
+
+        if not self.agglomeration_ready:
+            return
+
+        key = pairs.first_over_threshold(self.agglomeration_threshold)
+        if key == _empty_key:
+            self.agglomeration_ready = False
+            return
+
+        i_bundle, i_cable = divmod(key, self.n_cables)
+
+        # Add the new bundle to the end of the list.
+        i_new_bundle = self.n_bundles
+        self.n_bundles += 1
+
+        # Make a copy of the growing bundle and add in the new cable.
+        n_cables_old = self.n_cables_by_bundle[i_bundle]
+        self.n_cables_by_bundle[i_new_bundle] = n_cables_old + 1
+        self.mapping[i_new_bundle, :n_cables_old] = self.mapping[
+            i_bundle, :n_cables_old
+        ]
+        self.mapping[i_new_bundle, n_cables_old] = i_cable
+
+        # Reset the accumulated nucleation and agglomeration energy
+        # for the cable and bundle involved.
+        self.nucleation_pairs.clear(i_cable, i_cable)
+        pairs.clear(i_col=i_cable)
+        pairs.clear(i_row=i_bundle)
+
+        # Prevent the cable and bundle from
+        # accumulating agglomeration energy in the future.
+        pairs.block(i_bundle, [i_cable])
+
+        # The new bundle should not accumulate agglomeration energy with
+        # 1) the cables that its constituent cable
+        #    are blocked from nucleating with or
+        # 2) the cables that its constituent bundle
+        #    are blocked from agglomerating with.
+        blocked = np.union1d(self.blocked_cables(i_cable), pairs.blocked(i_bundle))
+        pairs.block(i_new_bundle, blocked)
+
+        if self.debug:
+            print()
+            print(f"    new bundle with cable {i_cable} and bundle {i_bundle}")
+            self.info()
+
+    def update_inputs(self, resets):
+        """
+        Reset indicated cables and all the bundles associated with them.
+
+        Unlike the stock Ziptie, the cables' blocks stay intact. A reset cable
+        still can't nucleate with the other cables in its block, and
+        it still can't join a bundle that has one of them.
+
+        Parameters
+        ----------
+        resets: array of ints
+            The indices of the cables that are being reset
+
+        Returns
+        -------
+        upstream_resets: array of ints
+            The indices of the bundles to be reset.
+        """
+        upstream_resets = []
+        for i_cable in resets:
+            for i_bundle in range(self.n_bundles):
+                n_cables = self.n_cables_by_bundle[i_bundle]
+                if i_cable in self.mapping[i_bundle, :n_cables]:
+                    upstream_resets.append(i_bundle)
+                    # Remove the bundle from the mappings in both directions.
+                    self.mapping[i_bundle, :n_cables] = 0
+                    self.agglomeration_pairs.clear(i_row=i_bundle, allow=True)
+
+            self.agglomeration_pairs.clear(i_col=i_cable, allow=True)
+            i_block = i_cable // self.block_size
+            for i_bundle in range(self.n_bundles):
+                if i_bundle in upstream_resets:
+                    continue
+                n_cables = self.n_cables_by_bundle[i_bundle]
+                i_blocks = self.mapping[i_bundle, :n_cables] // self.block_size
+                if np.any(i_blocks == i_block):
+                    self.agglomeration_pairs.block(i_bundle, [i_cable])
+
+            for i_partner in self.blocked_partners.pop(i_cable, []):
+                self.blocked_partners[i_partner].remove(i_cable)
+                i_row, i_col = max(i_cable, i_partner), min(i_cable, i_partner)
+                self.nucleation_pairs.clear(i_row, i_col, allow=True, both=True)
+            self.nucleation_pairs.clear(i_cable, i_cable)
+
+        return upstream_resets
+
+    def blocked_cables(self, i_cable):
+        """
+        Find all the cables that a cable is blocked from nucleating with,
+        including itself. This is the sparse equivalent of
+        np.where(nucleation_mask[i_cable, :] == 0)[0]
+
+        Parameters
+        ----------
+        i_cable : int
+
+        Returns
+        -------
+        blocked : array of ints
+            Sorted cable indices.
+        """
+        i_block_start = (i_cable // self.block_size) * self.block_size
+        i_block_end = np.minimum(i_block_start + self.block_size, self.n_cables)
+        return np.union1d(
+            np.arange(i_block_start, i_block_end),
+            np.array(self.blocked_partners.get(i_cable, []), dtype=int),
+        )
+
+    def nucleation_energy_dense(self):
+        """
+        Build the dense (n_cables, n_cables) nucleation energy array,
+        for snapshots and reports. This is expensive for large Zipties.
+        """
+        return self.nucleation_pairs.energy_dense(self.n_cables)
+
+    def nucleation_mask_dense(self):
+        """
+        Build the dense (n_cables, n_cables) nucleation mask array,
+        for snapshots and reports. This is expensive for large Zipties.
+        """
+        return nucleation_mask_dense(
+            self.n_cables, self.block_size, self.blocked_partners
+        )
+
+    def agglomeration_energy_dense(self):
+        """
+        Build the dense (n_bundles_max, n_cables) agglomeration energy array,
+        for snapshots and reports. This is expensive for large Zipties.
+        """
+        return self.agglomeration_pairs.energy_dense(self.n_bundles_max)
+
+    def agglomeration_mask_dense(self):
+        """
+        Build the dense (n_bundles_max, n_cables) agglomeration mask array,
+        for snapshots and reports. This is expensive for large Zipties.
+        """
+        return self.agglomeration_pairs.mask_dense(self.n_bundles_max)
+
+    def deferred_dense_arrays(self):
+        """
+        The dense nucleation and agglomeration energies and masks,
+        as `DeferredArray`s for a `SnapshotWriter`. Only the stored pairs
+        and blocked partners get copied here. The dense arrays get built
+        later, on the writer's thread.
+        """
+        blocked_partners = {
+            i_cable: list(partners)
+            for i_cable, partners in self.blocked_partners.items()
+        }
+        return {
+            "nucleation_energy": self.nucleation_pairs.deferred_energy_dense(
+                self.n_cables
+            ),
+            "nucleation_mask": DeferredArray(
+                (self.n_cables, self.n_cables),
+                int,
+                nucleation_mask_dense,
+                self.n_cables,
+                self.block_size,
+                blocked_partners,
+            ),
+            "agglomeration_energy": self.agglomeration_pairs.deferred_energy_dense(
+                self.n_bundles_max
+            ),
+            "agglomeration_mask": self.agglomeration_pairs.deferred_mask_dense(
+                self.n_bundles_max
+            ),
+        }
+
+    def _block_pair(self, i_cable_a, i_cable_b):
+        self.nucleation_pairs.block(
+            max(i_cable_a, i_cable_b), [min(i_cable_a, i_cable_b)]
+        )
+        self.blocked_partners.setdefault(i_cable_a, []).append(i_cable_b)
+        self.blocked_partners.setdefault(i_cable_b, []).append(i_cable_a)
+
+
+class PairTable:
+    """
+    Energy accumulated between pairs (i_row, i_col), stored only for
+    the pairs that have been touched, in an open-addressing hash table
+    keyed by i_row * n_cols + i_col.
+
+    Each pair also has a flag for whether it's allowed to accumulate energy.
+    Blocked pairs get added to the table, even if they have never
+    been touched, so that the accumulation step can find them.
+
+    The occupied slots are listed in the order they were filled,
+    so that scans of the table only visit those, rather than
+    every slot in it.
+    """
+
+    def __init__(self, n_cols):
+        self.n_cols = n_cols
+        self.keys = np.full(_initial_capacity, _empty_key, dtype=np.int64)
+        self.energy = np.zeros(_initial_capacity)
+        self.allowed = np.ones(_initial_capacity, dtype=bool)
+        self.occupied = np.zeros(
+            int(_initial_capacity * _max_load_factor), dtype=np.int64
+        )
+        self.n_pairs = 0
+
+    def reserve(self, n_new_pairs):
+        """
+        Make sure there is room in the table for n_new_pairs more entries.
+        """
+        n_required = self.n_pairs + n_new_pairs
+        capacity = self.keys.size
+        if n_required <= capacity * _max_load_factor:
+            return
+
+        while n_required > capacity * _max_load_factor:
+            capacity *= 2
+
+        keys = np.full(capacity, _empty_key, dtype=np.int64)
+        energy = np.zeros(capacity)
+        allowed = np.ones(capacity, dtype=bool)
+        occupied = np.zeros(int(capacity * _max_load_factor), dtype=np.int64)
+        rehash(
+            self.keys,
+            self.energy,
+            self.allowed,
+            self.occupied,
+            self.n_pairs,
+            keys,
+            energy,
+            allowed,
+            occupied,
+        )
+        self.keys = keys
+        self.energy = energy
+        self.allowed = allowed
+        self.occupied = occupied
+
+    def block(self, i_row, i_cols):
+        """
+        Stop the pairs (i_row, i_col) for each of i_cols from
+        accumulating energy, and zero the energy they already have.
+        """
+        self.reserve(len(i_cols))
+        self.n_pairs += block_pairs(
+            np.asarray(i_cols, dtype=np.int64) + i_row * self.n_cols,
+            self.keys,
+            self.energy,
+            self.allowed,
+            self.occupied,
+            self.n_pairs,
+        )
+
+    def blocked(self, i_row):
+        """
+        The sorted columns that are blocked in row i_row.
+        """
+        i_slots = self.occupied[: self.n_pairs]
+        keys = self.keys[i_slots]
+        i_blocked = np.logical_and(
+            keys // self.n_cols == i_row, np.logical_not(self.allowed[i_slots])
+        )
+        return np.sort(keys[i_blocked] % self.n_cols)
+
+    def clear(self, i_row=-1, i_col=-1, allow=False, both=False):
+        """
+        Zero the energy of every pair in row i_row or column i_col,
+        or in both, if `both`. If `allow`, let them accumulate energy again.
+        """
+        clear_pairs(
+            self.keys,
+            self.energy,
+            self.allowed,
+            self.occupied,
+            self.n_pairs,
+            self.n_cols,
+            i_row,
+            i_col,
+            allow,
+            both,
+        )
+
+    def first_over_threshold(self, threshold):
+        """
+        The key of the pair whose energy is greater than the threshold and
+        that comes first in row-major order, matching the dense
+        threshold_check(), or -1 if there isn't one.
+        """
+        return int(
+            first_over_threshold(
+                self.keys, self.energy, self.occupied, self.n_pairs, threshold
+            )
+        )
+
+    def entries(self):
+        """
+        Copies of the rows, columns, energies, and allowed flags
+        of the pairs in the table.
+        """
+        i_slots = self.occupied[: self.n_pairs]
+        i_rows, i_cols = np.divmod(self.keys[i_slots], self.n_cols)
+        return i_rows, i_cols, self.energy[i_slots], self.allowed[i_slots]
+
+    def energy_dense(self, n_rows):
+        i_rows, i_cols, energy, _ = self.entries()
+        return pairs_dense((n_rows, self.n_cols), i_rows, i_cols, energy, 0.0)
+
+    def mask_dense(self, n_rows):
+        i_rows, i_cols, _, allowed = self.entries()
+        return pairs_dense(
+            (n_rows, self.n_cols), i_rows, i_cols, allowed.astype(int), 1
+        )
+
+    def deferred_energy_dense(self, n_rows):
+        i_rows, i_cols, energy, _ = self.entries()
+        shape = (n_rows, self.n_cols)
+        return DeferredArray(
+            shape, float, pairs_dense, shape, i_rows, i_cols, energy, 0.0
+        )
+
+    def deferred_mask_dense(self, n_rows):
+        i_rows, i_cols, _, allowed = self.entries()
+        shape = (n_rows, self.n_cols)
+        return DeferredArray(
+            shape, int, pairs_dense, shape, i_rows, i_cols, allowed.astype(int), 1
+        )
+
+
+def pairs_dense(shape, i_rows, i_cols, values, fill):
+    """
+    A dense array of `shape`, with `values` at the pairs (i_rows, i_cols)
+    and `fill` everywhere else.
+    """
+    array = np.full(shape, fill, dtype=np.asarray(values).dtype)
+    array[i_rows, i_cols] = values
+    return array
+
+
+def nucleation_mask_dense(n_cables, block_size, blocked_partners):
+    """
+    A dense nucleation mask, zero within each block of cables
+    and between the cables that have nucleated a bundle together.
+    """
+    nucleation_mask = np.ones((n_cables, n_cables), dtype=int)
+    for i_block_start in range(0, n_cables, block_size):
+        i_block_end = i_block_start + block_size
+        nucleation_mask[i_block_start:i_block_end, i_block_start:i_block_end] = 0
+    for i_cable, partners in blocked_partners.items():
+        nucleation_mask[i_cable, partners] = 0
+    return nucleation_mask
+
+
+@njit(nogil=True)
+def find_slot(keys, key):
+    """
+    Find the slot in an open-addressing hash table that either holds
+    `key` or is the empty slot where it should be inserted.
+    The size of `keys` must be a power of two.
+    """
+    slot_mask = keys.size - 1
+    # Fibonacci hashing spreads out the runs of neighboring keys
+    # that come from neighboring cables.
+    i_slot = (key * 2654435761) & slot_mask
+    while keys[i_slot] != key and keys[i_slot] != _empty_key:
+        i_slot = (i_slot + 1) & slot_mask
+    return i_slot
+
+
+@njit(nogil=True)
+def insert(keys, occupied, n_pairs, key):
+    """
+    Find the slot holding `key`, adding it to the table if it isn't there.
+
+    Returns
+    -------
+    i_slot : int
+    is_new : bool
+    """
+    i_slot = find_slot(keys, key)
+    if keys[i_slot] == _empty_key:
+        keys[i_slot] = key
+        occupied[n_pairs] = i_slot
+        return i_slot, True
+    return i_slot, False
+
+
+@njit(nogil=True)
+def nucleation_energy_gather_sparse(
+    i_active,
+    cable_activities,
+    n_cables,
+    block_size,
+    threshold,
+    keys,
+    energy,
+    allowed,
+    occupied,
+    n_pairs,
+):
+    """
+    Gather nucleation energy, only for pairs of cables that are both active.
+
+    The dense arithmetic looks like
+        nucleation_energy += (
+            (cable_activities @ cable_activities.T) *
+            nucleation_mask
+        )
+
+    Parameters
+    ----------
+    i_active : array of ints
+        The sorted indices of the cables with non-zero activity.
+    cable_activities : array of floats
+        The current activity of each input feature.
+    n_cables, block_size : int
+    threshold : float
+        The nucleation threshold.
+    keys, energy, allowed, occupied, n_pairs : arrays and int
+        The pair table.
+
+    Returns
+    -------
+    n_new_pairs : int
+        The number of entries added to the pair table.
+    over_threshold : bool
+        Whether any of the updated pairs exceeds the threshold.
+    """
+    n_new_pairs = 0
+    over_threshold = False
+    for i_1 in range(i_active.size):
+        i_cable_1 = i_active[i_1]
+        activity_1 = cable_activities[i_cable_1]
+        i_block_1 = i_cable_1 // block_size
+        # Only populate the lower half of the pairs.
+        # i_active is sorted, so i_cable_1 > i_cable_2.
+        for i_2 in range(i_1):
+            i_cable_2 = i_active[i_2]
+            if i_cable_2 // block_size == i_block_1:
+                continue
+
+            key = i_cable_1 * n_cables + i_cable_2
+            i_slot, is_new = insert(keys, occupied, n_pairs + n_new_pairs, key)
+            if is_new:
+                n_new_pairs += 1
+
+            if allowed[i_slot]:
+                energy[i_slot] += activity_1 * cable_activities[i_cable_2]
+                if energy[i_slot] > threshold:
+                    over_threshold = True
+
+    return n_new_pairs, over_threshold
+
+
+@njit(nogil=True)
+def agglomeration_energy_gather_sparse(
+    i_active_bundles,
+    bundle_activities,
+    i_active_cables,
+    cable_activities,
+    n_cables,
+    threshold,
+    keys,
+    energy,
+    allowed,
+    occupied,
+    n_pairs,
+):
+    """
+    Gather agglomeration energy, only for bundle-cable pairs
+    that are both active.
+
+    The dense arithmetic looks like
+        agglomeration_energy += (
+            (bundle_activities @ cable_activities.T) *
+            agglomeration_mask
+        )
+
+    Returns
+    -------
+    n_new_pairs : int
+        The number of entries added to the pair table.
+    over_threshold : bool
+        Whether any of the updated pairs exceeds the threshold.
+    """
+    n_new_pairs = 0
+    over_threshold = False
+    for i_bundle in i_active_bundles:
+        bundle_activity = bundle_activities[i_bundle]
+        for i_cable in i_active_cables:
+            key = i_bundle * n_cables + i_cable
+            i_slot, is_new = insert(keys, occupied, n_pairs + n_new_pairs, key)
+            if is_new:
+                n_new_pairs += 1
+
+            if allowed[i_slot]:
+                energy[i_slot] += bundle_activity * cable_activities[i_cable]
+                if energy[i_slot] > threshold:
+                    over_threshold = True
+
+    return n_new_pairs, over_threshold
+
+
+@njit(nogil=True)
+def block_pairs(block_keys, keys, energy, allowed, occupied, n_pairs):
+    """
+    Returns
+    -------
+    n_new_pairs : int
+        The number of entries added to the pair table.
+    """
+    n_new_pairs = 0
+    for key in block_keys:
+        i_slot, is_new = insert(keys, occupied, n_pairs + n_new_pairs, key)
+        if is_new:
+            n_new_pairs += 1
+        allowed[i_slot] = False
+        energy[i_slot] = 0
+    return n_new_pairs
+
+
+@njit(nogil=True)
+def clear_pairs(
+    keys, energy, allowed, occupied, n_pairs, n_cols, i_row, i_col, allow, both
+):
+    for i in range(n_pairs):
+        i_slot = occupied[i]
+        in_row = keys[i_slot] // n_cols == i_row
+        in_col = keys[i_slot] % n_cols == i_col
+        if (both and in_row and in_col) or (not both and (in_row or in_col)):
+            energy[i_slot] = 0
+            if allow:
+                allowed[i_slot] = True
+
+
+@njit(nogil=True)
+def first_over_threshold(keys, energy, occupied, n_pairs, threshold):
+    first_key = _empty_key
+    for i in range(n_pairs):
+        i_slot = occupied[i]
+        key = keys[i_slot]
+        if energy[i_slot] > threshold:
+            if first_key == _empty_key or key < first_key:
+                first_key = key
+    return first_key
+
+
+@njit(nogil=True)
+def rehash(
+    keys,
+    energy,
+    allowed,
+    occupied,
+    n_pairs,
+    new_keys,
+    new_energy,
+    new_allowed,
+    new_occupied,
+):
+    for i in range(n_pairs):
+        i_slot = occupied[i]
+        i_new_slot = find_slot(new_keys, keys[i_slot])
+        new_keys[i_new_slot] = keys[i_slot]
+        new_energy[i_new_slot] = energy[i_slot]
+        new_allowed[i_new_slot] = allowed[i_slot]
+        new_occupied[i] = i_new_slot
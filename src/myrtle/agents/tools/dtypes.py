@@ -0,0 +1,51 @@
+import numpy as np
+
+
+class DtypePolicy:
+    """
+    The dtypes an agent keeps its arrays in.
+
+    `values` is for anything real-valued that the agent learns or tracks,
+    like action values, curiosities, returns, and features.
+    `counts` is for visit and action counts.
+    `actions` is for the action arrays the agent sends to the world.
+
+    Sensors and rewards always stay float64. They arrive from the world
+    that way, and rewards need NaN for the ones that are missing.
+    """
+
+    def __init__(self, values=np.float64, counts=np.float64, actions=np.float64):
+        self.values = np.dtype(values)
+        self.counts = np.dtype(counts)
+        self.actions = np.dtype(actions)
+
+    def __repr__(self):
+        return (
+            f"DtypePolicy(values={self.values}, counts={self.counts}, "
+            f"actions={self.actions})"
+        )
+
+
+# float64 throughout. This is how agents have always stored things.
+full = DtypePolicy()
+
+# Half the bytes for values, and small integers for counts and actions.
+# For agents with a lot of features, like the Ziptie agents with
+# a large `n_features`, the per-feature arrays dominate. Halving them
+# halves the memory that gets streamed through on every step.
+compact = DtypePolicy(values=np.float32, counts=np.int32, actions=np.int8)
+
+_policies = {"full": full, "compact": compact}
+
+
+def dtype_policy(policy):
+    """
+    Look up a policy by name, "full" or "compact",
+    or pass a `DtypePolicy` straight through.
+    """
+    if isinstance(policy, DtypePolicy):
+        return policy
+    try:
+        return _policies[policy]
+    except KeyError:
+        raise ValueError(f"Unknown dtype policy {policy}")
@@ -0,0 +1,152 @@
+import json
+import os
+import zlib
+import numpy as np
+
+_index_filename = "index.json"
+# Keep the hash table at most half full, so that lookups rarely
+# have to probe more than a slot or two.
+_max_load_factor = 0.5
+_empty_slot = -1
+# Stored in place of an action for states where every action ties.
+_no_best_action = -1
+
+
+class FrozenPolicy:
+    """
+    A read-only mapping from state keys, the same bytes as from
+    `BaseAgent.sensor_key()`, to the single best action in that state.
+
+    It lives in a directory of raw binary files, read through memory maps,
+    so opening one costs next to nothing regardless of how many states
+    it has. The files are
+        key_bytes.dat: all the state keys, back to back
+        key_offsets.dat: where each key starts and ends in key_bytes
+        actions.dat: the best action for each state, as int8 if there
+            are few enough actions, otherwise int16 or int32,
+            or -1 if every action ties
+        slots.dat: an open-addressing hash table of state indices,
+            keyed by the CRC-32 of the state key
+        index.json: the sizes and dtypes of all of the above
+
+    The files are opened on the first lookup, rather than on creation,
+    so that a `FrozenPolicy` can be handed off to another process.
+    Use `export_policy()` to create one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.arrays = None
+
+    def open(self):
+        with open(os.path.join(self.path, _index_filename), "rt") as f:
+            index = json.load(f)
+        self.n_actions = index["n_actions"]
+
+        self.arrays = {}
+        for name, info in index["arrays"].items():
+            if info["size"] == 0:
+                self.arrays[name] = np.zeros(0, dtype=info["dtype"])
+            else:
+                # Plain array views of the memory maps are quicker to index.
+                self.arrays[name] = np.memmap(
+                    os.path.join(self.path, f"{name}.dat"),
+                    dtype=info["dtype"],
+                    mode="r",
+                    shape=(info["size"],),
+                ).view(np.ndarray)
+        self.key_bytes = self.arrays["key_bytes"]
+        self.key_offsets = self.arrays["key_offsets"]
+        self.actions = self.arrays["actions"]
+        self.slots = self.arrays["slots"]
+        self.slot_mask = self.slots.size - 1
+
+    def __len__(self):
+        if self.arrays is None:
+            self.open()
+        return self.actions.size
+
+    def action(self, key):
+        """
+        The index of the best action for the state with this key,
+        or None if the state isn't in the policy or has no best action.
+        """
+        if self.arrays is None:
+            self.open()
+
+        i_slot = zlib.crc32(key) & self.slot_mask
+        while True:
+            i_state = int(self.slots[i_slot])
+            if i_state == _empty_slot:
+                return None
+            start = self.key_offsets[i_state]
+            stop = self.key_offsets[i_state + 1]
+            if self.key_bytes[start:stop].tobytes() == key:
+                i_action = int(self.actions[i_state])
+                if i_action == _no_best_action:
+                    return None
+                return i_action
+            i_slot = (i_slot + 1) & self.slot_mask
+
+
+def export_policy(agent, path):
+    """
+    Freeze the greedy policy of a trained tabular agent, one with its
+    action values in a `QTable` called `q_values`, into a `FrozenPolicy`
+    at `path`. Anything already there is overwritten.
+
+    Only the action values are kept. Exploration, curiosity, and
+    everything else the agent uses for learning are left behind.
+    """
+    q_values = agent.q_values
+    keys = list(q_values.keys())
+    n_states = len(keys)
+    n_actions = q_values.n_actions
+
+    # Ties go to the lowest numbered action, except where every action ties,
+    # as in states whose values were never updated. The trained agent
+    # would have picked at random there, so leave the choice to the player.
+    values = q_values.values[:n_states]
+    actions = np.argmax(values, axis=1)
+    all_tied = np.all(values == values[:, :1], axis=1)
+    actions[all_tied] = _no_best_action
+    if n_actions <= np.iinfo(np.int8).max:
+        actions = actions.astype(np.int8)
+    elif n_actions <= np.iinfo(np.int16).max:
+        actions = actions.astype(np.int16)
+    else:
+        actions = actions.astype(np.int32)
+
+    key_bytes = np.frombuffer(b"".join(keys), dtype=np.uint8)
+    key_offsets = np.zeros(n_states + 1, dtype=np.int64)
+    key_offsets[1:] = np.cumsum([len(key) for key in keys])
+
+    n_slots = 1
+    while n_states > n_slots * _max_load_factor:
+        n_slots *= 2
+    slots = np.full(n_slots, _empty_slot, dtype=np.int64)
+    for i_state, key in enumerate(keys):
+        i_slot = zlib.crc32(key) & (n_slots - 1)
+        while slots[i_slot] != _empty_slot:
+            i_slot = (i_slot + 1) & (n_slots - 1)
+        slots[i_slot] = i_state
+
+    arrays = {
+        "key_bytes": key_bytes,
+        "key_offsets": key_offsets,
+        "actions": actions,
+        "slots": slots,
+    }
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        with open(os.path.join(path, f"{name}.dat"), "wb") as f:
+            f.write(array.tobytes())
+    index = {
+        "n_actions": int(n_actions),
+        "arrays": {
+            name: {"size": int(array.size), "dtype": array.dtype.str}
+            for name, array in arrays.items()
+        },
+    }
+    with open(os.path.join(path, _index_filename), "wt") as f:
+        json.dump(index, f)
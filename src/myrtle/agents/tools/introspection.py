@@ -0,0 +1,294 @@
+import base64
+import json
+import time
+import numpy as np
+
+# The average number of bytes per second a channel is allowed to publish.
+_default_bytes_per_second = 50_000
+# Matrices get max-pooled down to no more than this many rows and columns.
+_default_max_side = 64
+
+# How often a publisher asks the message queue whether anyone is listening.
+# Checking costs a round trip, so it doesn't happen every step.
+_subscription_check_interval = 1.0  # seconds
+# How long a subscription lasts after the subscriber last renewed it.
+_subscription_lease = 10.0  # seconds
+
+# How long a subscriber waits for the next message to show up.
+_retrieve_timeout = 5.0  # seconds
+_retrieve_polling_delay = 0.05  # seconds
+
+_buckettree_topic = "buckettree_info"
+_ziptie_topic = "ziptie_info"
+
+
+class IntrospectionChannel:
+    """
+    A rate-limited stream of an agent's internals, published to the
+    message queue for live reports to pick up.
+
+    Publishing is opt-in from the listening end. A subscriber renews its
+    subscription each time it retrieves a message, and until someone has
+    subscribed, `ready()` returns False after little more than
+    a clock check, so an agent that nobody is watching does no
+    encoding or sending at all.
+
+    The bandwidth is bounded by a token bucket that refills
+    at `bytes_per_second` and holds up to one second's worth.
+    A message can be published whenever the bucket isn't empty, and its size
+    is then deducted, so the long-run average stays under the budget
+    even when single messages are large.
+
+    The message queue client can't be pickled, so it gets passed in
+    on each call rather than held by the channel.
+    """
+
+    def __init__(
+        self,
+        topic,
+        bytes_per_second=_default_bytes_per_second,
+        max_side=_default_max_side,
+    ):
+        self.topic = topic
+        self.bytes_per_second = bytes_per_second
+        self.max_side = max_side
+
+        self.byte_budget = float(bytes_per_second)
+        self.time_of_last_refill = time.time()
+        self.time_of_last_check = -np.inf
+        self.subscribed_until = -np.inf
+
+        self.n_published = 0
+        self.n_bytes_published = 0
+
+    def ready(self, mq):
+        """
+        Whether there is a subscriber and room in the budget for a message.
+        """
+        now = time.time()
+        if now - self.time_of_last_check > _subscription_check_interval:
+            self.time_of_last_check = now
+            if mq.get_latest(subscription_topic(self.topic)) != "":
+                self.subscribed_until = now + _subscription_lease
+        if now > self.subscribed_until:
+            return False
+
+        self.byte_budget = min(
+            self.byte_budget
+            + (now - self.time_of_last_refill) * self.bytes_per_second,
+            float(self.bytes_per_second),
+        )
+        self.time_of_last_refill = now
+        return self.byte_budget > 0
+
+    def put(self, mq, msg):
+        mq.put(self.topic, msg)
+        self.byte_budget -= len(msg)
+        self.n_published += 1
+        self.n_bytes_published += len(msg)
+
+
+def subscription_topic(topic):
+    return f"{topic}_subscription"
+
+
+def encode_array(array):
+    """
+    Pack an array into a JSON-friendly dict, with its contents
+    as base64-encoded raw bytes.
+    """
+    array = np.ascontiguousarray(array)
+    return {
+        "dtype": array.dtype.str,
+        "shape": list(array.shape),
+        "data": base64.b64encode(array.tobytes()).decode("ascii"),
+    }
+
+
+def decode_array(encoded):
+    return np.frombuffer(
+        base64.b64decode(encoded["data"]), dtype=encoded["dtype"]
+    ).reshape(encoded["shape"])
+
+
+def downsample(array, max_side):
+    """
+    Max-pool each axis of an array down to no more than `max_side` elements.
+    Max pooling keeps isolated high-energy elements visible, where averaging
+    would wash them out.
+    """
+    for axis in range(array.ndim):
+        n = array.shape[axis]
+        if n > max_side:
+            stride = pooling_stride(n, max_side)
+            array = np.maximum.reduceat(array, np.arange(0, n, stride), axis=axis)
+    return array
+
+
+def downsample_pairs(pairs, n_rows, max_side):
+    """
+    Max-pool the energies in a BlockZiptie's `PairTable` the same way
+    `downsample()` pools a dense (n_rows, n_cols) energy array, but going
+    straight from the stored pairs to the pooled grid, so it costs
+    in proportion to the number of pairs rather than the dense array's size.
+    Pairs that aren't stored have zero energy, and energies are
+    never negative, so the pooled grid can start out at zero.
+    """
+    row_stride = pooling_stride(n_rows, max_side)
+    col_stride = pooling_stride(pairs.n_cols, max_side)
+    pooled = np.zeros((-(-n_rows // row_stride), -(-pairs.n_cols // col_stride)))
+    i_rows, i_cols, energy, _ = pairs.entries()
+    np.maximum.at(pooled, (i_rows // row_stride, i_cols // col_stride), energy)
+    return pooled
+
+
+def pooling_stride(n, max_side):
+    """
+    How many elements at a time get pooled together to fit
+    `n` into `max_side`.
+    """
+    if n > max_side:
+        return -(-n // max_side)
+    return 1
+
+
+def publish_buckettrees_info(buckettrees, mq, channel, i_step, i_episode):
+    """
+    Publish the bucket boundaries and levels of a set of BucketTrees,
+    one per sensor, if the channel is ready for it.
+
+    The boundaries are sent as float64 because the outermost buckets
+    extend to +/- the largest float.
+    """
+    if not channel.ready(mq):
+        return
+    n_buckets = max(tree.n_buckets for tree in buckettrees)
+    msg = json.dumps(
+        {
+            "step": i_step,
+            "episode": i_episode,
+            "highs": encode_array(
+                np.stack([tree.highs[:n_buckets] for tree in buckettrees])
+            ),
+            "lows": encode_array(
+                np.stack([tree.lows[:n_buckets] for tree in buckettrees])
+            ),
+            "levels": encode_array(
+                np.stack(
+                    [tree.levels[:n_buckets] for tree in buckettrees]
+                ).astype(np.int16)
+            ),
+        }
+    )
+    channel.put(mq, msg)
+
+
+def publish_ziptie_info(ziptie, mq, channel, i_step, i_episode):
+    """
+    Publish the bundle mapping and the nucleation and agglomeration energies
+    of a Ziptie, if the channel is ready for it.
+
+    Only the occupied part of the mapping is sent, exactly. The energy
+    matrices are max-pooled down to the channel's `max_side`
+    and sent at half precision.
+    """
+    if not channel.ready(mq):
+        return
+
+    n_bundles = ziptie.n_bundles
+    n_cables_by_bundle = ziptie.n_cables_by_bundle[:n_bundles]
+    if n_bundles > 0:
+        max_cables = np.max(n_cables_by_bundle)
+    else:
+        max_cables = 0
+
+    # Block-sparse zipties only keep the energy of the pairs
+    # that have been co-active. Pool those directly.
+    try:
+        nucleation_energy = downsample_pairs(
+            ziptie.nucleation_pairs, ziptie.n_cables, channel.max_side
+        )
+        agglomeration_energy = downsample_pairs(
+            ziptie.agglomeration_pairs, ziptie.n_bundles_max, channel.max_side
+        )
+    except AttributeError:
+        nucleation_energy = downsample(ziptie.nucleation_energy, channel.max_side)
+        agglomeration_energy = downsample(
+            ziptie.agglomeration_energy, channel.max_side
+        )
+
+    msg = json.dumps(
+        {
+            "step": i_step,
+            "episode": i_episode,
+            "n_cables": ziptie.n_cables,
+            "n_bundles": n_bundles,
+            "n_bundles_max": ziptie.n_bundles_max,
+            "mapping": encode_array(
+                ziptie.mapping[:n_bundles, :max_cables].astype(np.int32)
+            ),
+            "nucleation_energy": encode_array(nucleation_energy.astype(np.float16)),
+            "agglomeration_energy": encode_array(
+                agglomeration_energy.astype(np.float16)
+            ),
+        }
+    )
+    channel.put(mq, msg)
+
+
+def retrieve_buckettree_info(mq):
+    """
+    Subscribe to BucketTree info and wait for the next message.
+
+    Returns
+    -------
+    info: dict or None
+        The step, the episode, and the highs, lows, and levels, stacked
+        one row per sensor. None if nothing arrived before the timeout.
+    """
+    info = retrieve(mq, _buckettree_topic)
+    if info is None:
+        return None
+    for key in ["highs", "lows", "levels"]:
+        info[key] = decode_array(info[key])
+    return info
+
+
+def retrieve_ziptie_info(mq):
+    """
+    Subscribe to Ziptie info and wait for the next message.
+
+    Returns
+    -------
+    info: dict or None
+        The step, the episode, the number of cables and bundles,
+        the compact mapping, and the downsampled nucleation and
+        agglomeration energies. None if nothing arrived before the timeout.
+    """
+    info = retrieve(mq, _ziptie_topic)
+    if info is None:
+        return None
+    for key in ["mapping", "nucleation_energy", "agglomeration_energy"]:
+        info[key] = decode_array(info[key])
+    return info
+
+
+def retrieve(mq, topic):
+    # Renew the subscription. The publisher only checks in every so often
+    # and then waits for its next publishing step, so give it time.
+    mq.put(subscription_topic(topic), str(time.time()))
+    start = time.time()
+    while time.time() - start < _retrieve_timeout:
+        msg = mq.get_latest(topic)
+        if msg != "":
+            return json.loads(msg)
+        time.sleep(_retrieve_polling_delay)
+    return None
+
+
+def buckettree_channel(**kwargs):
+    return IntrospectionChannel(_buckettree_topic, **kwargs)
+
+
+def ziptie_channel(**kwargs):
+    return IntrospectionChannel(_ziptie_topic, **kwargs)
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Memoizes the conditional predictions of a Naive Cartographer model.
+
+    In discrete worlds the same feature activities show up over and over,
+    and recalculating the model's predictions from scratch each time
+    is wasted effort. The cache holds up to `max_size` of the
+    most recently used predictions.
+
+    When feature activities decay gradually, rather than all at once,
+    they almost never repeat exactly. Each one carries a fading trace
+    of every feature seen before it. To give the cache something to
+    match on, activities get rounded to the nearest multiple of `resolution`.
+    Activities smaller than half of `resolution` drop out entirely.
+    Predictions are made from the rounded activities, and the cache is
+    keyed on their sparse representation--the indices and rounded values
+    of the non-zero elements. The default `resolution` matches the model's
+    activity threshold, below which a feature has no bearing on
+    predicted outcomes. A `resolution` of 0 turns rounding off, and
+    the cache only pays off when feature activities don't decay gradually,
+    with a `feature_decay_rate` of 1.
+
+    A prediction only depends on the rows of the model belonging to
+    its active features. Each row carries a version number,
+    and a cached prediction is valid as long as none of its rows' versions
+    have changed. Call `update()` after each model update to bump
+    the version of each row that has changed.
+
+    The model nudges the rows of the state it just visited after every
+    prediction, so if every change invalidated a row, a state's predictions
+    would almost never survive until its next visit. Instead, a row's
+    version is only bumped once its accumulated experience
+    (its summed state-action occurrences) has grown by more than
+    `refresh_fraction` since the last bump, or once any of its
+    reward estimates has moved by more than `refresh_fraction` of
+    the largest of them. Early in learning rows are
+    refreshed nearly every step. As the model matures, changes
+    to each row get relatively smaller and predictions stay cached for longer.
+    A `refresh_fraction` of 0 invalidates on every change, and the cached
+    predictions are then identical to fresh ones.
+
+    The model only changes the rows with some state-action activity,
+    the features that were active on recent steps. Only those rows
+    get checked.
+
+    A `max_size` of 0 disables the cache.
+    """
+
+    def __init__(self, model, max_size=1000, refresh_fraction=0.05, resolution=0.1):
+        self.model = model
+        self.max_size = int(max_size)
+        self.refresh_fraction = refresh_fraction
+        self.resolution = resolution
+
+        self.entries = OrderedDict()
+        self.row_versions = np.zeros(self.model.n_features, dtype=np.int64)
+        # The summed occurrences and the reward estimates of each row
+        # as of its last version bump.
+        self.row_occurrences = np.zeros(self.model.n_features)
+        self.row_rewards = self.model.s_a_rewards.copy()
+        # The rows that the next model update might touch.
+        self.i_traced = np.flatnonzero(np.any(self.model.s_a_activities, axis=1))
+
+        self.n_hits = 0
+        self.n_misses = 0
+
+    def predict(self, sensors=None):
+        """
+        A drop-in replacement for `model.predict()`, working from
+        rounded feature activities.
+
+        The arrays returned may be shared with later calls,
+        so treat them as read-only.
+        """
+        if self.max_size == 0:
+            return self.model.predict(sensors=sensors)
+
+        if sensors is None:
+            sensors = self.model.feature_activities
+        if self.resolution > 0:
+            levels = np.rint(sensors / self.resolution)
+            i_active = np.flatnonzero(levels)
+            key = i_active.tobytes() + levels[i_active].tobytes()
+            sensors = levels * self.resolution
+        else:
+            i_active = np.flatnonzero(sensors)
+            key = i_active.tobytes() + sensors[i_active].tobytes()
+        versions = self.row_versions[i_active]
+
+        try:
+            cached_versions, prediction = self.entries[key]
+            if np.array_equal(versions, cached_versions):
+                self.entries.move_to_end(key)
+                self.n_hits += 1
+                return prediction
+        except KeyError:
+            pass
+
+        self.n_misses += 1
+        prediction = self.model.predict(sensors=sensors)
+        self.entries[key] = (versions, prediction)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+        return prediction
+
+    def update(self):
+        """
+        Bump the versions of the model rows that have changed enough
+        to matter since their last bump.
+        """
+        if self.max_size == 0:
+            return
+
+        # The rows the model just updated are the ones with state-action
+        # activity. These were either already being traced, or belong to
+        # the features that were active when the model last saw actions.
+        i_rows = self.i_traced
+        i_touched = i_rows[np.any(self.model.s_a_activities[i_rows], axis=1)]
+
+        row_occurrences = np.sum(self.model.s_a_occurrences[i_touched], axis=1)
+        occurrences_grown = row_occurrences > self.row_occurrences[i_touched] * (
+            1 + self.refresh_fraction
+        )
+
+        row_rewards = self.model.s_a_rewards[i_touched]
+        last_rewards = self.row_rewards[i_touched]
+        reward_change = np.max(np.abs(row_rewards - last_rewards), axis=(1, 2))
+        reward_scale = np.max(np.abs(last_rewards), axis=(1, 2))
+        rewards_moved = reward_change > reward_scale * self.refresh_fraction
+
+        i_changed = i_touched[np.logical_or(occurrences_grown, rewards_moved)]
+        self.row_versions[i_changed] += 1
+        self.row_occurrences[i_changed] = np.sum(
+            self.model.s_a_occurrences[i_changed], axis=1
+        )
+        self.row_rewards[i_changed] = self.model.s_a_rewards[i_changed]
+
+        self.i_traced = np.union1d(
+            i_touched, np.flatnonzero(self.model.feature_activities)
+        )
+
+    def hit_rate(self):
+        n_lookups = self.n_hits + self.n_misses
+        if n_lookups == 0:
+            return 0.0
+        return self.n_hits / n_lookups
@@ -0,0 +1,92 @@
+import numpy as np
+
+_default_initial_capacity = 1024
+
+
+class QTable:
+    """
+    A table of action values, one row per state, that can be used
+    like a dict keyed by the bytes of a state.
+
+    The values all live in one two-dimensional array, with a dict mapping
+    each state's key to its row. That keeps single lookups as quick as
+    a dict of arrays, while also letting batches of rows be
+    read and updated all at once with fancy indexing, as in
+    `replay_q_learning()`.
+
+    Indexing by a key returns a view of that state's row. The array gets
+    reallocated as the table grows, so don't hold on to a row across
+    the addition of new states.
+
+    The values are kept in `dtype`, float64 unless the agent asks
+    for something more compact.
+    """
+
+    def __init__(
+        self, n_actions, initial_capacity=_default_initial_capacity, dtype=np.float64
+    ):
+        self.n_actions = n_actions
+        self.values = np.zeros((initial_capacity, n_actions), dtype=dtype)
+        self.rows = {}
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, key):
+        return self.values[self.rows[key]]
+
+    def __setitem__(self, key, row_values):
+        # Find the row first. Adding it may reallocate the array.
+        i_row = self.row(key)
+        self.values[i_row] = row_values
+
+    def keys(self):
+        return self.rows.keys()
+
+    def row(self, key):
+        """
+        Find the row index of a state, adding a row of zeros
+        if it isn't in the table yet.
+        """
+        try:
+            return self.rows[key]
+        except KeyError:
+            pass
+
+        i_row = len(self.rows)
+        if i_row == self.values.shape[0]:
+            values = np.zeros((2 * i_row, self.n_actions), dtype=self.values.dtype)
+            values[:i_row] = self.values
+            self.values = values
+        self.rows[key] = i_row
+        return i_row
+
+    def merge(self, tables):
+        """
+        Fold the values from other tables into this one. States that
+        are in more than one table get the average of their values.
+        """
+        tables = [self] + list(tables)
+        # Rows are numbered in the order their keys were added,
+        # so the merged table keeps this one's rows first.
+        rows = {}
+        for table in tables:
+            for key in table.rows:
+                if key not in rows:
+                    rows[key] = len(rows)
+
+        n_rows = len(rows)
+        sums = np.zeros((n_rows, self.n_actions))
+        counts = np.zeros(n_rows)
+        for table in tables:
+            i_rows = np.array([rows[key] for key in table.rows], dtype=int)
+            sums[i_rows] += table.values[: len(table)]
+            counts[i_rows] += 1
+
+        capacity = max(self.values.shape[0], n_rows)
+        self.values = np.zeros((capacity, self.n_actions), dtype=self.values.dtype)
+        self.values[:n_rows] = sums / counts[:, np.newaxis]
+        self.rows = rows
@@ -0,0 +1,164 @@
+import numpy as np
+
+_default_capacity = 10_000
+# How strongly prioritized sampling favors large TD errors.
+# 0 is uniform sampling and 1 is fully proportional to the error.
+_default_priority_exponent = 0.6
+# Keeps every transition's chance of being sampled above zero.
+_priority_floor = 1e-3
+
+
+class ReplayBuffer:
+    """
+    A fixed-capacity ring buffer of (state row, action, reward,
+    next state row) transitions, stored in preallocated arrays.
+    State rows index into a `QTable`. Once the buffer is full,
+    each new transition overwrites the oldest one.
+
+    By default batches are sampled uniformly. With `prioritized=True`
+    they are sampled in proportion to each transition's most recent
+    TD error, raised to `priority_exponent`, using a sum tree.
+    New transitions get the largest priority seen so far,
+    so each one is likely to be replayed at least once.
+
+    Pass in the agent's `rng` to keep the sampling repeatable.
+    """
+
+    def __init__(
+        self,
+        capacity=_default_capacity,
+        prioritized=False,
+        priority_exponent=_default_priority_exponent,
+        rng=None,
+    ):
+        if rng is None:
+            rng = np.random.default_rng(np.random.randint(2**31))
+        self.rng = rng
+        self.capacity = int(capacity)
+        self.prioritized = prioritized
+        self.priority_exponent = priority_exponent
+
+        self.states = np.zeros(self.capacity, dtype=np.int64)
+        self.actions = np.zeros(self.capacity, dtype=np.int64)
+        self.rewards = np.zeros(self.capacity)
+        self.next_states = np.zeros(self.capacity, dtype=np.int64)
+
+        self.i_next = 0
+        self.size = 0
+
+        if self.prioritized:
+            self.priorities = SumTree(self.capacity, self.rng)
+            self.max_priority = 1.0
+
+    def add(self, state, action, reward, next_state):
+        i = self.i_next
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        if self.prioritized:
+            self.priorities.update(np.array([i]), np.array([self.max_priority]))
+
+        self.i_next = (self.i_next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size):
+        """
+        Returns
+        -------
+        i_transitions: array of ints
+            Where in the buffer the sampled transitions are,
+            for passing to `update_priorities()`.
+        states, actions, rewards, next_states: arrays
+        """
+        if self.prioritized:
+            i_transitions = self.priorities.sample(batch_size)
+        else:
+            i_transitions = self.rng.integers(self.size, size=batch_size)
+        return (
+            i_transitions,
+            self.states[i_transitions],
+            self.actions[i_transitions],
+            self.rewards[i_transitions],
+            self.next_states[i_transitions],
+        )
+
+    def update_priorities(self, i_transitions, td_errors):
+        if not self.prioritized:
+            return
+        priorities = (np.abs(td_errors) + _priority_floor) ** self.priority_exponent
+        self.priorities.update(i_transitions, priorities)
+        self.max_priority = max(self.max_priority, np.max(priorities))
+
+
+class SumTree:
+    """
+    A binary tree in which each node holds the sum of its two children.
+    The leaves hold the priorities. Sampling a leaf in proportion
+    to its priority and updating a priority both take O(log n),
+    and both work on whole batches at once.
+    """
+
+    def __init__(self, capacity, rng=None):
+        if rng is None:
+            rng = np.random.default_rng(np.random.randint(2**31))
+        self.rng = rng
+        # Round the number of leaves up to a power of two, so that
+        # every leaf is at the same depth.
+        self.depth = int(np.ceil(np.log2(max(capacity, 2))))
+        self.n_leaves = 2**self.depth
+        # Node 1 is the root. The children of node i are 2i and 2i + 1.
+        # Node 0 is unused.
+        self.nodes = np.zeros(2 * self.n_leaves)
+
+    def total(self):
+        return self.nodes[1]
+
+    def update(self, i_leaves, priorities):
+        i_nodes = i_leaves + self.n_leaves
+        self.nodes[i_nodes] = priorities
+        for _ in range(self.depth):
+            i_nodes = np.unique(i_nodes // 2)
+            self.nodes[i_nodes] = self.nodes[2 * i_nodes] + self.nodes[2 * i_nodes + 1]
+
+    def sample(self, batch_size):
+        targets = self.rng.uniform(0, self.total(), size=batch_size)
+        i_nodes = np.ones(batch_size, dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * i_nodes
+            go_right = targets >= self.nodes[left]
+            targets = np.where(go_right, targets - self.nodes[left], targets)
+            i_nodes = left + go_right
+        # Rounding error can occasionally walk off into an empty leaf.
+        # Clip back to the last leaf with any priority.
+        i_leaves = i_nodes - self.n_leaves
+        i_last = np.max(np.flatnonzero(self.nodes[self.n_leaves :]))
+        return np.minimum(i_leaves, i_last)
+
+
+def replay_q_learning(
+    buffer,
+    q_values,
+    batch_size,
+    learning_rate,
+    discount_factor,
+):
+    """
+    Apply one batch of Q-learning updates to a `QTable`
+    from transitions sampled out of a `ReplayBuffer`.
+
+    All the TD errors are calculated from the values as they were before
+    the batch. When a state-action pair turns up more than once in a batch,
+    its updates add together.
+
+    Returns
+    -------
+    td_errors: array of floats
+    """
+    i_transitions, states, actions, rewards, next_states = buffer.sample(batch_size)
+    values = q_values.values
+    targets = rewards + discount_factor * np.max(values[next_states], axis=1)
+    td_errors = targets - values[states, actions]
+    np.add.at(values, (states, actions), learning_rate * td_errors)
+    buffer.update_priorities(i_transitions, td_errors)
+    return td_errors
@@ -0,0 +1,87 @@
+import contextlib
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+_default_n_stripes = 64
+
+
+class SharedTables:
+    """
+    A set of named two-dimensional arrays that live in shared memory,
+    so that agents in several worker processes can all learn into the same
+    tables at once, as in asynchronous Q-learning. See `myrtle.async_q`.
+
+    Create it in the driver, from arrays holding the starting values,
+    and hand it to the workers as a `Process` argument. Each worker gets
+    NumPy views of the arrays by indexing, `tables["q_values"]`,
+    and writes to them in place. Each array keeps the dtype it arrived in.
+
+    Updates are guarded by striped locks. Row `i` belongs to stripe
+    `i % n_stripes`, and `lock(rows)` holds the stripes covering `rows`.
+    Two workers only wait on each other when their rows share a stripe,
+    so with many more stripes than workers there is little contention.
+    With `n_stripes=0` there are no locks at all. Updates can then
+    occasionally overwrite each other, which asynchronous Q-learning
+    tolerates, and nobody ever waits.
+    """
+
+    def __init__(self, arrays, n_stripes=_default_n_stripes):
+        self.shapes = {}
+        self.dtypes = {}
+        self.memory = {}
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            self.shapes[name] = array.shape
+            self.dtypes[name] = array.dtype
+            self.memory[name] = shared_memory.SharedMemory(
+                create=True, size=max(array.nbytes, 1)
+            )
+            self[name][:] = array
+        self.locks = [mp.Lock() for _ in range(n_stripes)]
+
+    def __getitem__(self, name):
+        return np.ndarray(
+            self.shapes[name], dtype=self.dtypes[name], buffer=self.memory[name].buf
+        )
+
+    def names(self):
+        return self.memory.keys()
+
+    def lock(self, rows):
+        """
+        A context manager holding the locks for all of `rows`.
+        Stripes are always acquired in the same order, so two workers
+        locking overlapping sets of rows can't deadlock.
+        """
+        stack = contextlib.ExitStack()
+        if len(self.locks) == 0:
+            return stack
+        for i_stripe in np.unique(np.asarray(rows) % len(self.locks)):
+            stack.enter_context(self.locks[i_stripe])
+        return stack
+
+    def close(self):
+        """
+        Let go of the shared memory in this process. Any views of the arrays
+        need to be dropped first.
+        """
+        for memory in self.memory.values():
+            memory.close()
+
+    def unlink(self):
+        """
+        Free the shared memory, once every process is done with it.
+        """
+        for memory in self.memory.values():
+            memory.unlink()
+
+
+def lock_rows(tables, rows):
+    """
+    Lock `rows` in `tables` if the agent has shared tables,
+    and do nothing if it doesn't.
+    """
+    if tables is None:
+        return contextlib.nullcontext()
+    return tables.lock(rows)
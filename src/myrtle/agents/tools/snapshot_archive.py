@@ -0,0 +1,235 @@
+import json
+import os
+import queue
+from threading import Thread
+import numpy as np
+
+# How many snapshots can be staged, waiting to be written, before new ones
+# start getting dropped.
+_default_n_staging = 4
+# How long closing waits on the writer thread before giving up on it.
+_shutdown_timeout = 5.0  # seconds
+
+_index_filename = "index.json"
+_steps_filename = "steps.dat"
+
+
+class DeferredArray:
+    """
+    An array for a snapshot that gets built on the writer thread,
+    rather than by the agent. `function(*args)` returns it, with the given
+    `shape` and `dtype`. The arguments get captured when the snapshot is
+    taken, so they need to be copies the agent won't go on changing.
+
+    This keeps large arrays that are cheap to describe, like the dense
+    energies of a block-sparse Ziptie, off the agent's thread.
+    """
+
+    def __init__(self, shape, dtype, function, *args):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.function = function
+        self.args = args
+
+    def build(self):
+        return np.asarray(self.function(*self.args), dtype=self.dtype)
+
+
+class SnapshotWriter:
+    """
+    Appends snapshots of an agent's internal arrays to an archive on disk,
+    without making the agent wait on the file system.
+
+    Each call to snapshot() stages just the elements of each array that
+    have changed since the last staged snapshot, as their flat indices and
+    new values, and hands them to a background thread. The thread keeps
+    its own full copy of each array, brings it up to date, and appends it
+    to the archive. Large arrays that change a little at a time, like
+    a Ziptie's energies, stage only a small fraction of their size.
+    A `DeferredArray` gets staged as is and built on the thread.
+    If the writer falls behind and `n_staging` snapshots are already waiting,
+    the snapshot is dropped rather than delaying the agent.
+
+    Creating the directory, writing the index, and opening the files
+    all happen on the background thread too.
+
+    An archive is a directory holding one raw binary file per array,
+    each record appended after the last, a file with the step and episode
+    of each record, and an `index.json` with the names, shapes, and dtypes
+    of the arrays. Each new writer starts a fresh archive, overwriting
+    whatever was in the directory before. Use `read_snapshots()` to get it
+    back as memory-mapped arrays.
+
+    The arrays in a snapshot need to have the same names, shapes,
+    and dtypes every time. Once a writer is closed, its archive is
+    finished, and taking another snapshot is an error.
+    """
+
+    def __init__(self, directory, n_staging=_default_n_staging):
+        self.directory = directory
+        self.n_staging = n_staging
+        self.n_snapshots = 0
+        self.n_dropped = 0
+        self.closed = False
+
+        # The staging queue, the reference copies, and the writer thread
+        # can't be pickled, so they get created on the first snapshot,
+        # after the agent has been handed off to its own process.
+        self.backlog = None
+        self.worker = None
+
+    def __getstate__(self):
+        # The staged snapshots and the writer thread stay behind.
+        # A copy, like one passed to another process partway through a run,
+        # starts its own archive on its first snapshot.
+        state = self.__dict__.copy()
+        state.pop("reference", None)
+        state["backlog"] = None
+        state["worker"] = None
+        state["closed"] = False
+        return state
+
+    def snapshot(self, step, episode, **arrays):
+        """
+        Stage the changes to `arrays`, keyed by name, to be written
+        to the archive.
+        """
+        if self.closed:
+            raise RuntimeError(f"The snapshot archive in {self.directory} is closed")
+        if self.worker is None:
+            self.start(arrays)
+
+        if self.backlog.full():
+            self.n_dropped += 1
+            return
+
+        changes = {}
+        for name, array in arrays.items():
+            if isinstance(array, DeferredArray):
+                changes[name] = array
+                continue
+            reference = self.reference[name]
+            values = np.asarray(array).reshape(-1)
+            i_changed = np.flatnonzero(values != reference)
+            changes[name] = (i_changed, values[i_changed])
+            reference[i_changed] = changes[name][1]
+        self.backlog.put_nowait((step, episode, changes))
+        self.n_snapshots += 1
+
+    def start(self, arrays):
+        # The arrays as of the last staged snapshot, flattened.
+        # They start out as zeros, which cost nothing until they're touched.
+        self.index = {}
+        self.reference = {}
+        for name, array in arrays.items():
+            if isinstance(array, DeferredArray):
+                self.index[name] = {
+                    "shape": list(array.shape),
+                    "dtype": array.dtype.str,
+                }
+                continue
+            array = np.asarray(array)
+            self.index[name] = {"shape": list(array.shape), "dtype": array.dtype.str}
+            self.reference[name] = np.zeros(array.size, dtype=array.dtype)
+
+        self.backlog = queue.Queue(maxsize=self.n_staging)
+        self.worker = Thread(target=self.work, daemon=True)
+        self.worker.start()
+
+    def work(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, _index_filename), "wt") as f:
+            json.dump(self.index, f)
+        files = {
+            name: open(os.path.join(self.directory, f"{name}.dat"), "wb")
+            for name in self.index
+        }
+        steps_file = open(os.path.join(self.directory, _steps_filename), "wb")
+        current = {
+            name: np.zeros(int(np.prod(info["shape"])), dtype=info["dtype"])
+            for name, info in self.index.items()
+        }
+
+        while True:
+            staged = self.backlog.get()
+            if staged is None:
+                break
+
+            step, episode, changes = staged
+            for name, f in files.items():
+                if isinstance(changes[name], DeferredArray):
+                    current[name][:] = changes[name].build().reshape(-1)
+                else:
+                    i_changed, values = changes[name]
+                    current[name][i_changed] = values
+                f.write(current[name].tobytes())
+                f.flush()
+            # The step gets written last. Readers only trust the records
+            # that it covers, so a partially written snapshot is never read.
+            steps_file.write(np.array([step, episode], dtype=np.int64).tobytes())
+            steps_file.flush()
+
+        for f in files.values():
+            f.close()
+        steps_file.close()
+
+    def close(self):
+        """
+        Finish writing any staged snapshots and close the archive.
+        If the writer thread has died or stalled, don't wait on it forever.
+        Whatever it hasn't written by then is lost.
+        """
+        self.closed = True
+        if self.worker is None:
+            return
+        try:
+            # There's only room once the writer has taken a staged snapshot.
+            self.backlog.put(None, timeout=_shutdown_timeout)
+        except queue.Full:
+            pass
+        self.worker.join(_shutdown_timeout)
+        self.worker = None
+
+
+def read_snapshots(directory):
+    """
+    Open an archive created by a `SnapshotWriter`.
+
+    Parameters
+    ----------
+    directory: str
+
+    Returns
+    -------
+    steps: array of ints
+        The step at which each snapshot was taken.
+    episodes: array of ints
+        The episode in which each snapshot was taken.
+    arrays: dict of arrays
+        Keyed by name. Each is a read-only memory-mapped array
+        of shape (n_snapshots, *array_shape).
+    """
+    with open(os.path.join(directory, _index_filename), "rt") as f:
+        index = json.load(f)
+
+    steps_path = os.path.join(directory, _steps_filename)
+    n_snapshots = os.path.getsize(steps_path) // (2 * np.dtype(np.int64).itemsize)
+    if n_snapshots == 0:
+        steps = np.zeros((0, 2), dtype=np.int64)
+    else:
+        steps = np.memmap(steps_path, dtype=np.int64, mode="r", shape=(n_snapshots, 2))
+
+    arrays = {}
+    for name, info in index.items():
+        shape = (n_snapshots,) + tuple(info["shape"])
+        if n_snapshots == 0:
+            arrays[name] = np.zeros(shape, dtype=info["dtype"])
+        else:
+            arrays[name] = np.memmap(
+                os.path.join(directory, f"{name}.dat"),
+                dtype=info["dtype"],
+                mode="r",
+                shape=shape,
+            )
+
+    return steps[:, 0], steps[:, 1], arrays
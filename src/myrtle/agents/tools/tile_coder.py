@@ -0,0 +1,131 @@
+import numpy as np
+
+_default_n_tilings = 8
+_default_n_tiles = 8
+_default_n_rows = 4096
+
+
+class TileCoder:
+    """
+    Turns a vector of continuous sensor readings into a small set of
+    row indices, one per tiling, so that a tabular agent can use
+    a fixed-size table on a continuous world.
+
+    Each tiling chops the sensor space into a grid of tiles, `n_tiles` across
+    the range from `lows` to `highs` in each dimension. The tilings are
+    offset from each other by fractions of a tile, so nearby readings share
+    most of their tiles and distant readings share few or none.
+    This is how learning about one state generalizes to its neighbors.
+
+    Rather than allocate a row for every tile in every tiling,
+    the tile coordinates are hashed into `n_rows` rows. Memory stays
+    fixed no matter how many sensors there are or how far the readings
+    wander outside of `lows` and `highs`. Readings outside that range
+    just land in tiles further out. Hash collisions are rare when
+    `n_rows` is large compared to the number of tiles actually visited,
+    and with several tilings a single collision does little damage.
+
+    All tilings are encoded at once, so `encode()` is a handful of
+    array operations on an (n_tilings, n_sensors) array.
+    """
+
+    def __init__(
+        self,
+        lows,
+        highs,
+        n_tilings=_default_n_tilings,
+        n_tiles=_default_n_tiles,
+        n_rows=_default_n_rows,
+        seed=0,
+    ):
+        self.lows = np.asarray(lows, dtype=float)
+        self.highs = np.asarray(highs, dtype=float)
+        self.n_sensors = self.lows.size
+        self.n_tilings = int(n_tilings)
+        self.n_tiles = int(n_tiles)
+        self.n_rows = int(n_rows)
+
+        self.tile_widths = (self.highs - self.lows) / self.n_tiles
+
+        # Offset each tiling by a different fraction of a tile in
+        # each dimension. Stepping each dimension by a different odd multiple
+        # keeps the tilings from all lining up along the diagonal.
+        # (Miller and Glanz's asymmetric offsets, as recommended in
+        # Sutton and Barto, section 9.5.4.)
+        i_tilings = np.arange(self.n_tilings)[:, np.newaxis]
+        odd_steps = 2 * np.arange(self.n_sensors)[np.newaxis, :] + 1
+        self.offsets = np.mod(i_tilings * odd_steps / self.n_tilings, 1.0)
+
+        # Random odd multipliers for hashing tile coordinates, a different
+        # set for each tiling, so that the same coordinates in two
+        # tilings land in different rows.
+        rng = np.random.default_rng(seed)
+        self.multipliers = (
+            rng.integers(
+                0, 2**63, size=(self.n_tilings, self.n_sensors), dtype=np.uint64
+            )
+            | np.uint64(1)
+        )
+        self.salts = rng.integers(0, 2**63, size=self.n_tilings, dtype=np.uint64)
+
+    def encode(self, sensors):
+        """
+        Parameters
+        ----------
+        sensors: array of floats
+            Of size `n_sensors`.
+
+        Returns
+        -------
+        rows: array of ints
+            One row index for each tiling.
+        """
+        scaled = (np.asarray(sensors, dtype=float) - self.lows) / self.tile_widths
+        coords = np.floor(scaled[np.newaxis, :] + self.offsets).astype(np.int64)
+
+        # Multiply-add hashing on 64 bit unsigned ints, which wrap around
+        # rather than overflow. The xor-shift mixes the well-shuffled high
+        # bits down into the low bits that the modulo keeps.
+        hashes = (
+            np.sum(coords.astype(np.uint64) * self.multipliers, axis=1) + self.salts
+        )
+        hashes ^= hashes >> np.uint64(31)
+        return (hashes % np.uint64(self.n_rows)).astype(np.int64)
+
+
+def make_tile_coder(n_sensors, sensor_lows=None, sensor_highs=None, **kwargs):
+    """
+    A `TileCoder` for an agent's sensors. `sensor_lows` and `sensor_highs`
+    default to [0, 1] for each sensor.
+    """
+    if sensor_lows is None:
+        sensor_lows = np.zeros(n_sensors)
+    if sensor_highs is None:
+        sensor_highs = np.ones(n_sensors)
+    return TileCoder(sensor_lows, sensor_highs, **kwargs)
+
+
+def update_tiled_q_values(
+    q_values,
+    previous_rows,
+    previous_action,
+    rows,
+    reward,
+    learning_rate,
+    discount_factor,
+):
+    """
+    One Q-learning update on a table of (n_rows, n_actions) values,
+    where a state's values are the average over its tile coded rows.
+    Every one of the previous state's rows gets the same nudge.
+
+    When two tilings hash to the same row, that row gets nudged once
+    for each of them. Plain fancy indexing would keep only one.
+    """
+    max_value = np.max(np.mean(q_values[rows], axis=0))
+    previous_value = np.mean(q_values[previous_rows, previous_action])
+    np.add.at(
+        q_values,
+        (previous_rows, previous_action),
+        learning_rate * (reward + discount_factor * max_value - previous_value),
+    )
@@ -0,0 +1,192 @@
+import queue
+from threading import Event, Lock, Thread
+import numpy as np
+from ziptie.algo import update_bundles_numba
+
+# How many sets of cable activities can be waiting for the background
+# structure learner before new ones start getting dropped.
+_default_max_backlog = 1000
+# How long close() waits for the worker to finish what it's doing.
+_shutdown_timeout = 5.0  # seconds
+
+
+class ZiptieStructureLearner:
+    """
+    Splits a Ziptie into a fast path and a slow path.
+
+    The fast path, step(), calculates bundle activities from the cable
+    activities using the most recently published bundle mapping.
+    The slow path--accumulating nucleation and agglomeration energy and
+    creating new bundles--runs on the cable and bundle activities
+    collected by the fast path, either every `structure_interval` steps
+    or continuously in a background thread.
+
+    With `structure_interval=1` and `background=False` it behaves like
+    calling `create_new_bundles()`, `grow_bundles()`, and `update_bundles()`
+    on the Ziptie each step.
+
+    With `background=True` the structural learning happens on a worker
+    thread. The agent spends most of its wall clock time waiting on the
+    world, so this puts that otherwise idle time to use and
+    keeps the cost of structure learning off the agent's action latency.
+    The worker has a bounded backlog. If it falls behind, the newest
+    cable activities are dropped rather than delaying the agent.
+
+    Worker threads only run alongside the agent when the Ziptie's kernels
+    release the GIL while they run. BlockZiptie's do. A stock Ziptie's
+    don't, so with a stock Ziptie the worker and the agent take turns.
+
+    Anything else that reads the Ziptie while the worker might be
+    changing it, like snapshots and reports, should hold `lock`
+    while it does.
+    """
+
+    def __init__(
+        self,
+        ziptie,
+        structure_interval=1,
+        background=False,
+        max_backlog=_default_max_backlog,
+    ):
+        self.ziptie = ziptie
+        self.structure_interval = int(structure_interval)
+        self.background = background
+        self.max_backlog = max_backlog
+
+        self.i_step = 0
+        self.pending = []
+        self.n_dropped = 0
+
+        # The worker thread and its queue can't be pickled, so they get
+        # created on the first step, after the agent has been handed off
+        # to its own process.
+        self.backlog = None
+        self.worker = None
+        self.stopping = Event()
+        self.lock = Lock()
+
+        self.publish()
+
+    def __getstate__(self):
+        # A copy, like one passed to another process partway through a run,
+        # starts its own worker. Any backlog stays behind.
+        state = self.__dict__.copy()
+        state["backlog"] = None
+        state["worker"] = None
+        del state["stopping"]
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.stopping = Event()
+        self.lock = Lock()
+
+    def step(self, cable_activities):
+        """
+        Calculate bundle activities and pass the cable activities on to
+        the structure learner.
+
+        Parameters
+        ----------
+        cable_activities: array of floats
+
+        Returns
+        -------
+        bundle_activities: array of floats
+        """
+        # The published mapping is swapped out in a single assignment,
+        # so it can be read safely while the worker is creating bundles.
+        mapping, n_cables_by_bundle = self.published
+        n_bundles = n_cables_by_bundle.size
+        bundle_activities = np.zeros(n_bundles)
+        update_bundles_numba(
+            cable_activities.copy(),
+            bundle_activities,
+            self.ziptie.activity_deadzone,
+            n_bundles,
+            mapping,
+            n_cables_by_bundle,
+        )
+
+        if self.ziptie.n_bundles < self.ziptie.n_bundles_max:
+            activities = (cable_activities.copy(), bundle_activities.copy())
+            if self.background:
+                self.submit(activities)
+            else:
+                self.pending.append(activities)
+                self.i_step += 1
+                if self.i_step % self.structure_interval == 0:
+                    for cable_acts, bundle_acts in self.pending:
+                        self.learn(cable_acts, bundle_acts)
+                    self.pending = []
+
+        return bundle_activities
+
+    def submit(self, activities):
+        if self.worker is None:
+            self.backlog = queue.Queue(maxsize=self.max_backlog)
+            self.worker = Thread(target=self.work, daemon=True)
+            self.worker.start()
+        try:
+            self.backlog.put_nowait(activities)
+        except queue.Full:
+            self.n_dropped += 1
+
+    def work(self):
+        while not self.stopping.is_set():
+            activities = self.backlog.get()
+            if activities is None:
+                break
+            cable_acts, bundle_acts = activities
+            self.learn(cable_acts, bundle_acts)
+
+    def close(self):
+        """
+        Stop the worker, if there is one, and wait for it to finish
+        the set of activities it's working on. Anything still in
+        the backlog is dropped.
+        """
+        if self.worker is None:
+            return
+        self.stopping.set()
+        try:
+            # Wake the worker up if it's waiting on an empty backlog.
+            self.backlog.put_nowait(None)
+        except queue.Full:
+            pass
+        self.worker.join(_shutdown_timeout)
+        self.worker = None
+        self.backlog = None
+
+    def learn(self, cable_activities, bundle_activities):
+        """
+        Accumulate nucleation and agglomeration energy for one set of
+        activities, create any new bundles, and publish the new mapping.
+        """
+        if self.ziptie.n_bundles == self.ziptie.n_bundles_max:
+            return
+
+        with self.lock:
+            self.ziptie.cable_activities = cable_activities
+            self.ziptie.bundle_activities = bundle_activities
+            n_bundles = self.ziptie.n_bundles
+            self.ziptie.create_new_bundles()
+            self.ziptie.grow_bundles()
+            if self.ziptie.n_bundles != n_bundles:
+                self.publish()
+
+    def publish(self):
+        """
+        Make a compact copy of the bundle mapping for the fast path to use.
+        Only the rows of existing bundles and the columns
+        they occupy are needed.
+        """
+        n_bundles = self.ziptie.n_bundles
+        n_cables_by_bundle = self.ziptie.n_cables_by_bundle[:n_bundles].copy()
+        if n_bundles > 0:
+            max_cables = np.max(n_cables_by_bundle)
+        else:
+            max_cables = 0
+        mapping = self.ziptie.mapping[:n_bundles, :max_cables].copy()
+        self.published = (mapping, n_cables_by_bundle)
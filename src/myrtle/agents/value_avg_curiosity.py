@@ -1,5 +1,6 @@
 import numpy as np
 from myrtle.agents.base_agent import BaseAgent
+from myrtle.rewards import total_reward
 
 
 class ValueAvgCuriosity(BaseAgent):
@@ -30,46 +31,49 @@ class ValueAvgCuriosity(BaseAgent):
         # Keys are sets of sensor readings.
         # Because we can't hash on Numpy arrays for the dict,
         # always use sensor_array.tobytes() as the key.
-        self.q_values = {np.zeros(self.n_sensors).tobytes(): np.zeros(self.n_actions)}
+        self.q_values = {
+            np.zeros(self.n_sensors).tobytes(): self.zero_values(self.n_actions)
+        }
 
         # Store state-action counts as a dict, too.
-        self.counts = {np.zeros(self.n_sensors).tobytes(): np.zeros(self.n_actions)}
+        self.counts = {
+            np.zeros(self.n_sensors).tobytes(): self.zero_counts(self.n_actions)
+        }
 
         # And the curiosity associated with each state-action pair as well.
         self.curiosities = {
-            np.zeros(self.n_sensors).tobytes(): np.zeros(self.n_actions)
+            np.zeros(self.n_sensors).tobytes(): self.zero_values(self.n_actions)
         }
 
     def reset(self):
         self.sensors = np.zeros(self.n_sensors)
         self.previous_sensors = np.zeros(self.n_sensors)
-        self.actions = np.zeros(self.n_actions)
-        self.rewards = [0] * self.n_rewards
+        self.actions = self.zero_actions()
+        self.rewards = np.zeros(self.n_rewards)
         # self.reward_history = [0] * self.report_steps
 
-    def choose_action(self):
+    def perceive(self):
+        # Because we can't hash on Numpy arrays for the dicts,
+        # use the bytes of the sensors as the key.
+        self.state = self.sensor_key()
+        if self.state not in self.q_values:
+            self.q_values[self.state] = self.zero_values(self.n_actions)
+            self.counts[self.state] = self.zero_counts(self.n_actions)
+            self.curiosities[self.state] = self.zero_values(self.n_actions)
+
+    def learn(self):
         # Update the running total of actions taken and how much reward they generate.
-        reward = 0.0
-        for reward_channel in self.rewards:
-            if reward_channel is not None:
-                reward += reward_channel
+        reward = total_reward(self.rewards)
 
         # self.reward_history.append(reward)
         # self.reward_history.pop(0)
 
-        if self.sensors.tobytes() not in self.q_values:
-            self.q_values[self.sensors.tobytes()] = np.zeros(self.n_actions)
-            self.counts[self.sensors.tobytes()] = np.zeros(self.n_actions)
-            self.curiosities[self.sensors.tobytes()] = np.zeros(self.n_actions)
-
-        # Find the maximum expected value to come out of the next action.
-        values = self.q_values[self.sensors.tobytes()]
-        max_value = np.max(values)
-
         # Find the action that was taken. Assume it was only one action.
         # (In it's current implementation, there will never be more than one.)
         try:
-            previous_action = np.where(self.actions > self.action_threshold)[0][0]
+            previous_action = np.where(
+                self.previous_actions > self.action_threshold
+            )[0][0]
             previous_count = self.counts[self.previous_sensors.tobytes()][
                 previous_action
             ]
@@ -81,17 +85,22 @@ class ValueAvgCuriosity(BaseAgent):
         except IndexError:
             pass
 
+        # Make sure to make a copy here, so that previous_sensors and sensors don't
+        # end up pointing at the same Numpy Array object.
+        # Keep them in the form they arrived in, so that their keys match.
+        self.previous_sensors = self.copy_sensors()
+
+    def act(self):
+        values = self.q_values[self.state]
+
         # Calculate the curiosity associated with each action.
         # There's a small amount of intrinsic reward associated with
         # satisfying curiosity.
-        count = self.counts[self.sensors.tobytes()]
+        count = self.counts[self.state]
         # uncertainty = 1 / (count + 1)
-        uncertainty = 1 / (count**2 + 1)
-        self.curiosities[self.sensors.tobytes()] = (
-            self.curiosities[self.sensors.tobytes()]
-            + uncertainty * self.curiosity_scale
-        )
-        curiosity = self.curiosities[self.sensors.tobytes()]
+        uncertainty = 1 / (np.square(count, dtype=float) + 1)
+        self.curiosities[self.state] += uncertainty * self.curiosity_scale
+        curiosity = self.curiosities[self.state]
 
         # Find the most valuable action, including the influence of curiosity
         max_value = np.max(values + curiosity)
@@ -99,15 +108,11 @@ class ValueAvgCuriosity(BaseAgent):
         # In the case where there are multiple matches for the highest value,
         # randomly pick one of them. This is especially useful
         # in the beginning when all the values are zero.
-        i_action = np.random.choice(np.where((values + curiosity) == max_value)[0])
+        i_action = self.rng.choice(np.where((values + curiosity) == max_value)[0])
 
-        self.actions = np.zeros(self.n_actions)
+        self.actions = self.zero_actions()
         self.actions[i_action] = 1
 
         # Reset the curiosity counter on the selected state-action pair.
-        self.curiosities[self.sensors.tobytes()][i_action] = 0
-        self.counts[self.sensors.tobytes()][i_action] += 1
-
-        # Make sure to make a copy here, so that previous_sensors and sensors don't
-        # end up pointing at the same Numpy Array object.
-        self.previous_sensors = self.sensors.copy()
+        self.curiosities[self.state][i_action] = 0
+        self.counts[self.state][i_action] += 1
@@ -0,0 +1,195 @@
+"""
+Asynchronous Q-learning, with one set of tables and many worlds.
+
+Several worker processes each run their own world and their own copy of
+the agent, on a `VirtualClock`. All the copies learn into the same value,
+count, and curiosity tables, kept in shared memory. What one worker learns,
+the others act on right away, so a single learner gathers experience
+from many worlds at once and learning goes faster the more cores there are.
+
+The tables have to have a fixed size to be shared, so the agents are
+tile coded. Any agent with a `share_tables()` method works, like
+`QLearningEpsilon` and `QLearningCuriosity`.
+
+```python
+from myrtle import async_q
+
+agent, rewards = async_q.run(QLearningCuriosity, Pendulum, n_workers=8)
+```
+"""
+
+import multiprocessing as mp
+import os
+import time
+import numpy as np
+import dsmq.client
+import dsmq.server
+from myrtle.agents.tools.shared_tables import SharedTables
+from myrtle.config import mq_host, mq_port
+from myrtle.virtual_clock import VirtualClock
+
+_default_n_stripes = 64
+_warmup_delay = 1.0  # seconds
+_shutdown_timeout = 1.0  # seconds
+
+
+def run(
+    Agent,
+    World,
+    n_workers=None,
+    n_steps=None,
+    agent_args={},
+    world_args={},
+    agent_latency=0.0,
+    n_stripes=_default_n_stripes,
+    seed=None,
+):
+    """
+    n_workers (int or None)
+    How many world and agent pairs to run at once, each in its own process.
+    Defaults to the number of CPUs.
+
+    n_steps (int or None)
+    How many loop steps each worker runs. Defaults to all of
+    the world's episodes.
+
+    agent_args (dict)
+    Passed to every copy of the agent, along with `tile_coding=True`.
+
+    agent_latency (float or function)
+    How the agent's response time is simulated. See `VirtualClock`.
+
+    n_stripes (int)
+    How many locks guard the rows of the shared tables. See `SharedTables`.
+    With 0, updates aren't locked at all.
+
+    seed (int or None)
+    Every worker's world, agent, and clock get seeds derived from this.
+    If None, one is drawn from NumPy's global random state.
+    The workers' steps interleave differently from run to run,
+    so even with a seed, runs don't repeat exactly.
+
+    Returns an agent holding what all the workers learned together,
+    and the total reward each worker collected.
+    """
+    if not hasattr(Agent, "share_tables"):
+        raise ValueError(f"{Agent.name} agents can't share their tables.")
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    if seed is None:
+        seed = np.random.randint(2**31)
+    seeds = np.random.SeedSequence(seed).spawn(n_workers + 1)
+    agent_args = {"tile_coding": True} | agent_args
+
+    # This agent sets the size and starting values of the shared tables,
+    # and gets a copy of them once the workers are done.
+    world = World(**world_args)
+    agent = _make_agent(
+        Agent, world, {"seed": int(seeds[0].generate_state(1)[0])} | agent_args
+    )
+    world.close()
+    tables = SharedTables(
+        {name: getattr(agent, name) for name in agent.tiled_tables}, n_stripes
+    )
+
+    # Some worlds and agents publish to the mq, so give them a server.
+    p_mq_server = mp.Process(target=dsmq.server.serve, args=(mq_host, mq_port))
+    p_mq_server.start()
+    time.sleep(_warmup_delay)
+
+    connections = []
+    processes = []
+    try:
+        for i_worker in range(n_workers):
+            driver_end, worker_end = mp.Pipe()
+            p_worker = mp.Process(
+                target=_worker,
+                args=(
+                    worker_end,
+                    tables,
+                    Agent,
+                    World,
+                    agent_args,
+                    world_args,
+                    n_steps,
+                    agent_latency,
+                    seeds[i_worker + 1].generate_state(3).tolist(),
+                ),
+            )
+            p_worker.start()
+            # Let go of the worker's end, so that if the worker dies,
+            # reading from the driver's end fails rather than waiting forever.
+            worker_end.close()
+            connections.append(driver_end)
+            processes.append(p_worker)
+
+        rewards = [connection.recv() for connection in connections]
+
+        for name in agent.tiled_tables:
+            setattr(agent, name, np.array(tables[name]))
+
+    finally:
+        for p_worker in processes:
+            p_worker.join(_shutdown_timeout)
+            if p_worker.is_alive():
+                p_worker.kill()
+        tables.close()
+        tables.unlink()
+
+        mq_client = dsmq.client.connect(mq_host, mq_port)
+        mq_client.shutdown_server()
+        mq_client.close()
+        p_mq_server.join(_shutdown_timeout)
+        if p_mq_server.is_alive():
+            p_mq_server.kill()
+
+    return agent, rewards
+
+
+def _worker(
+    connection,
+    tables,
+    Agent,
+    World,
+    agent_args,
+    world_args,
+    n_steps,
+    agent_latency,
+    seeds,
+):
+    """
+    Run one world and agent pair, learning into the shared tables.
+    """
+    world_seed, agent_seed, clock_seed = seeds
+    world = World(**({"seed": world_seed} | world_args))
+    # The tile coders all hash the same way, whatever the agent's seed,
+    # so every copy of the agent finds a given state in the same rows.
+    agent = _make_agent(Agent, world, {"seed": agent_seed} | agent_args)
+    agent.share_tables(tables)
+    clock = VirtualClock(agent, world, agent_latency=agent_latency, seed=clock_seed)
+    world.initialize_mq()
+    agent.initialize_mq()
+
+    if n_steps is None:
+        n_steps = world.n_episodes * world.n_loop_steps
+    reward = clock.run_steps(n_steps)
+
+    world.close()
+    agent.close()
+    # Drop the views of the shared memory before letting go of it.
+    del clock, agent
+    tables.close()
+    connection.send(reward)
+
+
+def _make_agent(Agent, world, agent_args):
+    try:
+        n_rewards = world.n_rewards
+    except AttributeError:
+        n_rewards = 1
+    return Agent(
+        n_sensors=world.n_sensors,
+        n_actions=world.n_actions,
+        n_rewards=n_rewards,
+        **agent_args,
+    )
@@ -9,6 +9,7 @@ except RuntimeError:
     pass
 
 from importlib.metadata import version
+import inspect
 import json
 import sqlite3
 from threading import Thread
@@ -16,6 +17,7 @@ import time
 
 import dsmq.client
 import dsmq.server
+import numpy as np
 from myrtle.agents import base_agent
 from myrtle.config import (
     log_directory,
@@ -25,6 +27,9 @@ from myrtle.config import (
     mq_port,
 )
 from myrtle.monitors import server as monitor_server
+from myrtle.offline import load_agent
+from myrtle.rewards import total_reward
+from myrtle.virtual_clock import VirtualClock
 from myrtle.worlds import base_world
 from pacemaker.pacemaker import Pacemaker
 from sqlogging import logging
@@ -47,6 +52,12 @@ def run(
     agent_args={},
     world_args={},
     verbose=False,
+    virtual_clock=False,
+    agent_latency=None,
+    seed=None,
+    trace_path=None,
+    warm_start=None,
+    agent_deadline=False,
 ):
     """
     log_to_db (bool)
@@ -60,7 +71,41 @@ def run(
     How long in seconds the world and agent are allowed to run
     If None, then there is no timeout.
 
+    virtual_clock (bool)
+    If True, run the world and agent together in this process on simulated
+    time, as fast as they can go, rather than in real time. The agent's
+    response time is still accounted for, as described in `VirtualClock`.
+    `timeout` doesn't apply.
+
+    agent_latency (None, float, or function)
+    How to simulate the agent's response time on a virtual clock.
+    See `VirtualClock` for the options.
+
+    seed (int or None)
+    If given, separate seeds for the world, the agent, and the virtual
+    clock are all derived from it. Seeds in `world_args` or `agent_args`
+    take precedence. On a virtual clock with a fixed or simulated
+    `agent_latency`, the same seed gives the same run.
+
+    trace_path (str or None)
+    If given, the agent records every step it takes to this directory.
+    See `myrtle.trace`.
+
+    warm_start (agent, str, or None)
+    An agent of the same class that has already been trained, for example
+    offline with `myrtle.offline`, or the path it was saved to with
+    `offline.save_agent()`. The new agent picks up where it left off.
+
+    agent_deadline (bool)
+    If True, the agent is told the world's loop period, so that it can send
+    a fallback action when a step runs long. See `BaseAgent.check_deadline()`.
+    The agent has to accept a `loop_period` argument, as agents built on
+    `BaseAgent.init_common()` do. Off by default. It doesn't apply
+    on a virtual clock.
     """
+    if agent_deadline and not _accepts_argument(Agent, "loop_period"):
+        raise ValueError(f"{Agent.name} agents can't be given a deadline.")
+
     print(f"""
 
     Myrtle workbench version {version("myrtle")}
@@ -94,6 +139,32 @@ def run(
 
     time.sleep(_warmup_delay)
 
+    if seed is not None:
+        world_seed, agent_seed, clock_seed = np.random.SeedSequence(
+            seed
+        ).generate_state(3)
+        world_args = {"seed": int(world_seed)} | world_args
+        agent_args = {"seed": int(agent_seed)} | agent_args
+        seed = int(clock_seed)
+    if trace_path is not None:
+        agent_args = agent_args | {"trace_path": trace_path}
+
+    if virtual_clock:
+        return _run_virtual(
+            Agent,
+            World,
+            p_mq_server,
+            p_monitor,
+            log_to_db,
+            logging_db_name,
+            agent_args,
+            world_args,
+            agent_latency,
+            seed,
+            warm_start,
+            verbose,
+        )
+
     # Queues are the dedicated channels for agent and world to communicate
     # with each other, forming a tighter, faster, and more predictable loop
     # than the dsmq message queue.
@@ -117,12 +188,25 @@ def run(
     except AttributeError:
         n_rewards = 1
 
+    # If asked to, let the agent know how much wall clock time
+    # it has for each step.
+    if agent_deadline:
+        agent_args = agent_args | {"loop_period": world.loop_period / world.speedup}
+
+    # Batched worlds simulate several instances at once. Let the agent know
+    # how many. Only batched agents will be expecting this.
+    try:
+        agent_args = agent_args | {"n_worlds": world.n_worlds}
+    except AttributeError:
+        pass
+
     agent = Agent(
         n_sensors=n_sensors,
         n_actions=n_actions,
         n_rewards=n_rewards,
         **agent_args,
     )
+    _warm_start(agent, warm_start)
 
     # Start up the logging thread, if it's called for.
     if log_to_db:
@@ -219,7 +303,88 @@ def run(
     return exitcode
 
 
-def _reward_logging(dbname, agent, world, verbose):
+def _accepts_argument(Agent, name):
+    parameters = inspect.signature(Agent).parameters.values()
+    return any(
+        parameter.name == name or parameter.kind == parameter.VAR_KEYWORD
+        for parameter in parameters
+    )
+
+
+def _warm_start(agent, warm_start):
+    if warm_start is None:
+        return
+    if isinstance(warm_start, base_agent.BaseAgent):
+        agent.warm_start(warm_start)
+    else:
+        agent.warm_start(load_agent(warm_start))
+
+
+def _run_virtual(
+    Agent,
+    World,
+    p_mq_server,
+    p_monitor,
+    log_to_db,
+    logging_db_name,
+    agent_args,
+    world_args,
+    agent_latency,
+    seed,
+    warm_start,
+    verbose,
+):
+    world = World(**world_args)
+    try:
+        n_rewards = world.n_rewards
+    except AttributeError:
+        n_rewards = 1
+    try:
+        agent_args = agent_args | {"n_worlds": world.n_worlds}
+    except AttributeError:
+        pass
+    agent = Agent(
+        n_sensors=world.n_sensors,
+        n_actions=world.n_actions,
+        n_rewards=n_rewards,
+        **agent_args,
+    )
+    _warm_start(agent, warm_start)
+
+    logger = None
+    if log_to_db:
+        logger = _open_logger(logging_db_name)
+
+    clock = VirtualClock(agent, world, agent_latency=agent_latency, seed=seed)
+    run_start_time = time.time()
+    clock.run(logger)
+    if verbose:
+        print(f"    virtual clock run took {time.time() - run_start_time:.1f} s")
+
+    if log_to_db:
+        logger.close()
+
+    exitcode = 0
+    monitor_server.shutdown()
+    time.sleep(_shutdown_wait)
+    if p_monitor.is_alive():
+        if verbose:
+            print("    monitor webserver didn't shutdown cleanly")
+        exitcode = 1
+        p_monitor.kill()
+
+    mq_control_client = dsmq.client.connect(mq_host, mq_port)
+    mq_control_client.shutdown_server()
+    mq_control_client.close()
+    if p_mq_server.is_alive():
+        if verbose:
+            print("    Doing a hard shutdown on mq server")
+        p_mq_server.kill()
+
+    return exitcode
+
+
+def _open_logger(dbname):
     # Spin up the sqlite database where results are stored.
     # If a logger already exists, use it.
     try:
@@ -240,8 +405,14 @@ def _reward_logging(dbname, agent, world, verbose):
                 "episode",
                 "ts_recv",
                 "ts_send",
+                "fallback",
             ],
         )
+    return logger
+
+
+def _reward_logging(dbname, agent, world, verbose):
+    logger = _open_logger(dbname)
     logging_pacemaker = Pacemaker(_logging_frequency)
 
     mq_logging_client = dsmq.client.connect(mq_host, mq_port)
@@ -274,14 +445,11 @@ def _reward_logging(dbname, agent, world, verbose):
             continue
         msg = json.loads(msg_str)
 
-        reward = 0.0
         try:
-            for reward_channel in msg["rewards"]:
-                if reward_channel is not None:
-                    reward += reward_channel
+            reward = total_reward(msg["rewards"])
         except KeyError:
             # Rewards not yet populated.
-            pass
+            reward = 0.0
 
         log_data = {
             "process": "world",
@@ -315,6 +483,10 @@ def _reward_logging(dbname, agent, world, verbose):
             "ts_recv": msg["ts_recv"],
             "ts_send": msg["ts_send"],
         }
+        # Databases started before fallbacks were logged don't have a column
+        # for them.
+        if "fallback" in logger.get_columns():
+            log_data["fallback"] = int(msg.get("fallback", False))
         logger.info(log_data)
 
     # Gracefully close down logger and mq_client
@@ -278,11 +278,9 @@ socket.onmessage = (event) => {
     // sum all rewards
     reward = 0.0;
     for (let i = 0; i < values.rewards.length; i++) {
-      try {
+      // Missing rewards arrive as null.
+      if (values.rewards[i] !== null) {
         reward += values.rewards[i];
-      } catch(err) {
-        // Handle the case where reward is absent
-        console.log(err);
       }
     }
     fastRewardHistory.push(reward);
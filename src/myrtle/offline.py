@@ -0,0 +1,120 @@
+"""
+Train agents on recorded traces, with no world and no wall clock.
+
+Learning from a trace runs as fast as the agent can learn. An agent trained
+this way can then be used as a warm start for a live run, with
+`bench.run(warm_start=...)`, rather than starting from scratch.
+
+```python
+agent = offline.train_sharded(QLearningEpsilon, "traces/run_1", n_workers=4)
+offline.save_agent(agent, "agents/q_learning_warm.pkl")
+bench.run(QLearningEpsilon, World, warm_start="agents/q_learning_warm.pkl")
+```
+"""
+
+import multiprocessing as mp
+import os
+import pickle
+from myrtle.trace import TraceReader, follow_step
+
+_default_chunk_size = 10_000
+
+
+def train(agent, trace_path, episodes=None, chunk_size=_default_chunk_size):
+    """
+    Train an agent on a trace, in place. The trace is read from disk
+    `chunk_size` steps at a time, so it doesn't have to fit in memory.
+
+    Each step goes through the agent's own `perceive()`, `act()`,
+    and `learn()`, or `choose_action()`, the same as in `trace.replay()`.
+    The agent learns from the recorded actions, rather than the ones
+    it chooses.
+
+    `episodes` is an optional list of which of the trace's episodes
+    to train on, counting from zero. By default, it trains on all of them.
+    """
+    reader = TraceReader(trace_path)
+    bounds = reader.episode_bounds()
+    if episodes is not None:
+        bounds = [bounds[i] for i in episodes]
+
+    for start, stop in bounds:
+        agent.i_episode = int(reader.episodes[start])
+        agent.reset()
+        for chunk in reader.chunks(chunk_size, start, stop):
+            for i in range(chunk["step"].size):
+                follow_step(
+                    agent,
+                    int(chunk["step"][i]),
+                    chunk["sensors"][i],
+                    chunk["rewards"][i],
+                    chunk["actions"][i],
+                )
+    return agent
+
+
+def train_sharded(
+    Agent,
+    trace_path,
+    agent_args={},
+    n_workers=None,
+    chunk_size=_default_chunk_size,
+):
+    """
+    Create an agent and train it on a trace, splitting the episodes
+    among a pool of worker processes.
+
+    Each worker trains its own copy of the agent on its share of the
+    episodes, and then all the copies are merged into one. Only agents
+    that know how to combine what they've learned, through a
+    `merge(others)` method, can be trained this way. The tabular Q-learning
+    agents can. Others are trained on all the episodes in this process.
+
+    `n_workers` defaults to the number of CPUs.
+    """
+    reader = TraceReader(trace_path)
+    agent_args = {
+        "n_sensors": reader.sensors.shape[-1],
+        "n_actions": reader.actions.shape[-1],
+        "n_rewards": reader.rewards.shape[-1],
+    } | agent_args
+    n_episodes = len(reader.episode_bounds())
+
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    n_workers = min(n_workers, n_episodes)
+    if n_workers <= 1 or not hasattr(Agent, "merge"):
+        return train(Agent(**agent_args), trace_path, chunk_size=chunk_size)
+
+    # Deal out the episodes in contiguous blocks.
+    shards = [
+        list(range(i * n_episodes // n_workers, (i + 1) * n_episodes // n_workers))
+        for i in range(n_workers)
+    ]
+    with mp.Pool(n_workers) as pool:
+        agents = pool.starmap(
+            _train_shard,
+            [(Agent, agent_args, trace_path, shard, chunk_size) for shard in shards],
+        )
+
+    agent = agents[0]
+    agent.merge(agents[1:])
+    return agent
+
+
+def _train_shard(Agent, agent_args, trace_path, episodes, chunk_size):
+    return train(Agent(**agent_args), trace_path, episodes, chunk_size)
+
+
+def save_agent(agent, path):
+    """
+    Save a trained agent, for use as a warm start later.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(agent, f)
+
+
+def load_agent(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
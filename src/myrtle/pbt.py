@@ -0,0 +1,296 @@
+"""
+Population-based training.
+
+A population of world and agent pairs run side by side, each in its own
+process, on a `VirtualClock`. They run in rounds. After each round,
+the members with the lowest reward take on a copy of what one of the
+top members has learned, and then nudge its hyperparameters up or down
+to try something a little different. Hyperparameters that work well
+spread through the population, and the schedule they follow over the run
+can change as the agents learn.
+
+```python
+from myrtle import pbt
+
+agent, lineage = pbt.run(
+    FNCBuckettreeZiptieOneStep,
+    PendulumDiscrete,
+    hyperparameters={
+        "curiosity_scale": (0.0, 0.5),
+        "exploitation_factor": (0.5, 2.0),
+        "model.reward_update_rate": (0.01, 0.5),
+    },
+)
+```
+"""
+
+import json
+import multiprocessing as mp
+import os
+import pickle
+import time
+import numpy as np
+import dsmq.client
+import dsmq.server
+from myrtle.agents.tools.snapshot_archive import SnapshotWriter
+from myrtle.config import log_directory, mq_host, mq_port
+from myrtle.virtual_clock import VirtualClock
+
+_default_n_members = 8
+_default_n_rounds = 20
+_default_steps_per_round = 1000
+_default_exploit_fraction = 0.25
+_default_perturb_factors = (0.8, 1.25)
+_default_lineage_path = os.path.join(log_directory, "pbt_lineage.jsonl")
+_default_snapshot_directory = os.path.join(log_directory, "pbt")
+_warmup_delay = 1.0  # seconds
+_shutdown_timeout = 1.0  # seconds
+
+
+def run(
+    Agent,
+    World,
+    hyperparameters,
+    n_members=_default_n_members,
+    n_rounds=_default_n_rounds,
+    steps_per_round=_default_steps_per_round,
+    exploit_fraction=_default_exploit_fraction,
+    perturb_factors=_default_perturb_factors,
+    agent_args={},
+    world_args={},
+    agent_latency=0.0,
+    seed=None,
+    lineage_path=_default_lineage_path,
+    snapshot_directory=_default_snapshot_directory,
+):
+    """
+    hyperparameters (dict)
+    The names of the agent attributes to tune, mapped to a (low, high) range
+    for their starting values. Attributes of the agent's parts can be
+    reached with dots, like "model.reward_update_rate". Values are set
+    directly on the attributes after the agent is created, so they are
+    in whatever units the agent stores them in.
+
+    steps_per_round (int)
+    How many loop steps each member runs between comparisons.
+
+    exploit_fraction (float)
+    The fraction of the population, from the bottom, that gets replaced
+    by copies of members from the top after each round. At most half.
+
+    perturb_factors (tuple of floats)
+    A copy's hyperparameters each get multiplied by one of these,
+    chosen at random.
+
+    agent_latency (float or function)
+    How the agent's response time is simulated. See `VirtualClock`.
+
+    seed (int or None)
+    Every member's world, agent, and clock, and the choices made
+    between rounds, get seeds derived from this. If None,
+    one is drawn from NumPy's global random state.
+
+    lineage_path (str or None)
+    Where to write a line of JSON for each member after each round,
+    with its reward, hyperparameters, and the member it was copied from,
+    if any.
+
+    snapshot_directory (str)
+    Agents that write snapshot archives write them here instead,
+    each member to its own `member_<i>` subdirectory, so that they don't
+    overwrite each other's.
+
+    Returns the agent that finished with the highest reward,
+    and the lineage records.
+    """
+    if n_rounds < 1:
+        raise ValueError(f"n_rounds needs to be at least 1, not {n_rounds}")
+
+    if seed is None:
+        seed = np.random.randint(2**31)
+    seeds = np.random.SeedSequence(seed).spawn(n_members + 1)
+    rng = np.random.default_rng(seeds[0])
+
+    values = [
+        {
+            name: float(rng.uniform(low, high))
+            for name, (low, high) in hyperparameters.items()
+        }
+        for _ in range(n_members)
+    ]
+    n_replace = min(int(exploit_fraction * n_members), n_members // 2)
+
+    if lineage_path is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(lineage_path)), exist_ok=True)
+        # Start a fresh lineage file. Each round gets appended to it.
+        with open(lineage_path, "wt"):
+            pass
+
+    # Some worlds and agents publish to the mq, so give them a server.
+    p_mq_server = mp.Process(target=dsmq.server.serve, args=(mq_host, mq_port))
+    p_mq_server.start()
+    time.sleep(_warmup_delay)
+
+    connections = []
+    processes = []
+    try:
+        for i_member in range(n_members):
+            driver_end, member_end = mp.Pipe()
+            p_member = mp.Process(
+                target=_member,
+                args=(
+                    member_end,
+                    Agent,
+                    World,
+                    agent_args,
+                    world_args,
+                    agent_latency,
+                    seeds[i_member + 1].generate_state(3).tolist(),
+                    os.path.join(snapshot_directory, f"member_{i_member}"),
+                ),
+            )
+            p_member.start()
+            # Let go of the member's end, so that if the member dies,
+            # reading from the driver's end fails rather than waiting forever.
+            member_end.close()
+            connections.append(driver_end)
+            processes.append(p_member)
+            driver_end.send(("set", values[i_member]))
+
+        lineage = []
+        parents = [None] * n_members
+        for i_round in range(n_rounds):
+            # Run all the members at once, then collect their average rewards.
+            for connection in connections:
+                connection.send(("run", steps_per_round))
+            rewards = [
+                connection.recv() / steps_per_round for connection in connections
+            ]
+
+            records = [
+                {
+                    "round": i_round,
+                    "member": i_member,
+                    "parent": parents[i_member],
+                    "reward": rewards[i_member],
+                    "hyperparameters": values[i_member],
+                }
+                for i_member in range(n_members)
+            ]
+            lineage += records
+            if lineage_path is not None:
+                with open(lineage_path, "at") as f:
+                    for record in records:
+                        f.write(json.dumps(record) + "\n")
+
+            if i_round == n_rounds - 1:
+                break
+
+            # Replace the bottom members with perturbed copies of the top ones.
+            # Agents pass from one process to another as pickled bytes,
+            # without being unpacked along the way.
+            parents = [None] * n_members
+            ranked = np.argsort(rewards)
+            top = ranked[n_members - n_replace :]
+            for i_member in ranked[:n_replace]:
+                i_parent = int(rng.choice(top))
+                connections[i_parent].send(("get", None))
+                agent_bytes = connections[i_parent].recv_bytes()
+
+                values[i_member] = {
+                    name: value * float(rng.choice(perturb_factors))
+                    for name, value in values[i_parent].items()
+                }
+                connections[i_member].send(("copy", None))
+                connections[i_member].send_bytes(agent_bytes)
+                connections[i_member].send(("set", values[i_member]))
+                parents[i_member] = i_parent
+
+        i_best = int(np.argmax(rewards))
+        connections[i_best].send(("get", None))
+        best_agent = pickle.loads(connections[i_best].recv_bytes())
+
+    finally:
+        for connection, p_member in zip(connections, processes):
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+            p_member.join(_shutdown_timeout)
+            if p_member.is_alive():
+                p_member.kill()
+
+        mq_client = dsmq.client.connect(mq_host, mq_port)
+        mq_client.shutdown_server()
+        mq_client.close()
+        p_mq_server.join(_shutdown_timeout)
+        if p_mq_server.is_alive():
+            p_mq_server.kill()
+
+    return best_agent, lineage
+
+
+def _member(
+    connection,
+    Agent,
+    World,
+    agent_args,
+    world_args,
+    agent_latency,
+    seeds,
+    snapshot_directory,
+):
+    """
+    Run one member of the population, following commands from the driver.
+    """
+    world_seed, agent_seed, clock_seed = seeds
+    world = World(**({"seed": world_seed} | world_args))
+    try:
+        n_rewards = world.n_rewards
+    except AttributeError:
+        n_rewards = 1
+    agent = Agent(
+        n_sensors=world.n_sensors,
+        n_actions=world.n_actions,
+        n_rewards=n_rewards,
+        **({"seed": agent_seed} | agent_args),
+    )
+    # Nothing gets written until the first snapshot, so there's still time
+    # to send each of the agent's archives to the member's own directory.
+    # They stay there through warm starts.
+    for writer in vars(agent).values():
+        if isinstance(writer, SnapshotWriter):
+            writer.directory = os.path.join(
+                snapshot_directory, os.path.basename(writer.directory)
+            )
+    clock = VirtualClock(agent, world, agent_latency=agent_latency, seed=clock_seed)
+    world.initialize_mq()
+    agent.initialize_mq()
+
+    while True:
+        command, argument = connection.recv()
+        if command == "run":
+            connection.send(clock.run_steps(argument))
+        elif command == "set":
+            for name, value in argument.items():
+                _set_attribute(agent, name, value)
+        elif command == "get":
+            connection.send_bytes(pickle.dumps(agent))
+        elif command == "copy":
+            agent.warm_start(pickle.loads(connection.recv_bytes()))
+            # Pick up in a fresh episode, rather than partway through
+            # one the copied agent never saw.
+            clock.start_episode()
+        elif command == "close":
+            break
+
+    world.close()
+    agent.close()
+
+
+def _set_attribute(agent, name, value):
+    *path, attribute = name.split(".")
+    target = agent
+    for part in path:
+        target = getattr(target, part)
+    setattr(target, attribute, value)
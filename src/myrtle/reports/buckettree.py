@@ -1,17 +1,9 @@
-# import json
-import os
-
-# import time
-import numpy as np
+import argparse
 import matplotlib.pyplot as plt
-
-# from matplotlib.colors import LinearSegmentedColormap
-from myrtle.config import log_directory
 import matplotlib.patches as patches
-
-# import dsmq.client
-# from myrtle.agents.tools import retrieve_buckettree_info
-# from myrtle.config import mq_host, mq_port
+import dsmq.client
+from myrtle.agents.tools import retrieve_buckettree_info
+from myrtle.config import mq_host, mq_port
 import myrtle.reports.report_config as config
 
 history_length_short = 5
@@ -25,27 +17,31 @@ _connection_wait = 2.0  # seconds
 _n_tries = 10
 
 
-def report_buckettree():
-    n_trees = 0
-    highs = []
-    lows = []
-    levels = []
+def report_buckettree(i_snapshot=-1):
+    # The trees are stacked, one row per sensor.
+    snapshot = config.load_snapshot("buckettree", i_snapshot)
+    draw_buckettrees(snapshot["highs"], snapshot["lows"], snapshot["levels"])
 
-    # Read in all the tree data from the tree info directories
-    for dirname in os.listdir(os.path.join(log_directory, "buckettree")):
-        if dirname[:5] == "tree_":
-            n_trees += 1
-            highs.append(
-                np.load(os.path.join(log_directory, "buckettree", dirname, "highs.npy"))
-            )
-            lows.append(
-                np.load(os.path.join(log_directory, "buckettree", dirname, "lows.npy"))
-            )
-            levels.append(
-                np.load(
-                    os.path.join(log_directory, "buckettree", dirname, "levels.npy")
-                )
-            )
+
+def live_report_buckettree():
+    """
+    Subscribe to the BucketTree info published by a running agent
+    and show the most recent.
+    """
+    mq = dsmq.client.connect(mq_host, mq_port)
+    info = retrieve_buckettree_info(mq)
+    mq.close()
+    if info is None:
+        print("No bucket tree info yet. Try again in a few seconds.")
+        return
+
+    print()
+    print(f"bucket trees, episode {info['episode']}, step {info['step']}")
+    draw_buckettrees(info["highs"], info["lows"], info["levels"])
+
+
+def draw_buckettrees(highs, lows, levels):
+    n_trees = highs.shape[0]
 
     fig, axes_list = config.blank_images(n_trees)
 
@@ -128,5 +124,25 @@ def left_title(ax, text):
     )
 
 
+def cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--snapshot",
+        type=int,
+        default=-1,
+        help="which snapshot to show, counting back from the latest if negative",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="show the latest bucket trees from a running agent instead",
+    )
+    args = parser.parse_args()
+    if args.live:
+        live_report_buckettree()
+    else:
+        report_buckettree(args.snapshot)
+
+
 if __name__ == "__main__":
-    report_buckettree()
+    cli()
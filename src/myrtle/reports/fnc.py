@@ -1,32 +1,32 @@
+import argparse
 import os
-import numpy as np
 import matplotlib.pyplot as plt
 from myrtle.config import log_directory
 from myrtle.reports.report_config import (
     array_1D_report,
     array_2D_report,
+    load_snapshot,
 )
 
 
-def report():
+def report(i_snapshot=-1):
     print("reporting")
-    curiosities = np.load(os.path.join(log_directory, "fnc", "curiosities.npy"))
-    features = np.load(os.path.join(log_directory, "fnc", "features.npy"))
-    predicted_reward = np.load(
-        os.path.join(log_directory, "fnc", "predicted_reward.npy")
-    )
-    predictions = np.load(os.path.join(log_directory, "fnc", "predictions.npy"))
-    # previous_sensors = np.load(
-    #     os.path.join(log_directory, "fnc", "previous_sensors.npy")
-    # )
-    sensors = np.load(os.path.join(log_directory, "fnc", "sensors.npy"))
+    snapshot = load_snapshot("fnc", i_snapshot)
+    curiosities = snapshot["curiosities"]
+    # Agents without a feature creation step don't snapshot their features.
+    features = snapshot.get("features")
+    predicted_reward = snapshot["predicted_reward"]
+    predictions = snapshot["predictions"]
+    # previous_sensors = snapshot["previous_sensors"]
+    sensors = snapshot["sensors"]
 
     print()
     print("FNC")
 
     array_1D_report(sensors, "sensor activities")
 
-    array_1D_report(features, "feature activities")
+    if features is not None:
+        array_1D_report(features, "feature activities")
 
     array_1D_report(predicted_reward, "predicted reward, by action")
 
@@ -53,5 +53,17 @@ def report():
     print()
 
 
+def cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--snapshot",
+        type=int,
+        default=-1,
+        help="which snapshot to show, counting back from the latest if negative",
+    )
+    args = parser.parse_args()
+    report(args.snapshot)
+
+
 if __name__ == "__main__":
-    report()
+    cli()
@@ -1,6 +1,9 @@
+import os
 import numpy as np
 from matplotlib.colors import LinearSegmentedColormap
 import matplotlib.pyplot as plt
+from myrtle.agents.tools.snapshot_archive import read_snapshots
+from myrtle.config import log_directory
 
 # light mode
 # background_color = "white"
@@ -284,3 +287,23 @@ def left_title(ax, text):
         color=color,
         fontsize=fontsize_small,
     )
+
+
+def load_snapshot(log_subdir, i_snapshot=-1):
+    """
+    Pull one snapshot out of the archive in `log_subdir`. Like a list index,
+    `i_snapshot` counts back from the most recent snapshot when negative.
+    Returns a dict of arrays, keyed by name.
+    """
+    steps, episodes, arrays = read_snapshots(os.path.join(log_directory, log_subdir))
+    n_snapshots = steps.size
+    if n_snapshots == 0:
+        raise IndexError(f"No {log_subdir} snapshots have been written yet.")
+    i_snapshot = range(n_snapshots)[i_snapshot]
+
+    print()
+    print(
+        f"{log_subdir} snapshot {i_snapshot + 1} of {n_snapshots}, "
+        + f"episode {episodes[i_snapshot]}, step {steps[i_snapshot]}"
+    )
+    return {name: np.array(array[i_snapshot]) for name, array in arrays.items()}
@@ -93,6 +93,11 @@ def report_timing(db_name):
     rounded_agent_success_rate = int(1000 * (agent_success_rate)) / 10.0
     success_text = f"agent on-time completion rate is {rounded_agent_success_rate}%"
 
+    fallback_rate = retrieve_fallback_rate(db_name, history_length_super_long)
+    if fallback_rate is not None:
+        rounded_fallback_rate = int(1000 * fallback_rate) / 10.0
+        success_text += f", fallback action rate is {rounded_fallback_rate}%"
+
     rc.left_title(ax_short, success_text)
 
     report_filename = f"timing_{db_name}.png"
@@ -124,6 +129,36 @@ def retrieve_timing(db_name, n_steps=100):
     return results
 
 
+def retrieve_fallback_rate(db_name, n_steps=100):
+    """
+    The fraction of recent agent steps where the agent ran short on time
+    and sent a fallback action. None if the run didn't record it.
+    """
+    logger = logging.open_logger(
+        name=db_name,
+        dir_name=log_directory,
+        level="info",
+    )
+    if "fallback" not in logger.get_columns():
+        return None
+
+    result = logger.query(
+        f"""
+        SELECT AVG(fallback)
+        FROM (
+            SELECT fallback
+            FROM {db_name}
+            WHERE process = 'agent'
+            ORDER BY ts_send DESC
+            LIMIT {int(n_steps)}
+        )
+    """
+    )
+    if result[0][0] is None:
+        return None
+    return float(result[0][0])
+
+
 def convert_to_swimlane_axes(ax, n_lanes=None):
     ax.grid(False)
     ax.set_ylim(-0.5, n_lanes + 0.5)
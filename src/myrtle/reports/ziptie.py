@@ -1,37 +1,32 @@
+import argparse
 import os
 import numpy as np
 import matplotlib.pyplot as plt
-from myrtle.config import log_directory
+from matplotlib.colors import LinearSegmentedColormap
+import dsmq.client
+from myrtle.agents.tools import retrieve_ziptie_info
+from myrtle.config import log_directory, mq_host, mq_port
 from myrtle.reports.report_config import (
     array_1D_report,
     array_2D_report,
+    blank_images,
+    color,
+    fontsize_small,
+    load_snapshot,
 )
 
 
-def report():
+def report(i_snapshot=-1):
     log_subdir = "ziptie"
-    cable_activities = np.load(
-        os.path.join(log_directory, log_subdir, "cable_activities.npy")
-    )
-    bundle_activities = np.load(
-        os.path.join(log_directory, log_subdir, "bundle_activities.npy")
-    )
-    mapping = np.load(os.path.join(log_directory, log_subdir, "mapping.npy"))
-    # n_cables_by_bundle = np.load(
-    #     os.path.join(log_directory, log_subdir, "n_cables_by_bundle.npy")
-    # )
-    nucleation_energy = np.load(
-        os.path.join(log_directory, log_subdir, "nucleation_energy.npy")
-    )
-    nucleation_mask = np.load(
-        os.path.join(log_directory, log_subdir, "nucleation_mask.npy")
-    )
-    agglomeration_energy = np.load(
-        os.path.join(log_directory, log_subdir, "agglomeration_energy.npy")
-    )
-    agglomeration_mask = np.load(
-        os.path.join(log_directory, log_subdir, "agglomeration_mask.npy")
-    )
+    snapshot = load_snapshot(log_subdir, i_snapshot)
+    cable_activities = snapshot["cable_activities"]
+    bundle_activities = snapshot["bundle_activities"]
+    mapping = snapshot["mapping"]
+    # n_cables_by_bundle = snapshot["n_cables_by_bundle"]
+    nucleation_energy = snapshot["nucleation_energy"]
+    nucleation_mask = snapshot["nucleation_mask"]
+    agglomeration_energy = snapshot["agglomeration_energy"]
+    agglomeration_mask = snapshot["agglomeration_mask"]
 
     print()
     print("ziptie")
@@ -104,53 +99,33 @@ def report():
     array_1D_report(bundle_activities, "bundle (feature) activities")
 
 
-"""
-import json
-import os
-import time
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.colors import LinearSegmentedColormap
-import dsmq.client
-from myrtle.agents.tools import retrieve_ziptie_info
-from myrtle.config import mq_host, mq_port
-from myrtle.reports.report_config import *
-
-history_length_short = 5
-history_length_med = 20
-history_length_long = 100
-history_length_super_long = 1000
-
-_connection_wait = 2.0  # seconds
-_n_tries = 10
-"""
-"""
-def report_ziptie():
+def live_report():
+    """
+    Subscribe to the Ziptie info published by a running agent
+    and show the most recent.
+    """
     mq = dsmq.client.connect(mq_host, mq_port)
-    time.sleep(_connection_wait)
+    info = retrieve_ziptie_info(mq)
+    mq.close()
+    if info is None:
+        print("No ziptie info yet. Try again in a few seconds.")
+        return
+
+    print()
+    print(f"ziptie, episode {info['episode']}, step {info['step']}")
+    print(f"  {info['n_cables']} cables")
+    print(f"  {info['n_bundles']} of {info['n_bundles_max']} feature bundles")
+
+    # Unpack the compact mapping into bundle membership.
+    mapping = info["mapping"]
+    bundle_mapping = np.zeros((info["n_bundles"], info["n_cables"]))
+    i_bundles, i_cables = np.where(mapping > -1)
+    bundle_mapping[i_bundles, mapping[i_bundles, i_cables]] = 1
 
     n_images = 3
     fig, axes_list = blank_images(n_images)
     # From bottom to top
     ax_agglomeration, ax_nucleation, ax_bundles = axes_list
-
-    try:
-        (
-            n_sensors,
-            n_bundles,
-            bundle_mapping,
-            nucleation_energy,
-            agglomeration_energy,
-        ) = retrieve_ziptie_info(mq)
-    except TypeError:
-        print("Try again in a few seconds.")
-        return
-
-    print()
-    print("Ziptie")
-    print(f"    {n_sensors} sensors")
-    print(f"    {n_bundles} features")
-
     cmap = LinearSegmentedColormap.from_list("matrix", ["black", color])
 
     ax_bundles.imshow(
@@ -162,26 +137,45 @@ def report_ziptie():
     )
     ax_bundles.set_xlabel("bundles", color=color, fontsize=fontsize_small)
 
+    # The energies arrive max-pooled down to a manageable size.
     ax_nucleation.imshow(
-        nucleation_energy.transpose(),
-        vmin=0.0,
-        vmax=1.0,
+        info["nucleation_energy"].astype(float).transpose(),
         cmap=cmap,
         interpolation="nearest",
     )
     ax_nucleation.set_xlabel("nucleation energy", color=color, fontsize=fontsize_small)
 
     ax_agglomeration.imshow(
-        agglomeration_energy.transpose(),
-        vmin=0.0,
-        vmax=1.0,
+        info["agglomeration_energy"].astype(float).transpose(),
         cmap=cmap,
         interpolation="nearest",
     )
-    ax_agglomeration.set_xlabel("agglomeration energy", color=color, fontsize=fontsize_small)
+    ax_agglomeration.set_xlabel(
+        "agglomeration energy", color=color, fontsize=fontsize_small
+    )
 
     plt.show()
-"""
+
+
+def cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--snapshot",
+        type=int,
+        default=-1,
+        help="which snapshot to show, counting back from the latest if negative",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="show the latest ziptie info from a running agent instead",
+    )
+    args = parser.parse_args()
+    if args.live:
+        live_report()
+    else:
+        report(args.snapshot)
+
 
 if __name__ == "__main__":
-    report()
+    cli()
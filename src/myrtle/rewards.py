@@ -0,0 +1,50 @@
+"""
+Rewards are passed around as float64 arrays, one element per reward channel.
+A channel with no reward on a given step is NaN.
+
+Worlds written before this convention used lists with None for missing
+rewards. The helpers here accept either.
+"""
+
+import numpy as np
+
+
+def empty_rewards(n_rewards):
+    """
+    An array of rewards with every channel missing.
+    """
+    return np.full(n_rewards, np.nan)
+
+
+def as_rewards(rewards):
+    """
+    Convert a list of rewards, with None for missing ones,
+    to a reward array.
+    """
+    return np.asarray(rewards, dtype=float)
+
+
+def total_reward(rewards, axis=None):
+    """
+    The sum of all the reward channels that are present.
+    Zero if none of them are.
+
+    For batched worlds, with one row of rewards per instance,
+    `axis=-1` gives an array of totals, one per instance.
+    """
+    rewards = as_rewards(rewards)
+    if axis is not None:
+        return np.nansum(rewards, axis=axis)
+    return float(np.sum(rewards[~np.isnan(rewards)]))
+
+
+def rewards_to_list(rewards):
+    """
+    Convert rewards to a list with None in place of missing rewards.
+    This is the form used in JSON messages, which have no NaN, and by
+    models that expect None for missing rewards.
+    """
+    rewards = as_rewards(rewards)
+    reward_list = rewards.astype(object)
+    reward_list[np.isnan(rewards)] = None
+    return reward_list.tolist()
@@ -0,0 +1,70 @@
+"""
+Sensors are usually passed around as a dense float64 array,
+one element per sensor.
+
+Worlds whose sensors are mostly zeros, like the one-hot worlds,
+can send a `SparseSensors` frame instead, listing only the sensors
+that are non-zero. Agents that extend `BaseAgent` can work with either,
+through `self.sensors` for the dense array or `self.sparse_sensors`
+for the sparse frame.
+"""
+
+import numpy as np
+
+
+class SparseSensors:
+    """
+    The indices of the non-zero sensors and their values.
+    If `values` isn't given, they are all ones.
+    """
+
+    def __init__(self, n_sensors, indices, values=None):
+        self.n_sensors = n_sensors
+        self.indices = np.asarray(indices, dtype=int)
+        if values is None:
+            self.values = np.ones(self.indices.size)
+        else:
+            self.values = np.asarray(values, dtype=float)
+
+    @classmethod
+    def from_dense(cls, sensors):
+        indices = np.flatnonzero(sensors)
+        return cls(sensors.size, indices, sensors[indices])
+
+    def to_dense(self):
+        sensors = np.zeros(self.n_sensors)
+        sensors[self.indices] = self.values
+        return sensors
+
+    def __reduce__(self):
+        # Frames usually list only a few sensors. Pickling them as lists,
+        # rather than as arrays, is quicker on the way through a queue.
+        return (
+            SparseSensors,
+            (self.n_sensors, self.indices.tolist(), self.values.tolist()),
+        )
+
+    def copy(self):
+        return SparseSensors(self.n_sensors, self.indices.copy(), self.values.copy())
+
+    def tobytes(self):
+        """
+        A compact key for the frame, for agents that look up states
+        in a dict. Two frames with the same non-zero sensors,
+        listed in the same order, get the same key.
+        """
+        return self.indices.tobytes() + self.values.tobytes()
+
+
+def sensors_to_dict(sensors):
+    """
+    The fields describing the sensors in a JSON message.
+    Sparse frames stay sparse.
+    """
+    if isinstance(sensors, SparseSensors):
+        return {
+            "n_sensors": sensors.n_sensors,
+            "sensor_indices": sensors.indices.tolist(),
+            "sensor_values": sensors.values.tolist(),
+        }
+    return {"sensors": np.asarray(sensors).tolist()}
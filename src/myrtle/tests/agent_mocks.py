@@ -0,0 +1,22 @@
+from myrtle.agents.base_agent import BaseAgent
+
+
+class FixedArgsAgent(BaseAgent):
+    # An agent that only takes the arguments it needs.
+    def __init__(
+        self,
+        n_sensors=None,
+        n_actions=None,
+        n_rewards=None,
+        q_action=None,
+        q_reward=None,
+        q_sensor=None,
+    ):
+        self.init_common(
+            n_sensors=n_sensors,
+            n_actions=n_actions,
+            n_rewards=n_rewards,
+            q_action=q_action,
+            q_reward=q_reward,
+            q_sensor=q_sensor,
+        )
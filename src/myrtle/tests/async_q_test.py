@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from myrtle import async_q
+from myrtle.agents.greedy_state_blind import GreedyStateBlind
+from myrtle.agents.q_learning_curiosity import QLearningCuriosity
+from myrtle.agents.q_learning_eps import QLearningEpsilon
+from myrtle.worlds.contextual_bandit import ContextualBandit
+
+_n_workers = 3
+_n_steps = 200
+
+
+def test_shared_learning():
+    agent, rewards = async_q.run(
+        QLearningCuriosity,
+        ContextualBandit,
+        n_workers=_n_workers,
+        n_steps=_n_steps,
+        seed=5,
+    )
+    assert isinstance(agent, QLearningCuriosity)
+    assert agent.tile_coder is not None
+    assert agent.shared_tables is None
+    assert len(rewards) == _n_workers
+
+    # Every worker's visits were counted in the one table,
+    # a visit to each of its tiles per step.
+    n_tilings = agent.tile_coder.n_tilings
+    assert np.sum(agent.counts) == _n_workers * _n_steps * n_tilings
+    assert np.any(agent.q_values != 0)
+
+
+def test_lock_free():
+    agent, rewards = async_q.run(
+        QLearningEpsilon,
+        ContextualBandit,
+        n_workers=2,
+        n_steps=_n_steps,
+        n_stripes=0,
+        seed=6,
+    )
+    assert isinstance(agent, QLearningEpsilon)
+    assert np.any(agent.q_values != 0)
+
+
+def test_unshareable_agent():
+    with pytest.raises(ValueError):
+        async_q.run(GreedyStateBlind, ContextualBandit, n_workers=2)
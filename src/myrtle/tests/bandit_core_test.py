@@ -0,0 +1,82 @@
+import numpy as np
+from myrtle.worlds.tools.bandit_core import BanditCore
+from myrtle.worlds.stationary_bandit import StationaryBandit
+
+
+def test_seeded_runs_repeat():
+    bandit_a = BanditCore(seed=3, block_size=10)
+    bandit_b = BanditCore(seed=3, block_size=10)
+    for _ in range(7):
+        # Odd sizes make the block refill partway through.
+        assert np.array_equal(bandit_a.uniforms(4), bandit_b.uniforms(4))
+
+
+def test_block_refill():
+    bandit = BanditCore(seed=0, block_size=8)
+    first = bandit.uniforms(6).copy()
+    second = bandit.uniforms(6)
+    assert second.shape == (6,)
+    assert not np.array_equal(first, second)
+    assert bandit.i_block == 6
+
+    # Requests bigger than a block are drawn directly.
+    big = bandit.uniforms((3, 5))
+    assert big.shape == (3, 5)
+    assert np.all((big >= 0) & (big < 1))
+
+
+def test_many_arms():
+    n_arms = 5000
+    bandit = BanditCore(seed=0)
+    hit_rates = np.linspace(0, 1, n_arms)
+    payouts = np.full(n_arms, 10.0)
+    actions = np.ones(n_arms)
+
+    n_tries = 100
+    total = np.zeros(n_arms)
+    for _ in range(n_tries):
+        total += bandit.pull(actions, payouts, hit_rates)
+    # Expected total is 10 * sum(hit_rates) * n_tries.
+    expected = 10 * np.sum(hit_rates) * n_tries
+    assert np.abs(np.sum(total) - expected) < 0.01 * expected
+
+    # Arms that aren't selected never pay out.
+    rewards = bandit.pull(np.zeros(n_arms), payouts, hit_rates)
+    assert np.all(rewards == 0)
+
+
+def test_many_problems():
+    n_problems = 1000
+    bandit = BanditCore(seed=0)
+    actions = np.zeros((n_problems, 3))
+    actions[:, 1] = 1
+    rewards = bandit.pull(actions, [100.0, 200.0, 300.0], [1.0, 0.5, 1.0])
+    assert rewards.shape == (n_problems, 3)
+    assert np.all(rewards[:, [0, 2]] == 0)
+    # Each problem gets its own draw.
+    assert 0.4 < np.mean(rewards[:, 1] == 200) < 0.6
+
+
+def test_intermittency():
+    bandit = BanditCore(seed=0)
+    rewards = bandit.pull(np.ones(10_000), 1.0, 1.0, intermittency=0.1)
+    assert 0.08 < np.mean(np.isnan(rewards)) < 0.12
+
+
+def test_stationary_bandit_problems():
+    world = StationaryBandit(n_problems=3, seed=0)
+    assert world.n_actions == 15
+    assert world.n_rewards == 15
+
+    world.actions = np.zeros(world.n_actions)
+    world.actions[[2, 7, 12]] = 1
+    n_tries = 1000
+    sum_rewards = np.zeros(world.n_rewards)
+    for _ in range(n_tries):
+        world.sense()
+        sum_rewards += world.rewards
+    mean_rewards = sum_rewards / n_tries
+    # Should be 112 for each problem, +/- some variance
+    for i_action in [2, 7, 12]:
+        assert 100.0 < mean_rewards[i_action] < 124.0
+    assert np.sum(mean_rewards) == np.sum(mean_rewards[[2, 7, 12]])
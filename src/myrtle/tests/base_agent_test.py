@@ -6,6 +6,7 @@ import pytest
 import time
 import numpy as np
 from myrtle.agents import base_agent
+from myrtle.sensors import SparseSensors
 # from myrtle.tests.world_mocks import multiepisode_world
 
 # Exclude pytest fixtures from some checks because they behave in peculiar ways.
@@ -66,6 +67,77 @@ def test_action_generation(
     assert np.sum(agent.actions) == 1.0
 
 
+def test_choose_action_order(initialize_agent):
+    agent = initialize_agent
+    agent.reset()
+    calls = []
+    agent.perceive = lambda: calls.append("perceive")
+    agent.learn = lambda: calls.append("learn")
+    agent.act = lambda: calls.append("act")
+    previous_actions = agent.actions
+    agent.choose_action()
+
+    assert calls == ["perceive", "learn", "act"]
+    assert agent.previous_actions is previous_actions
+
+
+def test_deadline_fallback(initialize_agent):
+    agent = initialize_agent
+    agent.reset()
+    agent.previous_actions = np.array([0.0, 1.0, 0.0, 0.0])
+    agent.deadline = 0.05
+
+    # Plenty of time left.
+    agent.sensors_sent_timestamp = time.time()
+    agent.check_deadline()
+    assert not agent.fallback_sent
+
+    # Out of time. The previous actions get sent, but only once.
+    agent.sensors_sent_timestamp = time.time() - 1.0
+    agent.check_deadline()
+    agent.check_deadline()
+    assert agent.fallback_sent
+    assert agent.n_fallbacks == 1
+    assert np.array_equal(agent.q_action.get(timeout=1.0), agent.previous_actions)
+    assert agent.q_action.empty()
+
+
+def test_fallback_replaces_actions(
+    setup_mq_server,  # noqa: F811
+    initialize_agent,
+):
+    agent = initialize_agent
+    agent.initialize_mq()
+    agent.reset()
+    agent.i_step = 0
+    agent.i_episode = 0
+    agent.receive_sensors_timestamp = time.time()
+    agent.previous_actions = np.array([0.0, 1.0, 0.0, 0.0])
+    agent.deadline = 0.05
+
+    agent.sensors_sent_timestamp = time.time() - 1.0
+    agent.check_deadline()
+    agent.act()
+    agent.write_agent_step()
+
+    # The world only gets the fallback, and the agent remembers
+    # the fallback as the actions it took.
+    assert np.array_equal(agent.q_action.get(timeout=1.0), agent.previous_actions)
+    time.sleep(_pause)
+    assert agent.q_action.empty()
+    assert np.array_equal(agent.actions, agent.previous_actions)
+
+
+def test_no_deadline(initialize_agent):
+    agent = initialize_agent
+    agent.reset()
+    agent.previous_actions = agent.actions
+    assert agent.deadline is None
+    agent.sensors_sent_timestamp = time.time() - 1.0
+    agent.check_deadline()
+    assert not agent.fallback_sent
+
+
 def test_reset(
     setup_mq_server,  # noqa: F811
     initialize_agent,
@@ -87,8 +159,8 @@ def test_world_step_read(
     agent.reset()
     setup_mq_client
 
-    agent.q_sensor.put(np.array([0.4, 0.7, 0.2, 0.9, -0.6]))
-    agent.q_reward.put(np.array([0, 2, None]))
+    agent.q_sensor.put((np.array([0.4, 0.7, 0.2, 0.9, -0.6]), time.time()))
+    agent.q_reward.put(np.array([0, 2, np.nan]))
     time.sleep(_pause)
     agent.read_world_step()
 
@@ -96,7 +168,26 @@ def test_world_step_read(
     assert agent.sensors[3] == 0.9
     assert agent.sensors[4] == -0.6
     assert agent.rewards[1] == 2
-    assert agent.rewards[2] is None
+    assert np.isnan(agent.rewards[2])
+
+
+def test_sparse_sensors(initialize_agent):
+    agent = initialize_agent
+    agent.reset()
+
+    agent.sensors = SparseSensors(_n_sensors, [1, 3], [0.5, 2.0])
+    assert agent.sensors_are_sparse
+    assert agent.sparse_sensors.indices.tolist() == [1, 3]
+    assert agent.sensors.tolist() == [0.0, 0.5, 0.0, 2.0, 0.0]
+    sparse_key = agent.sensor_key()
+    assert agent.copy_sensors().tobytes() == sparse_key
+
+    # Dense sensors get a sparse view too.
+    agent.sensors = np.array([0.0, 0.5, 0.0, 2.0, 0.0])
+    assert not agent.sensors_are_sparse
+    assert agent.sparse_sensors.indices.tolist() == [1, 3]
+    assert agent.sparse_sensors.values.tolist() == [0.5, 2.0]
+    assert agent.sensor_key() == agent.sensors.tobytes()
 
 
 """
@@ -169,3 +260,24 @@ def test_episode_advancement(
 
     assert i_episode == 1
 """
+
+
+def test_dtype_policies():
+    agent = base_agent.BaseAgent(
+        n_sensors=_n_sensors,
+        n_actions=_n_actions,
+        n_rewards=_n_rewards,
+        seed=0,
+        dtypes="compact",
+    )
+    agent.reset()
+    assert agent.actions.dtype == np.int8
+    assert agent.zero_values((2, 3)).dtype == np.float32
+    assert agent.zero_counts(3).dtype == np.int32
+
+    agent.choose_action()
+    assert agent.actions.dtype == np.int8
+    agent.close()
+
+    with pytest.raises(ValueError):
+        base_agent.BaseAgent(n_sensors=1, n_actions=1, dtypes="tiny")
@@ -72,7 +72,7 @@ def test_sensor_reward_initialization(
     assert world.sensors[1] == 0.0
     assert world.sensors[9] == -0.3
     assert world.rewards[0] == 0.2
-    assert world.rewards[2] is None
+    assert np.isnan(world.rewards[2])
 
 
 def test_mq_initialization_and_close(
@@ -151,7 +151,7 @@ def test_write_world_step(
     world.i_loop_step = 37
     world.i_episode = 111
     world.sensors = np.array([0.3, 0.0, -6.6, 0.29, 56789])
-    world.rewards = [None, 0.01, None, 87]
+    world.rewards = np.array([np.nan, 0.01, np.nan, 87])
 
     world.write_world_step()
     time.sleep(_pause)
@@ -226,3 +226,19 @@ def test_controlled_shutdown(
     p_world.join(_v_long_pause)
 
     assert not p_world.is_alive()
+
+
+def test_unpaced_world_steps():
+    world = base_world.BaseWorld(
+        loop_steps_per_second=_loop_steps_per_second,
+        world_steps_per_second=4 * _loop_steps_per_second,
+        paced_world_steps=False,
+    )
+    # Only the loop steps are paced.
+    assert world.pm.clock_period == pytest.approx(1 / _loop_steps_per_second)
+
+    world.actions = np.zeros(world.n_actions)
+    world.actions[2] = 1
+    world.step_world_substeps(world.world_steps_per_loop_step)
+    assert world.i_world_step == 3
+    assert world.i_action == 2
@@ -0,0 +1,41 @@
+import multiprocessing as mp
+import pytest
+import numpy as np
+from myrtle.agents import batched_agent
+
+_n_worlds = 7
+_n_sensors = 2
+_n_actions = 5
+_n_rewards = 1
+
+
+@pytest.fixture
+def initialize_agent():
+    agent = batched_agent.BatchedAgent(
+        n_worlds=_n_worlds,
+        n_sensors=_n_sensors,
+        n_actions=_n_actions,
+        n_rewards=_n_rewards,
+        q_action=mp.Queue(),
+        q_reward=mp.Queue(),
+        q_sensor=mp.Queue(),
+    )
+    yield agent
+
+
+def test_initialization(initialize_agent):
+    agent = initialize_agent
+    agent.reset()
+    assert agent.n_worlds == _n_worlds
+    assert agent.sensors.shape == (_n_worlds, _n_sensors)
+    assert agent.rewards.shape == (_n_worlds, _n_rewards)
+    assert agent.actions.shape == (_n_worlds, _n_actions)
+
+
+def test_act(initialize_agent):
+    agent = initialize_agent
+    agent.reset()
+    agent.choose_action()
+    assert agent.actions.shape == (_n_worlds, _n_actions)
+    # One action per instance
+    assert np.all(np.sum(agent.actions, axis=1) == 1)
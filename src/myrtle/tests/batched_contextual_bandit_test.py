@@ -0,0 +1,60 @@
+import multiprocessing as mp
+import pytest
+import numpy as np
+from myrtle.worlds.batched_contextual_bandit import BatchedContextualBandit
+
+_n_worlds = 5
+
+
+@pytest.fixture
+def initialize_world():
+    world = BatchedContextualBandit(
+        n_worlds=_n_worlds,
+        seed=7,
+        q_action=mp.Queue(),
+        q_reward=mp.Queue(),
+        q_sensor=mp.Queue(),
+    )
+    world.reset()
+    yield world
+
+
+def test_initialization(initialize_world):
+    world = initialize_world
+    assert world.n_worlds == _n_worlds
+    assert world.n_sensors == 4
+    assert world.n_actions == 4
+    assert world.sensors.shape == (_n_worlds, 4)
+
+
+def test_read_agent_step(initialize_world):
+    world = initialize_world
+    world.read_agent_step()
+    assert world.actions.shape == (_n_worlds, world.n_actions)
+    assert np.all(world.actions == 0)
+
+
+def test_sense(initialize_world):
+    world = initialize_world
+    world.sense()
+    assert np.array_equal(world.sensors, world.bandit_order)
+    # Each instance holds a shuffle of all the bandits.
+    assert np.all(np.sort(world.bandit_order, axis=1) == np.arange(4))
+
+
+def test_step_world(initialize_world):
+    world = initialize_world
+
+    # Every instance pulls whichever arm holds the best bandit, number 2.
+    n_tries = 1000
+    sum_rewards = np.zeros(_n_worlds)
+    for _ in range(n_tries):
+        world.sense()
+        world.actions = (world.bandit_order == 2).astype(float)
+        world.step_world()
+        assert world.rewards.shape == (_n_worlds, world.n_rewards)
+        sum_rewards += np.sum(world.rewards, axis=1)
+    mean_rewards = sum_rewards / n_tries
+    # Should be ~112 +/- some variance
+    assert np.all(mean_rewards > 100)
+    assert np.all(mean_rewards < 124)
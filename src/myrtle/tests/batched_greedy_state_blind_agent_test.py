@@ -0,0 +1,60 @@
+import pytest
+import numpy as np
+from myrtle.agents.batched_greedy_state_blind import BatchedGreedyStateBlind
+
+_n_worlds = 4
+_n_sensors = 2
+_n_actions = 5
+_n_rewards = 2
+
+
+@pytest.fixture
+def initialize_agent():
+    agent = BatchedGreedyStateBlind(
+        n_worlds=_n_worlds,
+        n_sensors=_n_sensors,
+        n_actions=_n_actions,
+        n_rewards=_n_rewards,
+        epsilon=[0.0, 0.0, 1.0, 1.0],
+    )
+    agent.reset()
+    yield agent
+
+
+def test_initialization(initialize_agent):
+    agent = initialize_agent
+    assert agent.total_return.shape == (_n_worlds, _n_actions)
+    assert agent.action_count.shape == (_n_worlds, _n_actions)
+    assert np.array_equal(agent.epsilon, [0.0, 0.0, 1.0, 1.0])
+    assert np.array_equal(
+        BatchedGreedyStateBlind(n_worlds=3, n_actions=2).epsilon, [0.0, 0.0, 0.0]
+    )
+
+
+def test_learning(initialize_agent):
+    agent = initialize_agent
+    agent.actions = np.zeros((_n_worlds, _n_actions))
+    agent.actions[np.arange(_n_worlds), [0, 1, 2, 3]] = 1
+    agent.rewards = np.array([[1.0, np.nan], [2.0, 2.0], [0.0, 0.0], [5.0, 1.0]])
+    agent.choose_action()
+
+    assert agent.total_return[0, 0] == 2
+    assert agent.total_return[1, 1] == 5
+    assert agent.total_return[3, 3] == 7
+    assert agent.action_count[1, 1] == 2
+    assert agent.action_count[1, 0] == 1
+
+
+def test_action_selection(initialize_agent):
+    agent = initialize_agent
+    agent.total_return[:, 3] = 10
+    explored = np.zeros(_n_worlds)
+    for _ in range(50):
+        agent.act()
+        assert np.all(np.sum(agent.actions, axis=1) == 1)
+        explored += agent.actions[:, 3] == 0
+
+    # The greedy copies always choose the best action.
+    # The exploring ones choose at random.
+    assert np.all(explored[:2] == 0)
+    assert np.all(explored[2:] > 0)
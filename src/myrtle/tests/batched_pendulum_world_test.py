@@ -0,0 +1,71 @@
+import multiprocessing as mp
+import pytest
+import numpy as np
+from myrtle.tests.fixtures import setup_mq_server  # noqa: F401
+from myrtle.worlds import batched_pendulum, pendulum
+
+_n_worlds = 5
+
+
+@pytest.fixture
+def initialize_world():
+    world = batched_pendulum.BatchedPendulum(
+        n_worlds=_n_worlds,
+        q_action=mp.Queue(),
+        q_reward=mp.Queue(),
+        q_sensor=mp.Queue(),
+    )
+    yield world
+
+
+def test_initialization(initialize_world):
+    world = initialize_world
+
+    assert world.n_worlds == _n_worlds
+    assert world.n_sensors == 2
+    assert world.n_actions == 13
+    assert world.n_rewards == 1
+    assert world.sensors.shape == (_n_worlds, 2)
+
+
+def test_read_agent_step(initialize_world):
+    world = initialize_world
+    world.read_agent_step()
+    assert world.actions.shape == (_n_worlds, world.n_actions)
+    assert np.all(world.actions == 0)
+
+
+def test_matches_pendulum(
+    initialize_world,
+    setup_mq_server,  # noqa: F811
+):
+    world = initialize_world
+    world.initialize_mq()
+    single = pendulum.Pendulum(
+        q_action=mp.Queue(),
+        q_reward=mp.Queue(),
+        q_sensor=mp.Queue(),
+    )
+    single.initialize_mq()
+
+    # Give each pendulum a different action, and the last the same as
+    # the single pendulum.
+    world.actions = np.zeros((_n_worlds, world.n_actions))
+    world.actions[np.arange(_n_worlds), np.arange(_n_worlds)] = 1
+    world.actions[-1] = 0
+    world.actions[-1, -1] = 1
+    single.actions = world.actions[-1].copy()
+
+    for _ in range(3 * world.world_steps_per_loop_step):
+        world.step_world()
+        single.step_world()
+    world.sense()
+    single.sense()
+
+    assert np.allclose(world.sensors[-1], single.sensors)
+    assert np.allclose(world.rewards[-1], single.rewards)
+    assert world.rewards.shape == (_n_worlds, 1)
+    # Pendulums pushed clockwise and counter-clockwise
+    # have different velocities.
+    assert world.velocities[0] < 0
+    assert world.velocities[-1] > 0
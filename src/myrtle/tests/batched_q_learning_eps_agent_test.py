@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+from myrtle.agents.batched_q_learning_eps import BatchedQLearningEpsilon
+
+_n_worlds = 3
+_n_sensors = 2
+_n_actions = 3
+_n_rewards = 1
+
+
+@pytest.fixture
+def initialize_agent():
+    agent = BatchedQLearningEpsilon(
+        n_worlds=_n_worlds,
+        n_sensors=_n_sensors,
+        n_actions=_n_actions,
+        n_rewards=_n_rewards,
+        epsilon=0.0,
+        discount_factor=0.0,
+        learning_rate=[0.5, 0.25, 1.0],
+    )
+    agent.reset()
+    yield agent
+
+
+def test_initialization(initialize_agent):
+    agent = initialize_agent
+    assert agent.rows.shape == (_n_worlds,)
+    # Each instance has its own copy of the all-zeros state.
+    assert len(agent.q_values) == _n_worlds
+
+
+def test_learning(initialize_agent):
+    agent = initialize_agent
+    for _ in range(2):
+        agent.sensors = np.array([[1.0, 2.0], [1.0, 2.0], [0.0, 3.0]])
+        agent.actions = np.zeros((_n_worlds, _n_actions))
+        agent.actions[:, 1] = 1
+        agent.rewards = np.array([[8.0], [8.0], [np.nan]])
+        agent.choose_action()
+
+    # The first two instances see the same states, but learn separately,
+    # at their own rates.
+    rows = agent.state_rows(agent.sensors)
+    assert len(set(rows)) == _n_worlds
+    assert agent.q_values.values[rows[0], 1] == 4
+    assert agent.q_values.values[rows[1], 1] == 2
+    assert agent.q_values.values[rows[2], 1] == 0
+
+
+def test_action_selection(initialize_agent):
+    agent = initialize_agent
+    agent.q_values.values[agent.rows[0], 2] = 1.0
+    chosen = np.zeros((_n_worlds, _n_actions))
+    for _ in range(30):
+        agent.act()
+        assert np.all(np.sum(agent.actions, axis=1) == 1)
+        chosen += agent.actions
+
+    assert chosen[0, 2] == 30
+    # Ties are broken at random.
+    assert np.all(chosen[1:] > 0)
@@ -2,11 +2,13 @@ from multiprocessing import Process
 import os
 import time
 import dsmq.client
+import pytest
 from sqlogging import logging
 from myrtle import bench
 from myrtle.agents import base_agent
 from myrtle.config import log_directory, mq_host, mq_port
 from myrtle.worlds import base_world
+from myrtle.tests.agent_mocks import FixedArgsAgent
 
 _bench_run_timeout = 5.0  # seconds
 _startup_delay = 5.0  # seconds
@@ -50,6 +52,42 @@ def test_run():
     assert exitcode == 0
 
 
+def test_run_fixed_args_agent():
+    exitcode = bench.run(
+        FixedArgsAgent,
+        base_world.BaseWorld,
+        log_to_db=False,
+        timeout=_bench_run_timeout,
+        world_args={
+            "n_loop_steps": 5,
+            "n_episodes": 2,
+            "loop_steps_per_second": 20,
+        },
+    )
+    assert exitcode == 0
+
+
+def test_deadline_needs_loop_period():
+    with pytest.raises(ValueError):
+        bench.run(FixedArgsAgent, base_world.BaseWorld, agent_deadline=True)
+
+
+def test_run_with_deadline():
+    exitcode = bench.run(
+        base_agent.BaseAgent,
+        base_world.BaseWorld,
+        log_to_db=False,
+        timeout=_bench_run_timeout,
+        world_args={
+            "n_loop_steps": 5,
+            "n_episodes": 2,
+            "loop_steps_per_second": 20,
+        },
+        agent_deadline=True,
+    )
+    assert exitcode == 0
+
+
 def test_timeout():
     exitcode = bench.run(
         base_agent.BaseAgent,
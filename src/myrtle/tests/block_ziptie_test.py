@@ -0,0 +1,172 @@
+import os
+import numpy as np
+from ziptie.algo import Ziptie
+from myrtle.agents.tools.block_ziptie import BlockZiptie
+from myrtle.agents.tools.snapshot_archive import SnapshotWriter, read_snapshots
+
+_n_blocks = 6
+_block_size = 5
+_n_cables = _n_blocks * _block_size
+_n_steps = 3000
+_threshold = 10.0
+
+
+def initialize_zipties():
+    dense = Ziptie(n_cables=_n_cables, n_bundles_max=_n_cables, threshold=_threshold)
+    for i_block in range(_n_blocks):
+        i_start = i_block * _block_size
+        dense.nucleation_mask[
+            i_start : i_start + _block_size, i_start : i_start + _block_size
+        ] = 0
+
+    sparse = BlockZiptie(
+        n_cables=_n_cables,
+        block_size=_block_size,
+        n_bundles_max=_n_cables,
+        threshold=_threshold,
+    )
+    return dense, sparse
+
+
+def generate_inputs(rng):
+    # One or two active cables per block, as a BucketTree would produce.
+    inputs = np.zeros(_n_cables)
+    for i_block in range(_n_blocks):
+        i_cables = i_block * _block_size + rng.choice(_block_size, size=2)
+        inputs[i_cables] = rng.uniform(0.2, 1.0, size=2)
+    return inputs
+
+
+def step(ziptie, inputs):
+    ziptie.create_new_bundles()
+    ziptie.grow_bundles()
+    return ziptie.update_bundles(inputs)
+
+
+def test_matches_dense():
+    dense, sparse = initialize_zipties()
+    rng = np.random.default_rng(7)
+    for _ in range(_n_steps):
+        inputs = generate_inputs(rng)
+
+        # Both zipties draw from the global random state in the same order.
+        state = np.random.get_state()
+        dense_activities = step(dense, inputs)
+        np.random.set_state(state)
+        sparse_activities = step(sparse, inputs)
+
+        assert np.array_equal(dense_activities, sparse_activities)
+
+    assert sparse.n_bundles > 0
+    assert sparse.n_bundles == dense.n_bundles
+    assert np.array_equal(sparse.mapping, dense.mapping)
+    assert np.array_equal(sparse.agglomeration_mask_dense(), dense.agglomeration_mask)
+    assert np.allclose(
+        sparse.agglomeration_energy_dense(), dense.agglomeration_energy
+    )
+    assert np.array_equal(sparse.nucleation_mask_dense(), dense.nucleation_mask)
+    assert np.allclose(sparse.nucleation_energy_dense(), dense.nucleation_energy)
+
+
+def test_single_cable_blocks_match_stock():
+    # With one cable per block, nothing is blocked beyond what
+    # a stock Ziptie blocks, so the two learn the same bundles.
+    stock = Ziptie(n_cables=_n_cables, n_bundles_max=_n_cables, threshold=_threshold)
+    sparse = BlockZiptie(
+        n_cables=_n_cables, block_size=1, n_bundles_max=_n_cables, threshold=_threshold
+    )
+    rng = np.random.default_rng(13)
+    for _ in range(_n_steps):
+        inputs = generate_inputs(rng)
+        state = np.random.get_state()
+        stock_activities = step(stock, inputs)
+        np.random.set_state(state)
+        sparse_activities = step(sparse, inputs)
+
+        assert np.array_equal(stock_activities, sparse_activities)
+
+    assert sparse.n_bundles > 0
+    assert np.array_equal(sparse.mapping, stock.mapping)
+    assert np.array_equal(sparse.nucleation_mask_dense(), stock.nucleation_mask)
+
+
+def test_block_pairs_never_stored():
+    _, sparse = initialize_zipties()
+    rng = np.random.default_rng(11)
+    for _ in range(100):
+        step(sparse, generate_inputs(rng))
+
+    pairs = sparse.nucleation_pairs
+    keys = pairs.keys[pairs.keys > -1]
+    i_rows, i_cols = np.divmod(keys, _n_cables)
+    assert keys.size == pairs.n_pairs
+    occupied_keys = pairs.keys[pairs.occupied[: pairs.n_pairs]]
+    assert np.array_equal(np.sort(occupied_keys), np.sort(keys))
+    assert np.all(i_rows > i_cols)
+    assert np.all(i_rows // _block_size != i_cols // _block_size)
+
+
+def test_table_growth():
+    _, sparse = initialize_zipties()
+    rng = np.random.default_rng(13)
+    for _ in range(100):
+        step(sparse, generate_inputs(rng))
+    nucleation_energy = sparse.nucleation_energy_dense()
+
+    initial_capacity = sparse.nucleation_pairs.keys.size
+    sparse.nucleation_pairs.reserve(initial_capacity)
+    assert sparse.nucleation_pairs.keys.size > initial_capacity
+    assert np.array_equal(sparse.nucleation_energy_dense(), nucleation_energy)
+
+
+def test_reset_keeps_blocks():
+    _, sparse = initialize_zipties()
+    rng = np.random.default_rng(17)
+    while sparse.n_bundles == 0:
+        step(sparse, generate_inputs(rng))
+
+    i_cable_a, i_cable_b = sparse.mapping[0, :2]
+    # Reset a cable that shares a block with one in the bundle.
+    i_block_start = (i_cable_a // _block_size) * _block_size
+    i_cable = i_block_start + (i_cable_a + 1) % _block_size
+    upstream_resets = sparse.update_inputs([i_cable])
+
+    assert 0 not in upstream_resets
+    assert sparse.agglomeration_mask_dense()[0, i_cable] == 0
+    nucleation_mask = sparse.nucleation_mask_dense()
+    block = slice(i_block_start, i_block_start + _block_size)
+    assert np.all(nucleation_mask[block, block] == 0)
+    assert nucleation_mask[i_cable_a, i_cable_b] == 0
+
+    # Resetting a cable in the bundle lets its partner nucleate again.
+    assert sparse.update_inputs([i_cable_a]) == [0]
+    assert sparse.nucleation_mask_dense()[i_cable_a, i_cable_b] == 1
+
+
+def test_deferred_dense_arrays(tmp_path):
+    _, sparse = initialize_zipties()
+    rng = np.random.default_rng(7)
+    for _ in range(_n_steps):
+        step(sparse, generate_inputs(rng))
+    assert sparse.n_bundles > 0
+
+    expected = {
+        "nucleation_energy": sparse.nucleation_energy_dense(),
+        "nucleation_mask": sparse.nucleation_mask_dense(),
+        "agglomeration_energy": sparse.agglomeration_energy_dense(),
+        "agglomeration_mask": sparse.agglomeration_mask_dense(),
+    }
+    directory = os.path.join(tmp_path, "archive")
+    writer = SnapshotWriter(directory)
+    writer.snapshot(0, 0, **sparse.deferred_dense_arrays())
+
+    # The snapshot holds the Ziptie as it was, even if it goes on learning
+    # before the writer gets to it.
+    for _ in range(100):
+        step(sparse, generate_inputs(rng))
+    writer.close()
+
+    _, _, arrays = read_snapshots(directory)
+    for name, array in expected.items():
+        assert arrays[name].dtype == array.dtype
+        assert np.array_equal(arrays[name][0], array)
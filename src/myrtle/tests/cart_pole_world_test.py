@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+from myrtle.worlds import cart_pole
+
+
+@pytest.fixture
+def initialize_world():
+    world = cart_pole.CartPole(verbose=False)
+    yield world
+
+
+def test_initialization(initialize_world):
+    world = initialize_world
+
+    assert world.n_sensors == 4
+    assert world.n_actions == 7
+    assert world.n_rewards == 1
+    assert np.all(world.state == 0)
+
+
+def test_step_world(initialize_world):
+    world = initialize_world
+    world.actions = np.zeros(world.n_actions)
+    world.actions[-1] = 1
+    world.step_world_substeps(world.world_steps_per_loop_step)
+
+    # Pushing the cart right swings the bottom of the pole left,
+    # which is clockwise.
+    x, angle, velocity, angular_velocity = world.state
+    assert x > 0 and velocity > 0
+    assert angle > np.pi and angular_velocity < 0
+
+    world.sense()
+    assert world.rewards[0] > 0
+    assert np.array_equal(world.sensors, world.state)
+
+
+def test_track_limits(initialize_world):
+    world = initialize_world
+    for _ in range(200):
+        world.actions = np.zeros(world.n_actions)
+        world.actions[-1] = 1
+        world.step_world_substeps(world.world_steps_per_loop_step)
+
+    assert world.state[0] == world.track_half_length
+    assert world.state[2] == 0.0
+
+
+def test_substeps_match_steps(initialize_world):
+    world = initialize_world
+    stepwise = cart_pole.CartPole(verbose=False)
+
+    world.actions = np.zeros(world.n_actions)
+    world.actions[1] = 1
+    stepwise.actions = world.actions.copy()
+    world.step_world_substeps(world.world_steps_per_loop_step)
+    stepwise.step_world()
+    stepwise.actions = np.zeros(world.n_actions)
+    for _ in range(world.world_steps_per_loop_step - 1):
+        stepwise.step_world()
+
+    assert np.array_equal(world.state, stepwise.state)
+
+
+def test_sensor_variants():
+    discrete = cart_pole.CartPoleDiscrete(verbose=False)
+    one_hot = cart_pole.CartPoleDiscreteOneHot(verbose=False)
+    for world in [discrete, one_hot]:
+        world.state[:] = [0.1, np.pi, -0.5, 2.0]
+        world.sense()
+
+    assert discrete.n_sensors == np.sum(discrete.n_bins)
+    assert np.sum(discrete.sensors) == 4
+    assert one_hot.n_sensors == np.prod(one_hot.n_bins)
+    assert np.sum(one_hot.sensors) == 1
+
+    # The one-hot index combines the same bins the discrete sensors use.
+    i_bins = np.where(discrete.sensors)[0] - (
+        np.cumsum(discrete.n_bins) - discrete.n_bins
+    )
+    i_state = np.ravel_multi_index(i_bins, one_hot.n_bins)
+    assert one_hot.sensors[i_state] == 1
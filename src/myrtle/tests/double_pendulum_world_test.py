@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+from myrtle.worlds import double_pendulum
+
+
+@pytest.fixture
+def initialize_world():
+    world = double_pendulum.DoublePendulum(verbose=False)
+    yield world
+
+
+def energy(world):
+    gravity, mass_1, mass_2, length_1, length_2, _ = world.params
+    angle_1, angle_2, angular_velocity_1, angular_velocity_2 = world.state
+    kinetic = (
+        0.5 * (mass_1 + mass_2) * length_1**2 * angular_velocity_1**2
+        + 0.5 * mass_2 * length_2**2 * angular_velocity_2**2
+        + mass_2
+        * length_1
+        * length_2
+        * angular_velocity_1
+        * angular_velocity_2
+        * np.cos(angle_1 - angle_2)
+    )
+    potential = -(mass_1 + mass_2) * gravity * length_1 * np.cos(
+        angle_1
+    ) - mass_2 * gravity * length_2 * np.cos(angle_2)
+    return kinetic + potential
+
+
+def test_initialization(initialize_world):
+    world = initialize_world
+
+    assert world.n_sensors == 4
+    assert world.n_actions == 7
+    assert world.n_rewards == 1
+    world.sense()
+    assert world.rewards[0] == 0.0
+
+
+def test_energy(initialize_world):
+    world = initialize_world
+    world.actions = np.zeros(world.n_actions)
+    world.state[:] = [1.0, 0.5, 0.0, 0.0]
+
+    # Without friction, energy is roughly conserved.
+    world.params[5] = 0.0
+    start_energy = energy(world)
+    world.step_world_substeps(int(world.world_steps_per_second))
+    assert np.abs(energy(world) - start_energy) < 0.02 * np.abs(start_energy)
+
+    # With friction, it drains away.
+    world.params[5] = 0.1
+    start_energy = energy(world)
+    world.step_world_substeps(int(world.world_steps_per_second))
+    assert energy(world) < start_energy
+
+
+def test_inverted(initialize_world):
+    world = initialize_world
+    world.state[:] = [np.pi, np.pi, 0.0, 0.0]
+    world.sense()
+    assert world.rewards[0] == pytest.approx(2.0)
+
+
+def test_sensor_variants():
+    one_hot = double_pendulum.DoublePendulumDiscreteOneHot(verbose=False)
+    one_hot.sense()
+    assert one_hot.n_sensors == np.prod(one_hot.n_bins)
+    assert np.sum(one_hot.sensors) == 1
+
+    discrete = double_pendulum.DoublePendulumDiscrete(verbose=False)
+    discrete.sense()
+    assert discrete.n_sensors == np.sum(discrete.n_bins)
+    assert np.sum(discrete.sensors) == 4
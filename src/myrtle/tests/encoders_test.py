@@ -0,0 +1,54 @@
+import numpy as np
+from myrtle.worlds.tools.encoders import (
+    BinEdges,
+    DiscreteEncoder,
+    ProductOneHotEncoder,
+    UniformBins,
+)
+
+
+def test_uniform_bins():
+    bins = UniformBins(0.0, 2 * np.pi, 36)
+    assert bins.n_bins == 36
+    assert bins.bin(0.0) == 0
+    assert bins.bin(np.pi) == 18
+    assert bins.bin(-1.0) == 0
+    assert bins.bin(2 * np.pi) == 35
+    assert bins.bin(100.0) == 35
+
+
+def test_bin_edges():
+    edges = np.linspace(-15.0, 15.0, 61)
+    bins = BinEdges(edges)
+    assert bins.n_bins == 62
+
+    # Matches counting the edges below the value.
+    for value in [-20.0, -15.0, -0.2, 0.0, 0.3, 14.9, 15.0, 20.0]:
+        assert bins.bin(value) == np.sum(value > edges)
+
+
+def test_discrete_encoder():
+    encoder = DiscreteEncoder([UniformBins(0, 4, 4), BinEdges([0.0, 1.0])])
+    assert encoder.n_outputs == 7
+
+    sensors = encoder.encode([2, 0.5])
+    assert np.array_equal(sensors, [0, 0, 1, 0, 0, 1, 0])
+    assert np.array_equal(encoder.active([2, 0.5]), [2, 5])
+
+    # The previously active elements get cleared.
+    sensors = encoder.encode([3, 5.0])
+    assert np.array_equal(sensors, [0, 0, 0, 1, 0, 0, 1])
+
+
+def test_product_one_hot_encoder():
+    n_bins = [3, 4, 5]
+    encoder = ProductOneHotEncoder([UniformBins(0, n, n) for n in n_bins])
+    assert encoder.n_outputs == 60
+
+    for values in [(0, 0, 0), (2, 3, 4), (1, 2, 3), (2, 0, 1)]:
+        i_state = np.ravel_multi_index(values, n_bins)
+        assert np.array_equal(encoder.active(values), [i_state])
+
+        sensors = encoder.encode(values)
+        assert np.sum(sensors) == 1
+        assert sensors[i_state] == 1
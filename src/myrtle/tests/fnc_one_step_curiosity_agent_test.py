@@ -0,0 +1,116 @@
+import multiprocessing as mp
+import pytest
+import numpy as np
+from myrtle.agents.fnc_one_step_curiosity import FNCOneStepCuriosity
+
+np.random.seed(42)
+
+_n_sensors = 50
+_n_actions = 4
+_n_rewards = 2
+
+
+@pytest.fixture
+def initialize_agent():
+    agent = FNCOneStepCuriosity(
+        n_sensors=_n_sensors,
+        n_actions=_n_actions,
+        n_rewards=_n_rewards,
+        q_action=mp.Queue(),
+        q_reward=mp.Queue(),
+        q_sensor=mp.Queue(),
+    )
+    agent.reset()
+    agent.i_step = 0
+
+    yield agent
+
+    agent.close()
+
+
+def test_creation(initialize_agent):
+    agent = initialize_agent
+    assert agent.n_sensors == _n_sensors
+    assert agent.n_actions == _n_actions
+    assert agent.n_rewards == _n_rewards
+    assert agent.curiosities.shape == (_n_sensors, _n_actions + 2)
+
+
+def test_inactive_curiosities_unchanged(initialize_agent):
+    agent = initialize_agent
+    agent.curiosities[:] = 1.0
+    agent.sensors = np.zeros(_n_sensors)
+    agent.sensors[[3, 17]] = 1.0
+    agent.rewards = np.array([1.0, np.nan])
+
+    agent.choose_action()
+    # Choosing the action leaves the curiosities for learn() to update.
+    assert np.all(agent.curiosities == 1.0)
+    agent.finish_choice()
+
+    inactive = np.ones(_n_sensors, dtype=bool)
+    inactive[[3, 17]] = False
+    assert np.all(agent.curiosities[inactive] == 1.0)
+
+    i_action = np.where(agent.actions)[0][0]
+    assert np.all(agent.curiosities[[3, 17], i_action] == 0.0)
+
+
+def test_no_active_sensors(initialize_agent):
+    agent = initialize_agent
+    agent.curiosities[:] = 1.0
+    agent.sensors = np.zeros(_n_sensors)
+    agent.rewards = np.zeros(2)
+
+    agent.choose_action()
+    agent.finish_choice()
+
+    assert np.all(agent.curiosities == 1.0)
+
+
+def test_compact_dtypes():
+    agent = FNCOneStepCuriosity(
+        n_sensors=_n_sensors,
+        n_actions=_n_actions,
+        n_rewards=_n_rewards,
+        dtypes="compact",
+    )
+    agent.reset()
+    agent.i_step = 0
+    agent.sensors = np.zeros(_n_sensors)
+    agent.sensors[[3, 17]] = 1.0
+    agent.rewards = np.array([1.0, np.nan])
+
+    for _ in range(3):
+        agent.choose_action()
+
+    assert agent.curiosities.dtype == np.float32
+    assert agent.actions.dtype == np.int8
+    agent.close()
+
+
+def test_last_action_of_episode_learned():
+    agent = FNCOneStepCuriosity(
+        n_sensors=_n_sensors,
+        n_actions=_n_actions,
+        n_rewards=_n_rewards,
+        seed=0,
+    )
+    agent.reset()
+    for i_step in range(3):
+        agent.i_step = i_step
+        agent.sensors = np.zeros(_n_sensors)
+        agent.sensors[i_step] = 1.0
+        agent.rewards = np.zeros(_n_rewards)
+        agent.choose_action()
+    last_actions = agent.actions.copy()
+
+    # The model hears about the last action of the episode
+    # at the start of the next one.
+    agent.reset()
+    agent.i_step = 0
+    agent.sensors = np.zeros(_n_sensors)
+    agent.rewards = np.zeros(_n_rewards)
+    agent.choose_action()
+    assert np.array_equal(agent.model.actions[:_n_actions], last_actions)
+    agent.close()
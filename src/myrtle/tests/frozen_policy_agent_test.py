@@ -0,0 +1,87 @@
+import pickle
+import numpy as np
+from myrtle.agents.frozen_policy import FrozenPolicyAgent
+from myrtle.agents.q_learning_eps import QLearningEpsilon
+from myrtle.agents.tools.frozen_policy import FrozenPolicy, export_policy
+from myrtle.sensors import SparseSensors
+
+_n_sensors = 6
+_n_states = 300
+
+
+def trained_agent(n_actions):
+    agent = QLearningEpsilon(n_sensors=_n_sensors, n_actions=n_actions, n_rewards=1)
+    rng = np.random.default_rng(0)
+    for _ in range(_n_states):
+        sensors = rng.integers(4, size=_n_sensors).astype(float)
+        agent.q_values[sensors.tobytes()] = rng.normal(size=n_actions)
+    return agent
+
+
+def best_action(values):
+    # States where every action ties have no best action.
+    if np.all(values == values[0]):
+        return None
+    return np.argmax(values)
+
+
+def test_export(tmp_path):
+    agent = trained_agent(n_actions=5)
+    export_policy(agent, tmp_path)
+    policy = FrozenPolicy(tmp_path)
+
+    assert len(policy) == len(agent.q_values)
+    assert policy.actions.dtype == np.int8
+    for key in agent.q_values.keys():
+        assert policy.action(key) == best_action(agent.q_values[key])
+    assert policy.action(np.full(_n_sensors, 9.0).tobytes()) is None
+
+
+def test_many_actions(tmp_path):
+    agent = trained_agent(n_actions=300)
+    export_policy(agent, tmp_path)
+    policy = FrozenPolicy(tmp_path)
+    assert len(policy) == len(agent.q_values)
+    assert policy.actions.dtype == np.int16
+    for key in agent.q_values.keys():
+        assert policy.action(key) == best_action(agent.q_values[key])
+
+
+def test_frozen_policy_agent(tmp_path):
+    agent = trained_agent(n_actions=5)
+    sensors = np.array([0, 3, 0, 0, 1, 0], dtype=float)
+    agent.q_values[sensors.tobytes()] = [0, 0, 0, 1, 0]
+    sparse_sensors = SparseSensors.from_dense(sensors)
+    agent.q_values[sparse_sensors.tobytes()] = [0, 1, 0, 0, 0]
+    tied_sensors = np.array([1, 1, 0, 0, 0, 0], dtype=float)
+    agent.q_values[tied_sensors.tobytes()] = [2, 2, 2, 2, 2]
+    export_policy(agent, tmp_path)
+
+    frozen = FrozenPolicyAgent(
+        policy_path=tmp_path, n_sensors=_n_sensors, n_actions=5, n_rewards=1
+    )
+    # The policy is only opened once it's needed, after the agent
+    # has been handed off to its own process.
+    frozen = pickle.loads(pickle.dumps(frozen))
+
+    frozen.sensors = sensors
+    frozen.act()
+    assert np.array_equal(frozen.actions, [0, 0, 0, 1, 0])
+
+    frozen.sensors = sparse_sensors
+    frozen.act()
+    assert np.array_equal(frozen.actions, [0, 1, 0, 0, 0])
+
+    # States that weren't in the trained agent get a random action.
+    frozen.sensors = np.full(_n_sensors, 9.0)
+    frozen.act()
+    assert np.sum(frozen.actions) == 1
+
+    # So do states where every action was equally good.
+    frozen.sensors = tied_sensors
+    i_actions = set()
+    for _ in range(50):
+        frozen.act()
+        assert np.sum(frozen.actions) == 1
+        i_actions.add(int(np.argmax(frozen.actions)))
+    assert len(i_actions) > 1
@@ -4,6 +4,7 @@ Longer-running tests, providing a deeper functionality check
 
 import os
 import time
+import numpy as np
 from sqlogging import logging
 from myrtle import bench
 from myrtle.config import log_directory
@@ -15,6 +16,7 @@ from myrtle.agents.greedy_state_blind_eps import GreedyStateBlindEpsilon
 from myrtle.agents.value_avg_curiosity import ValueAvgCuriosity
 from myrtle.agents.q_learning_eps import QLearningEpsilon
 from myrtle.agents.q_learning_curiosity import QLearningCuriosity
+from myrtle.agents.q_learning_tile_coding import QLearningTileCoding
 from myrtle.agents.q_learning_ziptie_curiosity import QLearningZiptieCuriosity
 from myrtle.agents.q_learning_buckettree_ziptie import QLearningBuckettreeZiptie
 from myrtle.agents.fnc_one_step_curiosity import FNCOneStepCuriosity
@@ -261,6 +263,25 @@ def test_pendulum_world_q_learning_curiosity_agent():
     )
 
 
+def test_pendulum_world_q_learning_tile_coding_agent():
+    agent_args = {
+        "curiosity_scale": 1.0,
+        "discount_factor": 0.5,
+        "learning_rate": 0.1,
+        "sensor_lows": [0.0, -15.0],
+        "sensor_highs": [2 * np.pi, 15.0],
+    }
+    run_world_with_agent(
+        Pendulum,
+        QLearningTileCoding,
+        n_loop_steps=int(1e4),
+        agent_args=agent_args,
+        reward_lower_bound=0.0,
+        reward_upper_bound=1.0,
+        timeout=_long_timeout,
+    )
+
+
 def test_pendulum_discrete_world_q_learning_curiosity_agent():
     agent_args = {
         "curiosity_scale": 1.0,
@@ -1,5 +1,6 @@
 import pytest
 import numpy as np
+from myrtle.rewards import total_reward
 from myrtle.worlds import intermittent_reward_bandit
 
 
@@ -30,11 +31,7 @@ def test_sense(initialize_world):
     sum_reward = 0.0
     for _ in range(n_tries):
         world.sense()
-        reward_total = 0
-        for r in world.rewards:
-            if r is not None:
-                reward_total += r
-        sum_reward += reward_total
+        sum_reward += total_reward(world.rewards)
     mean_reward = sum_reward / n_tries
     # Should be ~100 +/- some variance
     assert mean_reward > 90.0
@@ -51,6 +48,6 @@ def test_intermittency(initialize_world):
     found_none = False
     for _ in range(n_tries):
         world.sense()
-        if world.rewards[1] is None:
+        if np.isnan(world.rewards[1]):
             found_none = True
     assert found_none
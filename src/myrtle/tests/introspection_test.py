@@ -0,0 +1,173 @@
+from threading import Thread
+import time
+import numpy as np
+from buckettree.bucket_tree import BucketTree
+from ziptie.algo import Ziptie
+import dsmq.client
+from myrtle.agents.tools import (
+    buckettree_channel,
+    publish_buckettrees_info,
+    publish_ziptie_info,
+    retrieve_buckettree_info,
+    retrieve_ziptie_info,
+    ziptie_channel,
+)
+from myrtle.agents.tools.block_ziptie import BlockZiptie
+from myrtle.agents.tools.introspection import (
+    downsample,
+    downsample_pairs,
+    subscription_topic,
+)
+from myrtle.config import mq_host, mq_port
+
+# Exclude pytest fixtures from some checks because they behave in peculiar ways.
+from myrtle.tests.fixtures import setup_mq_server, setup_mq_client  # noqa: F401
+
+_n_cables = 100
+_max_side = 16
+_timeout = 5.0  # seconds
+_pause = 0.05  # seconds
+
+
+def build_ziptie():
+    ziptie = Ziptie(n_cables=_n_cables, n_bundles_max=_n_cables, threshold=1.0)
+    rng = np.random.default_rng(5)
+    for _ in range(200):
+        ziptie.create_new_bundles()
+        ziptie.grow_bundles()
+        ziptie.update_bundles(rng.uniform(size=_n_cables) * (rng.uniform() > 0.5))
+    return ziptie
+
+
+def publish_until_retrieved(retrieve, publish):
+    """
+    Keep publishing, the way an agent would, until a subscriber
+    in another thread receives a message.
+    """
+    mq_subscriber = dsmq.client.connect(mq_host, mq_port)
+    results = []
+    subscriber = Thread(target=lambda: results.append(retrieve(mq_subscriber)))
+    subscriber.start()
+    start = time.time()
+    while subscriber.is_alive() and time.time() - start < _timeout:
+        publish()
+        time.sleep(_pause)
+    subscriber.join()
+    mq_subscriber.close()
+    return results[0]
+
+
+def test_no_subscribers(setup_mq_server, setup_mq_client):  # noqa: F811
+    mq = setup_mq_client
+    channel = ziptie_channel()
+    ziptie = build_ziptie()
+    for i_step in range(10):
+        publish_ziptie_info(ziptie, mq, channel, i_step, 0)
+    assert channel.n_published == 0
+
+
+def test_ziptie_round_trip(setup_mq_server, setup_mq_client):  # noqa: F811
+    mq = setup_mq_client
+    channel = ziptie_channel(max_side=_max_side)
+    ziptie = build_ziptie()
+    assert ziptie.n_bundles > 0
+
+    info = publish_until_retrieved(
+        retrieve_ziptie_info,
+        lambda: publish_ziptie_info(ziptie, mq, channel, 7, 2),
+    )
+    assert info is not None
+    assert channel.n_published > 0
+    assert info["step"] == 7
+    assert info["episode"] == 2
+    assert info["n_bundles"] == ziptie.n_bundles
+    n_cables_by_bundle = ziptie.n_cables_by_bundle[: ziptie.n_bundles]
+    assert np.array_equal(
+        info["mapping"],
+        ziptie.mapping[: ziptie.n_bundles, : np.max(n_cables_by_bundle)],
+    )
+    # 100 cables in strides of 7 gives 15 rows and columns.
+    assert info["nucleation_energy"].shape == (15, 15)
+    assert np.allclose(
+        info["nucleation_energy"].max(), ziptie.nucleation_energy.max(), rtol=1e-3
+    )
+
+
+def test_buckettree_round_trip(setup_mq_server, setup_mq_client):  # noqa: F811
+    mq = setup_mq_client
+    channel = buckettree_channel()
+    rng = np.random.default_rng(9)
+    buckettrees = [BucketTree(bucket_size=10, max_buckets=20) for _ in range(3)]
+    for _ in range(300):
+        for tree in buckettrees:
+            tree.bin(rng.normal())
+
+    info = publish_until_retrieved(
+        retrieve_buckettree_info,
+        lambda: publish_buckettrees_info(buckettrees, mq, channel, 11, 0),
+    )
+    assert info is not None
+    n_buckets = max(tree.n_buckets for tree in buckettrees)
+    assert info["highs"].shape == (3, n_buckets)
+    for i_tree, tree in enumerate(buckettrees):
+        assert np.array_equal(info["highs"][i_tree], tree.highs[:n_buckets])
+        assert np.array_equal(info["levels"][i_tree], tree.levels[:n_buckets])
+
+
+def test_rate_limit(setup_mq_server, setup_mq_client):  # noqa: F811
+    mq = setup_mq_client
+    bytes_per_second = 20_000
+    channel = ziptie_channel(bytes_per_second=bytes_per_second)
+    ziptie = build_ziptie()
+    mq.put(subscription_topic(channel.topic), "subscribe")
+
+    start = time.time()
+    n_attempts = 0
+    while time.time() - start < 1.0:
+        publish_ziptie_info(ziptie, mq, channel, n_attempts, 0)
+        n_attempts += 1
+    elapsed = time.time() - start
+
+    assert channel.n_published > 0
+    assert channel.n_published < n_attempts
+    # One second's worth of burst, plus at most one message of overdraft.
+    message_size = channel.n_bytes_published / channel.n_published
+    assert channel.n_bytes_published <= (
+        bytes_per_second * (1 + elapsed) + message_size
+    )
+
+
+def test_downsample():
+    array = np.zeros((100, 30))
+    array[99, 3] = 1.0
+    small = downsample(array, 16)
+    # 100 rows in strides of 7 gives 15 rows. 30 columns in strides of 2 gives 15.
+    assert small.shape == (15, 15)
+    assert small[14, 1] == 1.0
+    assert np.sum(small) == 1.0
+
+
+def test_downsample_pairs():
+    ziptie = BlockZiptie(
+        n_cables=_n_cables, block_size=10, n_bundles_max=40, threshold=1.0
+    )
+    rng = np.random.default_rng(6)
+    for _ in range(200):
+        ziptie.create_new_bundles()
+        ziptie.grow_bundles()
+        ziptie.update_bundles(rng.uniform(size=_n_cables) * (rng.uniform() > 0.5))
+    assert ziptie.n_bundles > 0
+
+    nucleation_energy = downsample_pairs(
+        ziptie.nucleation_pairs, ziptie.n_cables, _max_side
+    )
+    assert np.array_equal(
+        nucleation_energy, downsample(ziptie.nucleation_energy_dense(), _max_side)
+    )
+    agglomeration_energy = downsample_pairs(
+        ziptie.agglomeration_pairs, ziptie.n_bundles_max, _max_side
+    )
+    assert np.array_equal(
+        agglomeration_energy,
+        downsample(ziptie.agglomeration_energy_dense(), _max_side),
+    )
@@ -0,0 +1,48 @@
+import pytest
+import numpy as np
+from myrtle.worlds import mountain_car
+
+
+@pytest.fixture
+def initialize_world():
+    world = mountain_car.MountainCar(verbose=False)
+    yield world
+
+
+def run(world, policy, n_loop_steps):
+    reached = False
+    for _ in range(n_loop_steps):
+        world.actions = np.zeros(world.n_actions)
+        world.actions[policy(world.state)] = 1
+        world.step_world_substeps(world.world_steps_per_loop_step)
+        world.sense()
+        reached = reached or world.rewards[0] > 0
+    return reached
+
+
+def test_initialization(initialize_world):
+    world = initialize_world
+
+    assert world.n_sensors == 2
+    assert world.n_actions == 3
+    assert world.n_rewards == 1
+    assert world.state[0] == pytest.approx(-np.pi / 6)
+
+
+def test_underpowered(initialize_world):
+    world = initialize_world
+    # Full throttle straight at the hill isn't enough.
+    assert not run(world, lambda state: 2, 400)
+
+
+def test_rocking(initialize_world):
+    world = initialize_world
+    # Pushing in the direction of motion builds up enough momentum.
+    assert run(world, lambda state: 2 if state[1] >= 0 else 0, 400)
+
+
+def test_sensor_variants():
+    one_hot = mountain_car.MountainCarDiscreteOneHot(verbose=False)
+    one_hot.sense()
+    assert one_hot.n_sensors == 400
+    assert np.sum(one_hot.sensors) == 1
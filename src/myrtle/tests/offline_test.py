@@ -0,0 +1,114 @@
+import pickle
+import numpy as np
+from myrtle import offline
+from myrtle.agents.fnc_ziptie_one_step import FNCZiptieOneStep
+from myrtle.agents.q_learning_curiosity import QLearningCuriosity
+from myrtle.agents.q_learning_eps import QLearningEpsilon
+from myrtle.agents.tools.q_table import QTable
+from myrtle.trace import TraceWriter, replay
+
+_n_sensors = 3
+_n_actions = 4
+_n_rewards = 1
+_n_episodes = 4
+_n_steps = 50
+
+
+def write_trace(path):
+    rng = np.random.default_rng(0)
+    writer = TraceWriter(path, chunk_size=64)
+    for i_episode in range(_n_episodes):
+        for i_step in range(_n_steps):
+            sensors = np.zeros(_n_sensors)
+            sensors[rng.integers(_n_sensors)] = 1
+            actions = np.zeros(_n_actions)
+            actions[rng.integers(_n_actions)] = 1
+            writer.record(i_episode, i_step, sensors, rng.random(_n_rewards), actions)
+    writer.close()
+
+
+def new_agent(Agent):
+    return Agent(
+        n_sensors=_n_sensors, n_actions=_n_actions, n_rewards=_n_rewards, seed=5
+    )
+
+
+def test_train_matches_replay(tmp_path):
+    write_trace(tmp_path)
+    trained = offline.train(new_agent(QLearningEpsilon), tmp_path, chunk_size=7)
+    replayed = new_agent(QLearningEpsilon)
+    replay(replayed, tmp_path)
+
+    assert len(trained.q_values) == _n_sensors + 1
+    for state in replayed.q_values.keys():
+        assert np.array_equal(trained.q_values[state], replayed.q_values[state])
+
+
+def test_q_table_merge():
+    table_a = QTable(2, initial_capacity=1)
+    table_a[b"a"] = [1.0, 2.0]
+    table_a[b"b"] = [3.0, 4.0]
+    table_b = QTable(2)
+    table_b[b"c"] = [5.0, 6.0]
+    table_b[b"b"] = [5.0, 8.0]
+
+    table_a.merge([table_b])
+    assert list(table_a.keys()) == [b"a", b"b", b"c"]
+    assert np.array_equal(table_a[b"a"], [1.0, 2.0])
+    assert np.array_equal(table_a[b"b"], [4.0, 6.0])
+    assert np.array_equal(table_a[b"c"], [5.0, 6.0])
+
+
+def test_train_sharded(tmp_path):
+    write_trace(tmp_path)
+    agent = offline.train_sharded(
+        QLearningCuriosity, tmp_path, agent_args={"seed": 5}, n_workers=2
+    )
+    assert agent.n_sensors == _n_sensors
+    assert len(agent.q_values) == _n_sensors + 1
+    # Each of the states was visited once per step, across all the episodes.
+    n_visits = sum(np.sum(counts) for counts in agent.counts.values())
+    assert n_visits == _n_episodes * _n_steps
+
+
+def test_warm_start(tmp_path):
+    write_trace(tmp_path / "trace")
+    trained = offline.train(new_agent(QLearningEpsilon), tmp_path / "trace")
+    offline.save_agent(trained, tmp_path / "agent.pkl")
+
+    agent = QLearningEpsilon(n_sensors=_n_sensors, n_actions=_n_actions, seed=6)
+    agent.warm_start(offline.load_agent(tmp_path / "agent.pkl"))
+    assert agent.n_rewards == _n_rewards
+    for state in trained.q_values.keys():
+        assert np.array_equal(agent.q_values[state], trained.q_values[state])
+    # The agent keeps its own random numbers.
+    assert agent.rng.random() == np.random.default_rng(6).random()
+
+
+def test_warm_start_background_helpers():
+    trained = FNCZiptieOneStep(
+        n_sensors=_n_sensors,
+        n_actions=_n_actions,
+        n_rewards=_n_rewards,
+        ziptie_background_learning=True,
+    )
+    agent = FNCZiptieOneStep(
+        n_sensors=_n_sensors,
+        n_actions=_n_actions,
+        n_rewards=_n_rewards,
+        ziptie_background_learning=True,
+    )
+    learner = agent.ziptie_learner
+    learner.step(np.ones(_n_sensors))
+    assert learner.worker is not None
+    snapshots = agent.fnc_snapshots
+
+    agent.warm_start(pickle.loads(pickle.dumps(trained)))
+    # The replaced structure learner has been stopped.
+    assert learner.worker is None
+    assert agent.ziptie_learner is not learner
+    # The agent keeps writing to its own snapshot archives.
+    assert agent.fnc_snapshots is snapshots
+
+    trained.close()
+    agent.close()
@@ -0,0 +1,72 @@
+import json
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from myrtle import pbt
+from myrtle.agents.q_learning_eps import QLearningEpsilon
+from myrtle.worlds.contextual_bandit import ContextualBandit
+
+_n_members = 4
+_n_rounds = 3
+
+
+def run_population(lineage_path, seed):
+    return pbt.run(
+        QLearningEpsilon,
+        ContextualBandit,
+        hyperparameters={"epsilon": (0.05, 0.5), "learning_rate": (0.01, 0.3)},
+        n_members=_n_members,
+        n_rounds=_n_rounds,
+        steps_per_round=60,
+        exploit_fraction=0.5,
+        seed=seed,
+        lineage_path=lineage_path,
+    )
+
+
+def test_population(tmp_path):
+    agent, lineage = run_population(tmp_path / "lineage.jsonl", seed=3)
+    assert isinstance(agent, QLearningEpsilon)
+    assert len(lineage) == _n_members * _n_rounds
+
+    with open(tmp_path / "lineage.jsonl") as f:
+        assert [json.loads(line) for line in f] == lineage
+
+    # After the first round, the bottom half are copies of the top half,
+    # with their hyperparameters nudged.
+    for record in lineage[_n_members:]:
+        i_parent = record["parent"]
+        if i_parent is None:
+            continue
+        previous_round = lineage[(record["round"] - 1) * _n_members :][:_n_members]
+        parent = previous_round[i_parent]
+        assert parent["reward"] >= previous_round[record["member"]]["reward"]
+        for name, value in record["hyperparameters"].items():
+            factor = value / parent["hyperparameters"][name]
+            assert np.isclose(factor, 0.8) or np.isclose(factor, 1.25)
+    n_copies = sum(record["parent"] is not None for record in lineage)
+    assert n_copies == (_n_rounds - 1) * _n_members // 2
+
+
+def test_seeded_populations_repeat(tmp_path):
+    _, lineage_a = run_population(None, seed=4)
+    _, lineage_b = run_population(None, seed=4)
+    assert lineage_a == lineage_b
+
+
+def test_no_rounds():
+    with pytest.raises(ValueError):
+        pbt.run(
+            QLearningEpsilon,
+            ContextualBandit,
+            hyperparameters={"epsilon": (0.05, 0.5)},
+            n_rounds=0,
+        )
+
+
+def test_set_attribute():
+    agent = SimpleNamespace(epsilon=0.1, model=SimpleNamespace(reward_update_rate=0.3))
+    pbt._set_attribute(agent, "epsilon", 0.2)
+    pbt._set_attribute(agent, "model.reward_update_rate", 0.5)
+    assert agent.epsilon == 0.2
+    assert agent.model.reward_update_rate == 0.5
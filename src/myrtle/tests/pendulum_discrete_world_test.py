@@ -35,3 +35,16 @@ def test_step_sensors(
     world.step_sensors()
 
     assert np.sum(world.sensors) == 2
+
+
+def test_sparse_sensors():
+    dense = pendulum_discrete.PendulumDiscrete(verbose=False)
+    sparse = pendulum_discrete.PendulumDiscrete(verbose=False, sparse_sensors=True)
+    for world in [dense, sparse]:
+        world.write_pendulum_state = lambda: None
+        world.position = 2.0
+        world.velocity = -3.3
+        world.step_sensors()
+
+    assert sparse.sensors.indices.size == 2
+    assert np.array_equal(sparse.sensors.to_dense(), dense.sensors)
@@ -54,3 +54,29 @@ def test_step_world(
 
     assert world.velocity > 0.8
     assert world.position > 0.005 and world.position < 0.05
+
+
+def test_step_world_substeps(initialize_world):
+    world = initialize_world
+    stepwise = pendulum.Pendulum(
+        q_action=mp.Queue(),
+        q_reward=mp.Queue(),
+        q_sensor=mp.Queue(),
+    )
+    for i_action in [0, 12, 5, 9]:
+        world.actions = np.zeros(world.n_actions)
+        world.actions[i_action] = 1
+        stepwise.actions = world.actions.copy()
+
+        world.step_world_substeps(world.world_steps_per_loop_step)
+        # When world steps are paced, actions go back to zero
+        # on the world steps where no new actions arrive.
+        stepwise.step_world()
+        stepwise.actions = np.zeros(world.n_actions)
+        for _ in range(world.world_steps_per_loop_step - 1):
+            stepwise.step_world()
+
+    assert world.position == stepwise.position
+    assert world.velocity == stepwise.velocity
+    assert np.array_equal(world.torque_buffer.x, stepwise.torque_buffer.x)
+    assert world.torque_buffer.i == stepwise.torque_buffer.i
@@ -0,0 +1,129 @@
+import numpy as np
+from cartographer.model import NaiveCartographer as Model
+from myrtle.agents.fnc_one_step_curiosity import FNCOneStepCuriosity
+from myrtle.agents.tools.prediction_cache import PredictionCache
+
+_n_features = 16
+_n_actions = 4
+_n_steps = 500
+
+
+def initialize_model():
+    # With no decay of feature activities, the model sees exactly the
+    # feature vectors it's given, and repeats are easy to come by.
+    return Model(
+        n_sensors=_n_features,
+        n_actions=_n_actions,
+        n_rewards=1,
+        feature_decay_rate=1.0,
+        trace_decay_rate=1.0,
+    )
+
+
+def run(model, cache, compare=False):
+    rng = np.random.default_rng(19)
+    actions = None
+    for _ in range(_n_steps):
+        # The model gets updated in the same order as in the agents' learn().
+        if actions is not None:
+            model.update_actions(actions)
+        # A handful of distinct one-hot states
+        # that each come with their own reward.
+        i_state = rng.choice(4)
+        features = np.zeros(_n_features)
+        features[i_state] = 1.0
+        model.update_sensors_and_rewards(features, float(i_state))
+        cache.update()
+
+        prediction = cache.predict()
+        if compare:
+            for cached, fresh in zip(prediction, model.predict()):
+                assert np.array_equal(cached, fresh)
+
+        actions = np.zeros(_n_actions)
+        actions[rng.choice(_n_actions)] = 1.0
+
+
+def test_exact_when_refresh_fraction_is_zero():
+    model = initialize_model()
+    cache = PredictionCache(model, refresh_fraction=0.0)
+    run(model, cache, compare=True)
+    assert cache.n_hits + cache.n_misses == _n_steps
+
+
+def test_repeated_features_hit():
+    model = initialize_model()
+    cache = PredictionCache(model, refresh_fraction=0.05)
+    run(model, cache)
+    assert cache.hit_rate() > 0.5
+
+
+def test_bounded_size():
+    model = initialize_model()
+    cache = PredictionCache(model, max_size=2, refresh_fraction=1.0)
+    run(model, cache)
+    assert len(cache.entries) == 2
+
+
+def test_disabled():
+    model = initialize_model()
+    cache = PredictionCache(model, max_size=0)
+    run(model, cache)
+    assert len(cache.entries) == 0
+    assert cache.n_hits == 0
+    assert cache.n_misses == 0
+
+
+def test_reward_changes_invalidate():
+    model = initialize_model()
+    cache = PredictionCache(model, refresh_fraction=0.5)
+    features = np.zeros(_n_features)
+    features[0] = 1.0
+    actions = np.zeros(_n_actions)
+    actions[0] = 1.0
+
+    # Visit the same state over and over, with no reward, until
+    # its occurrences are large enough that they barely grow.
+    for _ in range(_n_steps):
+        model.update_actions(actions)
+        model.update_sensors_and_rewards(features, 0.0)
+        cache.update()
+        cache.predict()
+
+    # A change in reward, with no noticeable change in occurrences,
+    # still gets the prediction refreshed.
+    model.update_actions(actions)
+    model.update_sensors_and_rewards(features, 100.0)
+    cache.update()
+    for cached, fresh in zip(cache.predict(), model.predict()):
+        assert np.array_equal(cached, fresh)
+
+
+def test_hits_through_agent():
+    # Apart from the cache, the agent keeps its default arguments,
+    # so feature activities decay gradually and never repeat exactly.
+    n_states = 4
+    agent = FNCOneStepCuriosity(
+        n_sensors=n_states,
+        n_actions=_n_actions,
+        n_rewards=1,
+        prediction_cache_size=1000,
+        seed=0,
+    )
+    agent.reset()
+    i_state = 0
+    for i_step in range(4 * _n_steps):
+        agent.i_step = i_step
+        agent.sensors = np.zeros(n_states)
+        agent.sensors[i_state] = 1.0
+        agent.rewards = np.array([float(i_state == n_states - 1)])
+        agent.choose_action()
+
+        # Each action moves a different number of states around a loop.
+        # Doing nothing stays put.
+        i_action = np.flatnonzero(agent.actions)
+        if i_action.size > 0:
+            i_state = (i_state + i_action[0] + 1) % n_states
+
+    assert agent.prediction_cache.hit_rate() > 0.5
+    agent.close()
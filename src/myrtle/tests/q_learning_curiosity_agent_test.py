@@ -85,3 +85,60 @@ def test_discount_factor_updating(initialize_agent):
     assert agent.q_values[agent.previous_sensors.tobytes()][0] == 100
     assert agent.q_values[agent.previous_sensors.tobytes()][1] == 62
     assert agent.q_values[agent.previous_sensors.tobytes()][2] == 100
+
+
+def test_tile_coding():
+    agent = QLearningCuriosity(
+        n_sensors=2,
+        n_actions=3,
+        n_rewards=1,
+        tile_coding=True,
+        n_tiles=4,
+        discount_factor=0.0,
+        learning_rate=0.5,
+    )
+    agent.reset()
+    agent.i_step = 0
+    for _ in range(2):
+        agent.sensors = np.array([0.3, 0.2])
+        agent.actions = np.array([0, 0, 1])
+        agent.rewards = [10]
+        agent.choose_action()
+
+    rows = agent.tile_coder.encode([0.3, 0.2])
+    assert np.mean(agent.q_values[rows, 2]) == 5
+    assert np.sum(agent.counts) == 2 * agent.tile_coder.n_tilings
+    agent.close()
+
+
+def test_compact_dtypes():
+    for tile_coding in [False, True]:
+        agent = QLearningCuriosity(
+            n_sensors=2,
+            n_actions=3,
+            n_rewards=1,
+            tile_coding=tile_coding,
+            discount_factor=0.0,
+            learning_rate=0.5,
+            dtypes="compact",
+        )
+        agent.reset()
+        agent.i_step = 0
+        for _ in range(3):
+            agent.sensors = np.array([0.3, 0.2])
+            agent.rewards = [10]
+            agent.choose_action()
+
+        if tile_coding:
+            q_values, counts = agent.q_values, agent.counts
+            curiosities = agent.curiosities
+        else:
+            key = agent.sensor_key()
+            q_values, counts = agent.q_values[key], agent.counts[key]
+            curiosities = agent.curiosities[key]
+        assert q_values.dtype == np.float32
+        assert counts.dtype == np.int32
+        assert curiosities.dtype == np.float32
+        assert agent.actions.dtype == np.int8
+        assert np.max(q_values) > 0
+        agent.close()
@@ -1,5 +1,6 @@
 import multiprocessing as mp
 import pytest
+import time
 import numpy as np
 from myrtle.agents.q_learning_eps import QLearningEpsilon
 
@@ -84,3 +85,49 @@ def test_discount_factor_updating(initialize_agent):
     assert agent.q_values[agent.previous_sensors.tobytes()][0] == 100
     assert agent.q_values[agent.previous_sensors.tobytes()][1] == 81
     assert agent.q_values[agent.previous_sensors.tobytes()][2] == 100
+
+
+def test_replay(initialize_agent):
+    agent = initialize_agent
+    agent.reset()
+    agent.i_step = 0
+
+    # Without a deadline there is no spare time for replay.
+    for _ in range(5):
+        agent.choose_action()
+    assert agent.replay_buffer.size == 4
+    assert agent.n_replay_batches == 0
+
+    agent.deadline = 10.0
+    agent.sensors_sent_timestamp = time.time()
+    agent.choose_action()
+    assert agent.replay_buffer.size == 5
+    assert agent.n_replay_batches == agent.max_replay_batches
+
+
+def test_tile_coding():
+    agent = QLearningEpsilon(
+        n_sensors=2,
+        n_actions=3,
+        n_rewards=1,
+        tile_coding=True,
+        sensor_lows=[0.0, -1.0],
+        sensor_highs=[1.0, 1.0],
+        discount_factor=0.0,
+        learning_rate=0.5,
+    )
+    assert agent.q_values.shape == (4096, 3)
+    agent.reset()
+    agent.i_step = 0
+    for _ in range(2):
+        agent.sensors = np.array([0.3, 0.2])
+        agent.actions = np.array([0, 0, 1])
+        agent.rewards = [10]
+        agent.choose_action()
+
+    rows = agent.tile_coder.encode([0.3, 0.2])
+    assert np.mean(agent.q_values[rows, 2]) == 5
+    # A nearby state shares most of the learning.
+    nearby_rows = agent.tile_coder.encode([0.31, 0.2])
+    assert np.mean(agent.q_values[nearby_rows, 2]) > 2.5
+    agent.close()
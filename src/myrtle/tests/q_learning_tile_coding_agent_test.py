@@ -0,0 +1,89 @@
+import multiprocessing as mp
+import pytest
+import numpy as np
+from myrtle.agents.q_learning_tile_coding import QLearningTileCoding
+
+np.random.seed(42)
+
+_n_sensors = 2
+_n_actions = 3
+_n_rewards = 2
+
+
+@pytest.fixture
+def initialize_agent():
+    agent = QLearningTileCoding(
+        n_sensors=_n_sensors,
+        n_actions=_n_actions,
+        n_rewards=_n_rewards,
+        sensor_lows=[0.0, -15.0],
+        sensor_highs=[2 * np.pi, 15.0],
+        q_action=mp.Queue(),
+        q_reward=mp.Queue(),
+        q_sensor=mp.Queue(),
+    )
+
+    yield agent
+
+    agent.close()
+
+
+def test_creation(initialize_agent):
+    agent = initialize_agent
+    assert agent.n_sensors == _n_sensors
+    assert agent.n_actions == _n_actions
+    assert agent.q_values.shape == (4096, _n_actions)
+
+
+def test_learning_rate_updating(initialize_agent):
+    agent = initialize_agent
+    agent.discount_factor = 0.0
+    agent.learning_rate = 0.5
+    agent.reset()
+
+    agent.sensors = np.array([1.0, 2.0])
+    agent.actions = np.array([0, 1, 0])
+    agent.rewards = [0, 64]
+    agent.i_step = 0
+    agent.choose_action()
+    rows = agent.rows
+
+    # The value of the state-action pair is the average over its tiles.
+    assert np.mean(agent.q_values[agent.previous_rows, 1]) == 0
+    agent.actions = np.array([0, 1, 0])
+    agent.rewards = [0, 128]
+    agent.choose_action()
+    assert np.mean(agent.q_values[rows, 1]) == 64
+
+    agent.actions = np.array([0, 1, 0])
+    agent.choose_action()
+    assert np.mean(agent.q_values[rows, 1]) == 96
+
+    # A nearby state shares most of the learning.
+    nearby_rows = agent.tile_coder.encode(np.array([1.01, 2.0]))
+    assert np.mean(agent.q_values[nearby_rows, 1]) > 48
+
+
+def test_shared_rows():
+    # With a single row, both tilings always land on it.
+    agent = QLearningTileCoding(
+        n_sensors=_n_sensors,
+        n_actions=_n_actions,
+        n_rewards=_n_rewards,
+        n_tilings=2,
+        n_rows=1,
+        discount_factor=0.0,
+        learning_rate=0.5,
+    )
+    agent.reset()
+    agent.sensors = np.array([1.0, 2.0])
+    agent.actions = np.array([0, 1, 0])
+    agent.rewards = [0, 64]
+    agent.i_step = 0
+    agent.choose_action()
+
+    # Each tiling's update lands, rather than one overwriting the other.
+    assert np.array_equal(agent.rows, [0, 0])
+    assert agent.q_values[0, 1] == 2 * 0.5 * 64
+    assert np.sum(agent.counts) == 2
+    agent.close()
@@ -0,0 +1,84 @@
+import numpy as np
+from myrtle.agents.tools.q_table import QTable
+from myrtle.agents.tools.replay_buffer import (
+    ReplayBuffer,
+    SumTree,
+    replay_q_learning,
+)
+
+np.random.seed(42)
+
+_n_actions = 3
+
+
+def test_ring_buffer_wraps():
+    buffer = ReplayBuffer(capacity=5)
+    for i in range(8):
+        buffer.add(i, i % _n_actions, float(i), i + 1)
+    assert buffer.size == 5
+    # The three oldest transitions have been overwritten.
+    assert sorted(buffer.states.tolist()) == [3, 4, 5, 6, 7]
+
+    _, states, actions, rewards, next_states = buffer.sample(100)
+    assert np.all(states >= 3)
+    assert np.array_equal(next_states, states + 1)
+    assert np.array_equal(rewards, states.astype(float))
+
+
+def test_sum_tree_sampling():
+    tree = SumTree(5)
+    priorities = np.array([1.0, 0.0, 3.0, 0.5, 0.5])
+    tree.update(np.arange(5), priorities)
+    assert tree.total() == np.sum(priorities)
+
+    n_samples = 50_000
+    counts = np.bincount(tree.sample(n_samples), minlength=5)
+    assert counts[1] == 0
+    assert np.allclose(counts / n_samples, priorities / np.sum(priorities), atol=0.01)
+
+
+def test_prioritized_replay():
+    buffer = ReplayBuffer(capacity=10, prioritized=True, priority_exponent=1.0)
+    for i in range(10):
+        buffer.add(i, 0, 0.0, i)
+    # Give one transition nearly all the priority.
+    buffer.update_priorities(np.arange(10), np.zeros(10))
+    buffer.update_priorities(np.array([4]), np.array([100.0]))
+    i_transitions, _, _, _, _ = buffer.sample(1000)
+    assert np.mean(i_transitions == 4) > 0.95
+
+
+def test_q_table_growth():
+    q_values = QTable(_n_actions, initial_capacity=2)
+    for i in range(5):
+        q_values[bytes([i])] = np.full(_n_actions, float(i))
+    assert len(q_values) == 5
+    assert q_values.values.shape[0] >= 5
+    for i in range(5):
+        assert bytes([i]) in q_values
+        assert np.all(q_values[bytes([i])] == i)
+    assert bytes([9]) not in q_values
+
+
+def test_replay_matches_single_updates():
+    q_values = QTable(_n_actions)
+    for i in range(4):
+        q_values.row(bytes([i]))
+    q_values.values[:] = np.random.sample(q_values.values.shape)
+    expected = q_values.values.copy()
+
+    # With a single transition in the buffer, every sample in the batch
+    # is the same transition, and the updates add together.
+    buffer = ReplayBuffer(capacity=10)
+    buffer.add(1, 2, 0.5, 3)
+    batch_size = 4
+    learning_rate = 0.1
+    discount_factor = 0.9
+    td_errors = replay_q_learning(
+        buffer, q_values, batch_size, learning_rate, discount_factor
+    )
+
+    td_error = 0.5 + discount_factor * np.max(expected[3]) - expected[1, 2]
+    expected[1, 2] += batch_size * learning_rate * td_error
+    assert np.allclose(td_errors, td_error)
+    assert np.allclose(q_values.values, expected)
@@ -0,0 +1,33 @@
+import json
+import numpy as np
+from myrtle.rewards import as_rewards, empty_rewards, rewards_to_list, total_reward
+
+
+def test_total_reward():
+    assert total_reward(np.array([1.5, np.nan, -0.5])) == 1.0
+    assert total_reward(empty_rewards(3)) == 0.0
+    assert total_reward(np.zeros(0)) == 0.0
+
+
+def test_legacy_lists():
+    rewards = as_rewards([2.0, None, 3])
+    assert rewards.dtype == np.float64
+    assert np.isnan(rewards[1])
+    assert total_reward([2.0, None, 3]) == 5.0
+
+
+def test_json_round_trip():
+    rewards = np.array([np.nan, 0.25, 7.0])
+    msg = json.dumps({"rewards": rewards_to_list(rewards)})
+    assert "NaN" not in msg
+
+    received = json.loads(msg)["rewards"]
+    assert received == [None, 0.25, 7.0]
+    assert np.array_equal(as_rewards(received), rewards, equal_nan=True)
+
+
+def test_batched_rewards():
+    rewards = np.array([[1.0, np.nan], [np.nan, np.nan], [2.0, 3.0]])
+    assert np.array_equal(total_reward(rewards, axis=-1), [1.0, 0.0, 5.0])
+    assert total_reward(rewards) == 6.0
+    assert rewards_to_list(rewards) == [[1.0, None], [None, None], [2.0, 3.0]]
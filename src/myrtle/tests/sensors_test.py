@@ -0,0 +1,41 @@
+import json
+import pickle
+import numpy as np
+from myrtle.sensors import SparseSensors, sensors_to_dict
+
+
+def test_dense_round_trip():
+    dense = np.array([0.0, 0.5, 0.0, 0.0, 2.0])
+    sparse = SparseSensors.from_dense(dense)
+    assert sparse.n_sensors == 5
+    assert np.array_equal(sparse.indices, [1, 4])
+    assert np.array_equal(sparse.values, [0.5, 2.0])
+    assert np.array_equal(sparse.to_dense(), dense)
+
+
+def test_default_values():
+    sparse = SparseSensors(6, [2, 3])
+    assert np.array_equal(sparse.to_dense(), [0, 0, 1, 1, 0, 0])
+
+
+def test_keys():
+    sparse = SparseSensors(6, [2, 3])
+    assert sparse.tobytes() == SparseSensors(6, [2, 3]).tobytes()
+    assert sparse.tobytes() != SparseSensors(6, [2, 4]).tobytes()
+
+    # Copies and frames that have been through a queue have the same key.
+    assert sparse.copy().tobytes() == sparse.tobytes()
+    assert pickle.loads(pickle.dumps(sparse)).tobytes() == sparse.tobytes()
+
+
+def test_json_fields():
+    msg = json.dumps(sensors_to_dict(SparseSensors(2232, [1017])))
+    received = json.loads(msg)
+    assert received == {
+        "n_sensors": 2232,
+        "sensor_indices": [1017],
+        "sensor_values": [1.0],
+    }
+
+    msg = json.dumps(sensors_to_dict(np.array([0.0, 0.5])))
+    assert json.loads(msg) == {"sensors": [0.0, 0.5]}
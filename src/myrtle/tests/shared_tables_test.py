@@ -0,0 +1,82 @@
+import multiprocessing as mp
+import numpy as np
+from myrtle.agents.tools.shared_tables import SharedTables, lock_rows
+
+_n_rows = 16
+_n_actions = 3
+
+
+def initialize_tables(n_stripes=4):
+    return SharedTables(
+        {
+            "q_values": np.ones((_n_rows, _n_actions)),
+            "counts": np.zeros((_n_rows, _n_actions)),
+        },
+        n_stripes=n_stripes,
+    )
+
+
+def add_counts(tables, rows, n_times):
+    counts = tables["counts"]
+    for _ in range(n_times):
+        with tables.lock(rows):
+            np.add.at(counts, (rows, 0), 1)
+    del counts
+    tables.close()
+
+
+def test_starting_values():
+    tables = initialize_tables()
+    assert list(tables.names()) == ["q_values", "counts"]
+    assert np.all(tables["q_values"] == 1)
+    assert tables["counts"].shape == (_n_rows, _n_actions)
+    tables.close()
+    tables.unlink()
+
+
+def test_shared_updates():
+    tables = initialize_tables()
+    rows = np.array([1, 5, 6, 9])
+    processes = [
+        mp.Process(target=add_counts, args=(tables, rows, 100)) for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    # Every worker's updates land, none overwritten by another's.
+    counts = np.array(tables["counts"])
+    assert np.all(counts[rows, 0] == 400)
+    assert np.sum(counts) == 1600
+    tables.close()
+    tables.unlink()
+
+
+def test_lock_free():
+    tables = initialize_tables(n_stripes=0)
+    with tables.lock([0, 1]):
+        tables["q_values"][0, 0] = 2
+    assert tables["q_values"][0, 0] == 2
+    tables.close()
+    tables.unlink()
+
+
+def test_unshared():
+    # An agent without shared tables still goes through the motions.
+    with lock_rows(None, [0, 1]):
+        pass
+
+
+def test_dtypes_kept():
+    tables = SharedTables(
+        {
+            "q_values": np.ones((_n_rows, _n_actions), dtype=np.float32),
+            "counts": np.zeros((_n_rows, _n_actions), dtype=np.int32),
+        }
+    )
+    assert tables["q_values"].dtype == np.float32
+    assert tables["counts"].dtype == np.int32
+    assert np.all(tables["q_values"] == 1)
+    tables.close()
+    tables.unlink()
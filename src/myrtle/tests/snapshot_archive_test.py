@@ -0,0 +1,134 @@
+import os
+import pickle
+import numpy as np
+import pytest
+from myrtle.agents.tools import snapshot_archive
+from myrtle.agents.tools.snapshot_archive import SnapshotWriter, read_snapshots
+
+_n_snapshots = 20
+
+
+def write_snapshots(directory, n_snapshots=_n_snapshots):
+    writer = SnapshotWriter(directory)
+    rng = np.random.default_rng(3)
+    written = []
+    for i in range(n_snapshots):
+        arrays = {
+            "energy": rng.uniform(size=(4, 3)),
+            "mapping": rng.integers(-1, 5, size=7),
+        }
+        writer.snapshot(10 * i, i // 5, **arrays)
+        written.append(arrays)
+    writer.close()
+    return writer, written
+
+
+def test_round_trip(tmp_path):
+    directory = os.path.join(tmp_path, "archive")
+    writer, written = write_snapshots(directory)
+    steps, episodes, arrays = read_snapshots(directory)
+
+    n_read = steps.size
+    assert n_read == writer.n_snapshots
+    assert n_read + writer.n_dropped == _n_snapshots
+    assert arrays["energy"].shape == (n_read, 4, 3)
+    assert arrays["mapping"].dtype == written[0]["mapping"].dtype
+
+    for i_read, step in enumerate(steps):
+        i_written = step // 10
+        assert episodes[i_read] == i_written // 5
+        assert np.array_equal(arrays["energy"][i_read], written[i_written]["energy"])
+        assert np.array_equal(arrays["mapping"][i_read], written[i_written]["mapping"])
+
+
+def test_partial_snapshot_ignored(tmp_path):
+    directory = os.path.join(tmp_path, "archive")
+    writer, _ = write_snapshots(directory)
+
+    # Simulate a snapshot that was cut off partway through being written.
+    with open(os.path.join(directory, "energy.dat"), "ab") as f:
+        f.write(np.zeros((4, 3)).tobytes())
+
+    steps, _, arrays = read_snapshots(directory)
+    assert steps.size == writer.n_snapshots
+    assert arrays["energy"].shape[0] == writer.n_snapshots
+
+
+def test_new_archive_per_writer(tmp_path):
+    directory = os.path.join(tmp_path, "archive")
+    write_snapshots(directory)
+    writer, _ = write_snapshots(directory, n_snapshots=3)
+
+    steps, _, _ = read_snapshots(directory)
+    assert steps.size == writer.n_snapshots
+    assert steps.size <= 3
+
+
+def test_copy_started_writer(tmp_path):
+    writer = SnapshotWriter(os.path.join(tmp_path, "archive"))
+    writer.snapshot(0, 0, energy=np.ones(3))
+
+    copy = pickle.loads(pickle.dumps(writer))
+    writer.close()
+    copy.directory = os.path.join(tmp_path, "copy")
+    copy.snapshot(1, 0, energy=np.full(3, 2.0))
+    copy.close()
+
+    steps, _, arrays = read_snapshots(os.path.join(tmp_path, "copy"))
+    assert steps.tolist() == [1]
+    assert np.array_equal(arrays["energy"][0], [2.0, 2.0, 2.0])
+
+
+def test_snapshot_after_close(tmp_path):
+    directory = os.path.join(tmp_path, "archive")
+    writer = SnapshotWriter(directory)
+    writer.snapshot(0, 0, energy=np.ones(3))
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.snapshot(1, 0, energy=np.ones(3))
+
+    # The finished archive is left as it was.
+    steps, _, _ = read_snapshots(directory)
+    assert steps.tolist() == [0]
+
+    # A copy starts an archive of its own.
+    copy = pickle.loads(pickle.dumps(writer))
+    copy.directory = os.path.join(tmp_path, "copy")
+    copy.snapshot(2, 0, energy=np.ones(3))
+    copy.close()
+
+
+def test_small_changes(tmp_path):
+    # With one staging slot, some snapshots get dropped. The ones that
+    # make it still need to come out whole.
+    directory = os.path.join(tmp_path, "archive")
+    writer = SnapshotWriter(directory, n_staging=1)
+    rng = np.random.default_rng(5)
+    mask = np.ones((50, 40), dtype=int)
+    written = []
+    for i in range(_n_snapshots):
+        mask[rng.integers(50), rng.integers(40)] = 0
+        writer.snapshot(i, 0, mask=mask)
+        written.append(mask.copy())
+    writer.close()
+
+    steps, _, arrays = read_snapshots(directory)
+    assert steps.size == writer.n_snapshots
+    for i_read, step in enumerate(steps):
+        assert np.array_equal(arrays["mask"][i_read], written[step])
+
+
+def test_close_with_dead_writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_archive, "_shutdown_timeout", 0.1)
+    # A file where the archive's directory should be
+    # stops the writer thread before it writes anything.
+    directory = os.path.join(tmp_path, "archive")
+    open(directory, "w").close()
+
+    writer = SnapshotWriter(directory, n_staging=2)
+    for i in range(5):
+        writer.snapshot(i, 0, energy=np.full(3, float(i)))
+    assert writer.backlog.full()
+
+    writer.close()
+    assert writer.worker is None
@@ -0,0 +1,56 @@
+import numpy as np
+from myrtle.agents.tools.tile_coder import TileCoder
+
+_n_tilings = 8
+_n_rows = 4096
+
+
+def initialize_coder():
+    return TileCoder(
+        lows=[0.0, -15.0],
+        highs=[2 * np.pi, 15.0],
+        n_tilings=_n_tilings,
+        n_tiles=10,
+        n_rows=_n_rows,
+    )
+
+
+def test_encoding():
+    coder = initialize_coder()
+    rows = coder.encode(np.array([1.0, 2.0]))
+    assert rows.shape == (_n_tilings,)
+    assert np.all(rows >= 0)
+    assert np.all(rows < _n_rows)
+    assert np.array_equal(rows, coder.encode(np.array([1.0, 2.0])))
+    assert np.array_equal(rows, initialize_coder().encode(np.array([1.0, 2.0])))
+
+
+def test_generalization():
+    coder = initialize_coder()
+    rows = coder.encode(np.array([1.0, 2.0]))
+
+    # A tiny step shares most tiles. A large one shares none.
+    n_shared_near = np.sum(rows == coder.encode(np.array([1.01, 2.0])))
+    n_shared_far = np.sum(rows == coder.encode(np.array([4.0, -9.0])))
+    assert n_shared_near >= _n_tilings - 2
+    assert n_shared_far == 0
+
+
+def test_out_of_range():
+    coder = initialize_coder()
+    rows = coder.encode(np.array([100.0, -1e6]))
+    assert np.all(rows >= 0)
+    assert np.all(rows < _n_rows)
+
+
+def test_bounded_rows():
+    coder = initialize_coder()
+    rng = np.random.default_rng(3)
+    visited = set()
+    for _ in range(2000):
+        sensors = rng.uniform([0.0, -15.0], [2 * np.pi, 15.0])
+        visited.update(coder.encode(sensors).tolist())
+    # Each tiling covers the range with 10 or 11 tiles in each direction,
+    # depending on its offset.
+    assert len(visited) <= _n_tilings * 11 * 11
+    assert len(visited) > 0.95 * _n_tilings * 10 * 10
@@ -0,0 +1,73 @@
+import numpy as np
+from myrtle.agents.q_learning_eps import QLearningEpsilon
+from myrtle.trace import TraceReader, TraceWriter, replay
+from myrtle.virtual_clock import VirtualClock
+from myrtle.worlds.contextual_bandit import ContextualBandit
+
+# Exclude pytest fixtures from some checks because they behave in peculiar ways.
+from myrtle.tests.fixtures import setup_mq_server  # noqa: F401
+
+_n_loop_steps = 150
+
+
+def record_run(trace_path, seed):
+    world = ContextualBandit(n_loop_steps=_n_loop_steps, n_episodes=2, seed=seed)
+    agent = QLearningEpsilon(
+        n_sensors=world.n_sensors,
+        n_actions=world.n_actions,
+        n_rewards=world.n_rewards,
+        seed=seed,
+        trace_path=trace_path,
+    )
+    VirtualClock(agent, world, agent_latency=0.0).run()
+    return TraceReader(trace_path).load()
+
+
+def test_write_and_read(tmp_path):
+    writer = TraceWriter(tmp_path, chunk_size=3)
+    for i in range(7):
+        writer.record(i // 4, i, np.full(2, i), np.array([i / 2]), np.eye(3)[i % 3])
+        # Steps get written a whole chunk at a time.
+        if i == 4:
+            assert len(TraceReader(tmp_path)) == 3
+    writer.close()
+
+    reader = TraceReader(tmp_path)
+    assert reader.episode_bounds() == [(0, 4), (4, 7)]
+    steps = list(reader)
+    assert len(steps) == 7
+    episode, step, sensors, rewards, actions = steps[5]
+    assert (episode, step) == (1, 5)
+    assert np.array_equal(sensors, [5, 5])
+    assert np.array_equal(rewards, [2.5])
+    assert np.array_equal(actions, [0, 0, 1])
+
+    # A new trace in the same place replaces the old one.
+    writer = TraceWriter(tmp_path, chunk_size=3)
+    writer.record(0, 0, np.zeros(2), np.zeros(1), np.zeros(3))
+    writer.close()
+    assert TraceReader(tmp_path).load()["step"].size == 1
+
+
+def test_seeded_runs_repeat(setup_mq_server, tmp_path):  # noqa: F811
+    trace_a = record_run(tmp_path / "a", seed=7)
+    trace_b = record_run(tmp_path / "b", seed=7)
+    assert trace_a["step"].size == 2 * _n_loop_steps
+    for name in trace_a:
+        assert np.array_equal(trace_a[name], trace_b[name], equal_nan=True)
+
+    trace_c = record_run(tmp_path / "c", seed=8)
+    assert not np.array_equal(trace_a["actions"], trace_c["actions"])
+
+
+def test_replay(setup_mq_server, tmp_path):  # noqa: F811
+    trace = record_run(tmp_path, seed=11)
+
+    agent = QLearningEpsilon(n_sensors=4, n_actions=4, n_rewards=4, seed=11)
+    agent.initialize_mq()
+    chosen_actions = replay(agent, tmp_path)
+    agent.close()
+
+    # Fed the same inputs, an agent seeded the same way
+    # makes the same choices.
+    assert np.array_equal(chosen_actions, trace["actions"])
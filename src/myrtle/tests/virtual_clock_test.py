@@ -0,0 +1,96 @@
+import numpy as np
+from myrtle.agents.base_agent import BaseAgent
+from myrtle.virtual_clock import VirtualClock
+from myrtle.worlds.base_world import BaseWorld
+
+# Exclude pytest fixtures from some checks because they behave in peculiar ways.
+from myrtle.tests.fixtures import setup_mq_server  # noqa: F401
+
+_n_loop_steps = 6
+_loop_steps_per_second = 10
+_world_steps_per_loop_step = 10
+
+
+class ArrivalWorld(BaseWorld):
+    """
+    Records the world step on which each action arrives.
+    """
+
+    def __init__(self, **kwargs):
+        self.init_common(
+            n_loop_steps=_n_loop_steps,
+            n_episodes=2,
+            loop_steps_per_second=_loop_steps_per_second,
+            world_steps_per_second=(
+                _loop_steps_per_second * _world_steps_per_loop_step
+            ),
+            verbose=False,
+            **kwargs,
+        )
+        self.n_sensors = 2
+        self.n_actions = 3
+        self.n_rewards = 1
+        self.arrivals = []
+
+    def step_world(self):
+        if np.any(self.actions):
+            self.arrivals.append((self.i_loop_step, self.i_world_step))
+
+    def step_world_substeps(self, n_steps):
+        self.i_world_step = 0
+        self.step_world()
+
+    def sense(self):
+        self.sensors = np.zeros(self.n_sensors)
+        self.rewards = np.array([float(self.i_loop_step)])
+
+
+def run_world(agent_latency, **kwargs):
+    world = ArrivalWorld(**kwargs)
+    agent = BaseAgent(n_sensors=2, n_actions=3, n_rewards=1)
+    VirtualClock(agent, world, agent_latency=agent_latency).run()
+    return world, agent
+
+
+def test_immediate_response(setup_mq_server):  # noqa: F811
+    world, agent = run_world(0.0)
+
+    # Actions chosen after a loop step take effect at the start of the next.
+    # The last loop step of each episode has no next one.
+    expected = [(i, 0) for i in range(1, _n_loop_steps)]
+    assert world.arrivals == expected * 2
+    assert agent.rewards[0] == _n_loop_steps - 1
+
+
+def test_partial_step_latency(setup_mq_server):  # noqa: F811
+    # 3.5 world steps' worth of response time. The actions are ready
+    # partway through world step 3 and get picked up at world step 4.
+    world, _ = run_world(0.035)
+    assert world.arrivals[:3] == [(1, 4), (2, 4), (3, 4)]
+
+
+def test_multi_step_latency(setup_mq_server):  # noqa: F811
+    # Response times longer than a loop step carry over into the one after.
+    world, _ = run_world(0.12)
+    assert world.arrivals[:3] == [(2, 2), (3, 2), (4, 2)]
+
+
+def test_unpaced_world_steps(setup_mq_server):  # noqa: F811
+    # Without paced world steps, actions are only read at the start
+    # of a loop step, so a partial step's latency delays them a whole step.
+    world, _ = run_world(0.035, paced_world_steps=False)
+    assert world.arrivals[:3] == [(2, 0), (3, 0), (4, 0)]
+
+
+def test_latency_distribution(setup_mq_server):  # noqa: F811
+    def latency(rng):
+        return rng.uniform(0.0, 0.1)
+
+    runs = []
+    for _ in range(2):
+        world = ArrivalWorld()
+        agent = BaseAgent(n_sensors=2, n_actions=3, n_rewards=1)
+        VirtualClock(agent, world, agent_latency=latency, seed=3).run()
+        runs.append(world.arrivals)
+
+    assert runs[0] == runs[1]
@@ -0,0 +1,103 @@
+import pickle
+import time
+import numpy as np
+from ziptie.algo import Ziptie
+from myrtle.agents.tools.block_ziptie import BlockZiptie
+from myrtle.agents.tools.ziptie_structure import ZiptieStructureLearner
+
+_n_cables = 12
+_n_steps = 2000
+_threshold = 10.0
+
+
+def generate_inputs(n_steps):
+    rng = np.random.default_rng(3)
+    inputs = np.zeros((n_steps, _n_cables))
+    # Cables 0-3 are always co-active, as are 4-7.
+    # The rest are noise.
+    group = rng.choice(2, size=n_steps)
+    for i_step in range(n_steps):
+        i_start = 4 * group[i_step]
+        inputs[i_step, i_start : i_start + 4] = 1.0
+        inputs[i_step, 8:] = rng.uniform(size=4) * rng.choice(2, size=4)
+    return inputs
+
+
+def new_ziptie():
+    return Ziptie(n_cables=_n_cables, n_bundles_max=_n_cables, threshold=_threshold)
+
+
+def test_matches_ziptie():
+    inputs = generate_inputs(_n_steps)
+
+    np.random.seed(5)
+    ziptie = new_ziptie()
+    direct_activities = []
+    for cable_activities in inputs:
+        direct_activities.append(ziptie.update_bundles(cable_activities).copy())
+        ziptie.create_new_bundles()
+        ziptie.grow_bundles()
+
+    np.random.seed(5)
+    learner = ZiptieStructureLearner(new_ziptie())
+    for i_step, cable_activities in enumerate(inputs):
+        bundle_activities = learner.step(cable_activities)
+        assert np.array_equal(bundle_activities, direct_activities[i_step])
+
+    assert ziptie.n_bundles > 0
+    assert learner.ziptie.n_bundles == ziptie.n_bundles
+    assert np.array_equal(learner.ziptie.mapping, ziptie.mapping)
+
+
+def test_structure_interval():
+    learner = ZiptieStructureLearner(new_ziptie(), structure_interval=10)
+    for cable_activities in generate_inputs(_n_steps):
+        learner.step(cable_activities)
+        assert len(learner.pending) < 10
+    assert learner.ziptie.n_bundles > 0
+
+
+def test_background():
+    learner = ZiptieStructureLearner(new_ziptie(), background=True)
+    for cable_activities in generate_inputs(_n_steps):
+        learner.step(cable_activities)
+
+    # Give the worker a chance to catch up.
+    for _ in range(100):
+        if learner.backlog.empty():
+            break
+        time.sleep(0.01)
+    time.sleep(0.1)
+
+    n_bundles = learner.ziptie.n_bundles
+    assert n_bundles > 0
+    mapping, n_cables_by_bundle = learner.published
+    assert n_cables_by_bundle.size == n_bundles
+    bundle_activities = learner.step(np.ones(_n_cables))
+    assert bundle_activities.size == n_bundles
+
+
+def test_close():
+    ziptie = BlockZiptie(
+        n_cables=_n_cables, block_size=4, n_bundles_max=_n_cables, threshold=_threshold
+    )
+    learner = ZiptieStructureLearner(ziptie, background=True)
+    for cable_activities in generate_inputs(_n_steps):
+        learner.step(cable_activities)
+    worker = learner.worker
+    learner.close()
+    assert not worker.is_alive()
+    assert learner.worker is None
+
+    # Readers can hold the lock to keep the worker from changing the Ziptie.
+    learner.step(np.ones(_n_cables))
+    with learner.lock:
+        n_bundles = learner.ziptie.n_bundles
+        time.sleep(0.05)
+        assert learner.ziptie.n_bundles == n_bundles
+    learner.close()
+
+    copy = pickle.loads(pickle.dumps(learner))
+    assert copy.worker is None
+    with copy.lock:
+        assert copy.ziptie.n_bundles == learner.ziptie.n_bundles
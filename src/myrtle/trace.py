@@ -0,0 +1,225 @@
+"""
+Record every step an agent takes, and play recordings back to an agent.
+
+A trace holds the episode and step numbers, sensors, rewards, and actions
+for every step. The sensors and rewards are the ones the agent received and
+the actions are the ones it sent in response.
+
+Agents record a trace when they are created with a `trace_path`,
+or through `bench.run(trace_path=...)`.
+"""
+
+import json
+import os
+import numpy as np
+from myrtle.agents.tools.snapshot_archive import (
+    _index_filename,
+    _steps_filename,
+    read_snapshots,
+)
+
+_default_chunk_size = 1000
+_array_names = ["sensors", "rewards", "actions"]
+
+
+class TraceWriter:
+    """
+    Steps are collected in preallocated arrays, and each time
+    `chunk_size` of them have been collected they are appended to the trace
+    together. Nothing touches the disk until the first chunk is written,
+    so a `TraceWriter` can be created before the agent is handed off
+    to its own process.
+
+    A trace is laid out the same way as a snapshot archive from
+    `SnapshotWriter`, one raw binary file per array, so that it can be read
+    back as memory-mapped arrays. Any trace already in `path` is replaced.
+    """
+
+    def __init__(self, path, chunk_size=_default_chunk_size):
+        self.path = path
+        self.chunk_size = int(chunk_size)
+        self.arrays = None
+        self.files = None
+        self.i_row = 0
+        self.n_steps = 0
+
+    def record(self, episode, step, sensors, rewards, actions):
+        step_arrays = dict(zip(_array_names, (sensors, rewards, actions)))
+        if self.arrays is None:
+            self.steps = np.zeros((self.chunk_size, 2), dtype=np.int64)
+            self.arrays = {
+                name: np.zeros((self.chunk_size,) + np.shape(array))
+                for name, array in step_arrays.items()
+            }
+
+        self.steps[self.i_row] = (step, episode)
+        for name, array in step_arrays.items():
+            self.arrays[name][self.i_row] = array
+        self.i_row += 1
+
+        if self.i_row == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.i_row == 0:
+            return
+        if self.files is None:
+            self.open()
+
+        for name, f in self.files.items():
+            f.write(self.arrays[name][: self.i_row].tobytes())
+            f.flush()
+        # As in a snapshot archive, the steps get written last.
+        # Readers only trust the records that they cover.
+        self.steps_file.write(self.steps[: self.i_row].tobytes())
+        self.steps_file.flush()
+
+        self.n_steps += self.i_row
+        self.i_row = 0
+
+    def open(self):
+        os.makedirs(self.path, exist_ok=True)
+        index = {
+            name: {"shape": list(array.shape[1:]), "dtype": array.dtype.str}
+            for name, array in self.arrays.items()
+        }
+        with open(os.path.join(self.path, _index_filename), "wt") as f:
+            json.dump(index, f)
+        self.files = {
+            name: open(os.path.join(self.path, f"{name}.dat"), "wb")
+            for name in self.arrays
+        }
+        self.steps_file = open(os.path.join(self.path, _steps_filename), "wb")
+
+    def close(self):
+        self.flush()
+        if self.files is None:
+            return
+        for f in self.files.values():
+            f.close()
+        self.steps_file.close()
+        self.files = None
+
+
+class TraceReader:
+    """
+    Open a trace as read-only memory-mapped arrays: `steps` and `episodes`,
+    one entry per step, and `sensors`, `rewards`, and `actions`,
+    one row per step. Nothing is read from disk until it's used.
+
+    Iterate over it to get (episode, step, sensors, rewards, actions)
+    one step at a time, use `chunks()` to work through it a block of steps
+    at a time, or use `load()` to get all of it in memory at once.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.steps, self.episodes, arrays = read_snapshots(path)
+        self.sensors = arrays["sensors"]
+        self.rewards = arrays["rewards"]
+        self.actions = arrays["actions"]
+
+    def __len__(self):
+        return self.steps.size
+
+    def chunks(self, chunk_size=_default_chunk_size, start=0, stop=None):
+        """
+        Copy the steps from `start` to `stop` into memory, `chunk_size`
+        at a time, and yield each chunk as a dict of arrays.
+        """
+        if stop is None:
+            stop = len(self)
+        for i_start in range(start, stop, chunk_size):
+            i_stop = min(i_start + chunk_size, stop)
+            yield {
+                "episode": np.array(self.episodes[i_start:i_stop]),
+                "step": np.array(self.steps[i_start:i_stop]),
+                "sensors": np.array(self.sensors[i_start:i_stop]),
+                "rewards": np.array(self.rewards[i_start:i_stop]),
+                "actions": np.array(self.actions[i_start:i_stop]),
+            }
+
+    def __iter__(self):
+        return self.iter_steps()
+
+    def iter_steps(self, start=0, stop=None):
+        for chunk in self.chunks(start=start, stop=stop):
+            for i in range(chunk["step"].size):
+                yield (
+                    int(chunk["episode"][i]),
+                    int(chunk["step"][i]),
+                    chunk["sensors"][i],
+                    chunk["rewards"][i],
+                    chunk["actions"][i],
+                )
+
+    def load(self):
+        return {
+            "episode": np.array(self.episodes),
+            "step": np.array(self.steps),
+            "sensors": np.array(self.sensors),
+            "rewards": np.array(self.rewards),
+            "actions": np.array(self.actions),
+        }
+
+    def episode_bounds(self):
+        """
+        The first and last-plus-one step of each episode in the trace.
+        """
+        starts = np.flatnonzero(np.diff(self.episodes, prepend=np.nan))
+        stops = np.append(starts[1:], len(self))
+        return list(zip(starts.tolist(), stops.tolist()))
+
+
+def replay(agent, trace_path):
+    """
+    Drive an agent with the sensors and rewards from a trace,
+    with no world needed. This is handy for profiling and debugging an agent
+    on exactly the inputs it saw during a run.
+
+    The agent chooses its actions as usual, but then carries on as if it
+    had chosen the actions in the trace, so that what it learns follows
+    the recorded run. An agent created with the same seed as the one
+    that made the recording will make the same choices.
+
+    Agents that publish to the mq need a running `dsmq` server
+    and a call to `agent.initialize_mq()` first.
+
+    Returns the actions the agent chose, one row per step.
+    """
+    i_episode = None
+    chosen_actions = []
+    for episode, step, sensors, rewards, actions in TraceReader(trace_path):
+        if episode != i_episode:
+            i_episode = episode
+            agent.i_episode = episode
+            agent.reset()
+        chosen_actions.append(follow_step(agent, step, sensors, rewards, actions))
+
+    return np.array(chosen_actions)
+
+
+def follow_step(agent, step, sensors, rewards, actions):
+    """
+    Take one step the way `replay()` does, returning the actions the agent
+    chose before being handed the recorded ones.
+    """
+    agent.i_step = step
+    agent.sensors = sensors.copy()
+    agent.rewards = rewards.copy()
+    agent.previous_actions = agent.actions
+
+    # Follow the same order as `BaseAgent.run()`.
+    split = agent.has_split_steps()
+    if split:
+        agent.perceive()
+        agent.act()
+    else:
+        agent.choose_action()
+    chosen_actions = np.copy(agent.actions)
+
+    # Keep the agent's own action dtype.
+    agent.actions = actions.astype(agent.actions.dtype)
+    if split:
+        agent.learn()
+    return chosen_actions
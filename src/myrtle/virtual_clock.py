@@ -0,0 +1,215 @@
+"""
+Run a world and an agent together in a single process, on simulated time.
+
+On the bench, the world runs on the wall clock and the agent runs in its
+own process. Actions take effect on whichever world step is underway
+when they arrive, so how long the agent takes to respond matters.
+There's more on this in `doc/syncronization.md`.
+
+`VirtualClock` keeps those delays, but makes them deterministic and
+doesn't wait for them. The world's clock ticks forward one world step
+at a time, as fast as the world can be simulated. After each loop step,
+the agent gets the sensors and rewards, and chooses its actions.
+Its response time is then simulated, and the actions are held back
+until the first world step that starts after they would have arrived.
+"""
+
+import time
+import numpy as np
+from numpy.random import default_rng
+from myrtle.rewards import total_reward
+from myrtle.sensors import SparseSensors
+
+
+class VirtualClock:
+    """
+    `agent_latency` is how long the agent takes to respond, in seconds of
+    simulated time. It can be
+        None: the measured wall clock time that the agent spends choosing
+            its actions, multiplied by the world's speedup, the same as it
+            would be on the bench
+        a number: a fixed response time
+        a function: called with a random number generator
+            each step, returning a response time
+            for example, `lambda rng: rng.gamma(4.0, 0.005)`
+
+    `seed` seeds the generator passed to an `agent_latency` function.
+
+    Call `run()` to run all the world's episodes. Before calling it,
+    connect to an mq server, either through `bench.run()` with
+    `virtual_clock=True` or with a running `dsmq` server,
+    for the worlds and agents that publish to it.
+    """
+
+    def __init__(self, agent, world, agent_latency=None, seed=None):
+        self.agent = agent
+        self.world = world
+        self.agent_latency = agent_latency
+        self.rng = default_rng(seed)
+
+        self.world_period = 1 / world.world_steps_per_second
+        if world.paced_world_steps:
+            ticks_per_beat = 1
+        else:
+            ticks_per_beat = world.world_steps_per_loop_step
+
+        # Swap out the world's pacemaker and action queue,
+        # so that the world keeps time with the virtual clock.
+        self.pm = VirtualPacemaker(ticks_per_beat)
+        self.world.pm = self.pm
+        self.world.q_action = ScheduledActions(self.pm)
+
+        # Start a new episode on the first step.
+        self.i_episode = -1
+        self.i_loop_step = self.world.n_loop_steps
+
+    def run(self, logger=None):
+        """
+        If a `logger` from `sqlogging` is provided, log the same information
+        the bench does, with timestamps in simulated time.
+        """
+        self.world.initialize_mq()
+        self.agent.initialize_mq()
+        self.run_steps(self.world.n_episodes * self.world.n_loop_steps, logger)
+        self.world.close()
+        self.agent.close()
+
+    def run_steps(self, n_steps, logger=None):
+        """
+        Run `n_steps` loop steps, picking up where the last call left off
+        and starting new episodes as needed, even beyond the world's
+        `n_episodes`. This lets a run be broken into segments.
+
+        Returns the total reward collected over the steps.
+        """
+        reward = 0.0
+        for _ in range(n_steps):
+            if self.i_loop_step == self.world.n_loop_steps:
+                self.start_episode()
+            self.step(self.i_loop_step, logger)
+            reward += total_reward(self.world.rewards)
+            self.i_loop_step += 1
+        return reward
+
+    def start_episode(self):
+        self.i_episode += 1
+        self.i_loop_step = 0
+        self.world.i_episode = self.i_episode
+        self.agent.i_episode = self.i_episode
+        self.world.reset()
+        self.agent.reset()
+        self.world.q_action.clear()
+
+    def step(self, i_loop_step, logger=None):
+        world = self.world
+        agent = self.agent
+
+        world.i_loop_step = i_loop_step
+        loop_start_tick = self.pm.next_tick
+        world.run_world_steps()
+        world.sense()
+        sense_tick = self.pm.next_tick
+
+        # Hand off copies, as the queues do on the bench.
+        agent.i_step = i_loop_step
+        agent.sensors = _copy(world.sensors)
+        agent.rewards = _copy(world.rewards)
+        agent.previous_actions = agent.actions
+
+        # As in `BaseAgent.run()`, learning waits until after the actions
+        # are sent.
+        split = agent.has_split_steps()
+        act_start = time.perf_counter()
+        if split:
+            agent.perceive()
+            agent.act()
+        else:
+            agent.choose_action()
+        act_duration = time.perf_counter() - act_start
+
+        latency = self.latency(act_duration)
+        arrival_tick = sense_tick + int(np.ceil(latency / self.world_period))
+        world.q_action.put(agent.actions.copy(), arrival_tick)
+
+        if split:
+            agent.learn()
+        agent.record_step()
+
+        if logger is not None:
+            period_us = 1e6 * self.world_period
+            logger.info(
+                {
+                    "process": "world",
+                    "reward": total_reward(world.rewards),
+                    "step": i_loop_step,
+                    "episode": world.i_episode,
+                    "ts_recv": int(loop_start_tick * period_us),
+                    "ts_send": int(sense_tick * period_us),
+                }
+            )
+            logger.info(
+                {
+                    "process": "agent",
+                    "step": i_loop_step,
+                    "episode": agent.i_episode,
+                    "ts_recv": int(sense_tick * period_us),
+                    "ts_send": int(sense_tick * period_us + 1e6 * latency),
+                }
+            )
+
+    def latency(self, act_duration):
+        if self.agent_latency is None:
+            return act_duration * self.world.speedup
+        if callable(self.agent_latency):
+            return float(self.agent_latency(self.rng))
+        return float(self.agent_latency)
+
+
+class VirtualPacemaker:
+    """
+    A stand-in for `Pacemaker` that, rather than waiting, moves time forward
+    by `ticks_per_beat` world steps on each `beat()`.
+    `tick` is the world step that is starting and `next_tick`
+    is the one after the beat.
+    """
+
+    def __init__(self, ticks_per_beat=1):
+        self.ticks_per_beat = ticks_per_beat
+        self.tick = 0
+        self.next_tick = 0
+
+    def beat(self):
+        self.tick = self.next_tick
+        self.next_tick += self.ticks_per_beat
+        return 0.0
+
+
+class ScheduledActions:
+    """
+    A stand-in for the world's action queue. Actions put in it only become
+    available once the virtual clock reaches their arrival tick.
+    """
+
+    def __init__(self, pacemaker):
+        self.pm = pacemaker
+        self.pending = []
+
+    def put(self, actions, arrival_tick):
+        self.pending.append((arrival_tick, actions))
+        self.pending.sort(key=lambda pending: pending[0])
+
+    def empty(self):
+        return len(self.pending) == 0 or self.pending[0][0] > self.pm.tick
+
+    def get_nowait(self):
+        return self.pending.pop(0)[1]
+
+    def clear(self):
+        self.pending = []
+
+
+def _copy(x):
+    if isinstance(x, SparseSensors):
+        return x.copy()
+    return np.array(x, dtype=float)
+
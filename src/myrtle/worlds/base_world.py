@@ -4,6 +4,8 @@ import numpy as np
 import dsmq.client
 from pacemaker.pacemaker import Pacemaker
 from myrtle.config import mq_host, mq_port
+from myrtle.rewards import rewards_to_list
+from myrtle.sensors import SparseSensors, sensors_to_dict
 
 _default_n_loop_steps = 101
 _default_n_episodes = 3
@@ -76,9 +78,27 @@ class BaseWorld:
         q_action=None,
         q_reward=None,
         q_sensor=None,
+        paced_world_steps=True,
+        sparse_sensors=False,
+        seed=None,
     ):
         """
         This boilerplate will need to be run when initializing most worlds.
+
+        With `paced_world_steps=False`, only the loop steps are paced by
+        the wall clock. New actions are read once at the start of each loop
+        step, and then all the world steps in it are run back to back
+        with a single call to `step_world_substeps()`. This gives up acting
+        on new actions partway through a loop step in exchange for speed,
+        which matters for fast simulations run with a large `speedup`.
+
+        With `sparse_sensors=True`, worlds that support it send
+        `SparseSensors` frames, listing only the non-zero sensors,
+        instead of dense arrays. Agents that extend `BaseAgent`
+        handle either kind.
+
+        Worlds with randomness in them should seed it with `self.seed`,
+        the way the bandits seed their `BanditCore`.
         """
         self.q_action = q_action
         self.q_reward = q_reward
@@ -87,6 +107,7 @@ class BaseWorld:
         self.verbose = verbose
         self.n_loop_steps = int(n_loop_steps)
         self.n_episodes = int(n_episodes)
+        self.seed = seed
 
         # `i_loop_step` counts the number of world->agent->world loop iterations,
         # time steps for the RL algo.
@@ -118,7 +139,13 @@ class BaseWorld:
         self.loop_period = 1 / self.loop_steps_per_second
         self.world_period = 1 / self.world_steps_per_second
 
-        self.pm = Pacemaker(self.world_steps_per_second * speedup)
+        self.speedup = speedup
+        self.paced_world_steps = paced_world_steps
+        self.sparse_sensors = sparse_sensors
+        if self.paced_world_steps:
+            self.pm = Pacemaker(self.world_steps_per_second * speedup)
+        else:
+            self.pm = Pacemaker(self.loop_steps_per_second * speedup)
 
         # Initialize the mq as part of `run()` because it allows
         # process "spawn" method process forking to work, allowing
@@ -160,19 +187,7 @@ class BaseWorld:
                         end="\r",
                     )
 
-                for i_world_step in range(self.world_steps_per_loop_step):
-                    self.i_world_step = i_world_step
-                    self.pm.beat()
-
-                    # Trying to read agent action commands on every world step
-                    # will allow the actions to
-                    # start having an effect *almost* instantaneously.
-                    # This is an approximate solution to the challenge of
-                    # an agent taking non-negligible wall clock time to execute.
-                    # There's more detail here:
-                    # https://www.brandonrohrer.com/rl_noninteger_delay.html
-                    self.read_agent_step()
-                    self.step_world()
+                self.run_world_steps()
 
                 self.sense_timestamp - time.time()
                 self.sense()
@@ -190,6 +205,29 @@ class BaseWorld:
         self.mq.put("control", "terminated")
         self.close()
 
+    def run_world_steps(self):
+        """
+        Run all the world steps in one loop step, keeping time with `self.pm`.
+        """
+        if self.paced_world_steps:
+            for i_world_step in range(self.world_steps_per_loop_step):
+                self.i_world_step = i_world_step
+                self.pm.beat()
+
+                # Trying to read agent action commands on every world step
+                # will allow the actions to
+                # start having an effect *almost* instantaneously.
+                # This is an approximate solution to the challenge of
+                # an agent taking non-negligible wall clock time to execute.
+                # There's more detail here:
+                # https://www.brandonrohrer.com/rl_noninteger_delay.html
+                self.read_agent_step()
+                self.step_world()
+        else:
+            self.pm.beat()
+            self.read_agent_step()
+            self.step_world_substeps(self.world_steps_per_loop_step)
+
     def reset(self):
         """
         Re-initialize the world to its starting condition.
@@ -199,7 +237,7 @@ class BaseWorld:
         """
         self.sensors = np.zeros(self.n_sensors)
         self.actions = np.zeros(self.n_actions)
-        self.rewards = [0] * self.n_rewards
+        self.rewards = np.zeros(self.n_rewards)
 
     def read_agent_step(self):
         # Read in any actions that the agent has put in the message queue.
@@ -226,6 +264,17 @@ class BaseWorld:
         except IndexError:
             self.i_action = 1
 
+    def step_world_substeps(self, n_steps):
+        """
+        Run `n_steps` world steps back to back, with no new actions
+        in between. This is what gets called when world steps aren't paced.
+
+        Override it if the world has a faster way to run several steps at once.
+        """
+        for i_world_step in range(n_steps):
+            self.i_world_step = i_world_step
+            self.step_world()
+
     def sense(self):
         """
         One step of the sense -> act -> reward RL loop.
@@ -238,25 +287,39 @@ class BaseWorld:
         self.sensors[: self.n_actions] = self.actions
         self.sensors[self.n_actions : 2 * self.n_actions] = 0.8 * self.actions - 0.3
 
-        self.rewards = [0] * self.n_rewards
+        self.rewards = np.zeros(self.n_rewards)
         self.rewards[0] = self.i_action / 10
         self.rewards[1] = -self.i_action / 2
         self.rewards[2] = self.i_action / (self.i_loop_step + 1)
         if self.i_action < self.n_rewards:
-            self.rewards[self.i_action] = None
+            self.rewards[self.i_action] = np.nan
 
-    def write_world_step(self):
-        self.q_reward.put(self.rewards)
-        self.q_sensor.put(self.sensors)
+    def encode_sensors(self, values):
+        """
+        For worlds that bin their sensors with a `self.sensor_encoder`
+        from `myrtle.worlds.tools.encoders`, encode the values
+        as a sparse frame or a dense array, depending on `sparse_sensors`.
+        """
+        if self.sparse_sensors:
+            return SparseSensors(
+                self.n_sensors, self.sensor_encoder.active(values).copy()
+            )
+        # The encoder reuses its buffer, so pass along a copy.
+        return self.sensor_encoder.encode(values).copy()
 
+    def write_world_step(self):
         self.send_sensors_timestamp = time.time()
+        self.q_reward.put(self.rewards)
+        # The agent's deadline runs from when the sensors were sent.
+        self.q_sensor.put((self.sensors, self.send_sensors_timestamp))
 
         msg = json.dumps(
             {
                 "loop_step": self.i_loop_step,
                 "episode": self.i_episode,
-                "sensors": self.sensors.tolist(),
-                "rewards": self.rewards,
+                **sensors_to_dict(self.sensors),
+                # JSON has no NaN, so missing rewards go out as null.
+                "rewards": rewards_to_list(self.rewards),
                 "ts_recv": int(1e6 * self.receive_actions_timestamp),
                 "ts_send": int(1e6 * self.send_sensors_timestamp),
             }
@@ -278,9 +341,11 @@ class BaseWorld:
         except AttributeError:
             pass
 
-        # Close down the Queues that the world feeds
-        self.q_reward.close()
-        self.q_sensor.close()
+        # Close down the Queues that the world feeds, if it has them.
+        # Worlds run on a virtual clock don't.
+        if self.q_sensor is not None:
+            self.q_reward.close()
+            self.q_sensor.close()
 
-        self.q_reward.cancel_join_thread()
-        self.q_sensor.cancel_join_thread()
+            self.q_reward.cancel_join_thread()
+            self.q_sensor.cancel_join_thread()
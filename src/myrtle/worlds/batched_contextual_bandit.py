@@ -0,0 +1,48 @@
+import time
+import numpy as np
+from myrtle.worlds.contextual_bandit import ContextualBandit
+
+_default_n_worlds = 64
+
+
+class BatchedContextualBandit(ContextualBandit):
+    """
+    `n_worlds` independent contextual bandits, all stepped together.
+
+    Each instance shuffles its own bandits on every step. As with
+    `BatchedPendulum`, `n_sensors`, `n_actions`, and `n_rewards` are
+    per instance, and sensors, actions, and rewards have one row
+    per instance. Pair it with an agent that extends `BatchedAgent`.
+
+    `step_world()` is inherited as is. Indexing the payouts and hit rates
+    with the (n_worlds, n_actions) bandit orders lines them up
+    row for row with the actions, so all the instances draw their
+    rewards from the `BanditCore` in one call.
+    """
+
+    name = "Batched contextual bandit"
+
+    def __init__(self, n_worlds=_default_n_worlds, **kwargs):
+        self.n_worlds = int(n_worlds)
+        super().__init__(**kwargs)
+
+    def reset(self):
+        self.bandit_order = np.tile(np.arange(self.n_actions), (self.n_worlds, 1))
+        self.sensors = np.zeros((self.n_worlds, self.n_sensors))
+        self.actions = np.zeros((self.n_worlds, self.n_actions))
+        self.rewards = np.zeros((self.n_worlds, self.n_rewards))
+
+    def read_agent_step(self):
+        # Same as BaseWorld.read_agent_step(), except that the
+        # all-zeros action has a row for each instance.
+        self.actions = np.zeros((self.n_worlds, self.n_actions))
+        while not self.q_action.empty():
+            self.actions = self.q_action.get_nowait()
+            self.receive_actions_timestamp = time.time()
+
+    def sense(self):
+        # Shuffle and sense the order of each instance's bandits.
+        self.bandit_order = self.bandit.rng.permuted(
+            np.tile(np.arange(self.n_actions), (self.n_worlds, 1)), axis=1
+        )
+        self.sensors = self.bandit_order.astype(float)
@@ -0,0 +1,103 @@
+import json
+import time
+import numpy as np
+from myrtle.worlds.base_world import BaseWorld
+from myrtle.worlds.pendulum import Pendulum
+from myrtle.worlds.tools.ring_buffer import BatchedRingBuffer
+
+_default_n_worlds = 64
+
+
+class BatchedPendulum(Pendulum):
+    """
+    `n_worlds` independent pendulums, all stepped together.
+
+    The physics are the same as for `Pendulum`, but positions, velocities,
+    and the torque delay lines are held in arrays with one row per pendulum,
+    and every world step updates all of them at once.
+
+    `n_sensors`, `n_actions`, and `n_rewards` are per pendulum, as they
+    are for `Pendulum`. Sensors, actions, and rewards are passed around
+    as two-dimensional arrays with one row per pendulum, for example
+    sensors are (n_worlds, n_sensors). Pair it with an agent that
+    extends `BatchedAgent`, which expects the same.
+
+    Only the first pendulum gets sent to the pendulum monitor.
+    The rewards logged for the run are the total across all the pendulums.
+    """
+
+    name = "Batched pendulum"
+
+    def __init__(self, n_worlds=_default_n_worlds, **kwargs):
+        self.n_worlds = int(n_worlds)
+        super().__init__(**kwargs)
+
+    def reset(self):
+        self.positions = np.zeros(self.n_worlds)  # radians
+        self.velocities = np.zeros(self.n_worlds)  # radians per second
+        self.torque_buffer = BatchedRingBuffer(
+            self.n_worlds, self.world_steps_per_loop_step
+        )
+
+        self.reset_sensors()
+
+    def reset_sensors(self):
+        self.n_sensors = 2
+
+        self.sensors = np.stack((self.positions, self.velocities), axis=1)
+
+    def read_agent_step(self):
+        # Same as BaseWorld.read_agent_step(), except that the
+        # all-zeros action has a row for each pendulum.
+        self.actions = np.zeros((self.n_worlds, self.n_actions))
+        while not self.q_action.empty():
+            self.actions = self.q_action.get_nowait()
+            self.receive_actions_timestamp = time.time()
+
+    def sense(self):
+        # Calculate the reward based on the position of each pendulum.
+        self.rewards = (1.0 - np.cos(self.positions))[:, np.newaxis]
+
+        self.step_sensors()
+
+    def step_world(self):
+        # Add any new actions to the torque buffers.
+        torque_magnitudes = self.actions @ self.action_scale
+        self.torque_buffer.add(torque_magnitudes[:, np.newaxis] * self.impulse)
+
+        applied_torques = self.torque_buffer.pop()
+
+        # Add in the effect of gravity.
+        moment_arms = np.sin(self.positions) * self.length / 2
+        gravity_torques = self.mass * self.gravity * moment_arms
+
+        # Add in the effect of friction at the bearings.
+        friction_torques = self.friction * self.velocities
+        torques = applied_torques + gravity_torques + friction_torques
+
+        # Add the discrete-time approximation of Newtonian mechanics, F = ma
+        self.velocities += torques * self.dt / self.inertia
+        new_positions = self.positions + self.velocities * self.dt
+
+        # Keep positions in the range of [0, 2 pi)
+        self.positions = np.mod(new_positions, 2 * np.pi)
+
+    def step_world_substeps(self, n_steps):
+        # Pendulum's compiled kernel is for a single pendulum.
+        # Each vectorized step_world() already covers all of them.
+        BaseWorld.step_world_substeps(self, n_steps)
+
+    def step_sensors(self):
+        self.sensors = np.stack((self.positions, self.velocities), axis=1)
+        self.write_pendulum_state()
+
+    def write_pendulum_state(self):
+        msg = json.dumps(
+            {
+                "loop_step": self.i_loop_step,
+                "episode": self.i_episode,
+                "position": float(self.positions[0]),
+                "velocity": float(self.velocities[0]),
+            }
+        )
+        self.mq.put("pendulum_state", msg)
@@ -0,0 +1,147 @@
+import numpy as np
+from numba import njit
+from myrtle.worlds.physics_world import PhysicsWorld
+from myrtle.worlds.tools.physics import wrap_angle
+
+_default_world_steps_per_loop_step = 10
+
+
+@njit
+def accelerate(state, force, params, accelerations):
+    gravity = params[0]
+    cart_mass = params[1]
+    pole_mass = params[2]
+    half_length = params[3]
+    pole_friction = params[5]
+
+    # The classic equations measure the pole angle clockwise from straight up.
+    # Here it is measured counter-clockwise from straight down, as in Pendulum.
+    angle_from_up = np.pi - state[1]
+    angular_velocity = -state[3]
+    sin_angle = np.sin(angle_from_up)
+    cos_angle = np.cos(angle_from_up)
+
+    total_mass = cart_mass + pole_mass
+    temp = (
+        force + pole_mass * half_length * angular_velocity**2 * sin_angle
+    ) / total_mass
+    angular_acceleration = (
+        gravity * sin_angle
+        - cos_angle * temp
+        - pole_friction * angular_velocity / (pole_mass * half_length)
+    ) / (half_length * (4.0 / 3.0 - pole_mass * cos_angle**2 / total_mass))
+    accelerations[0] = (
+        temp - pole_mass * half_length * angular_acceleration * cos_angle / total_mass
+    )
+    accelerations[1] = -angular_acceleration
+
+
+@njit
+def constrain(state, params):
+    track_half_length = params[4]
+
+    # Stop the cart at the ends of the track.
+    if state[0] > track_half_length:
+        state[0] = track_half_length
+        state[2] = 0.0
+    elif state[0] < -track_half_length:
+        state[0] = -track_half_length
+        state[2] = 0.0
+
+    state[1] = wrap_angle(state[1])
+
+
+class CartPole(PhysicsWorld):
+    """
+    A pole hinged to a cart that rolls along a track of limited length.
+    The pole starts hanging straight down and at rest.
+    Reward comes from keeping the pole elevated.
+    Swinging it up and balancing it is optimal.
+
+    The dynamics are those of Barto, Sutton, and Anderson (1983),
+    without the failure conditions. When the cart reaches the end of
+    the track, it stops.
+
+    State and sensor convention
+        [cart position, pole angle, cart velocity, pole angular velocity]
+
+    Position convention
+        The cart position is in meters from the center of the track.
+        A pole angle of 0 radians is straight down,
+        pi / 2 radians is to the right
+        pi radians is straight up
+
+    Action convention
+        Positive actions push the cart to the right,
+        negative actions to the left.
+        All forces are in Newtons.
+    """
+
+    name = "Cart-pole"
+    accelerate = staticmethod(accelerate)
+    constrain = staticmethod(constrain)
+
+    def __init__(
+        self,
+        n_loop_steps=1000,
+        n_episodes=1,
+        loop_steps_per_second=10,
+        world_steps_per_second=None,
+        speedup=8,
+        verbose=True,
+        **kwargs,
+    ):
+        if world_steps_per_second is None:
+            world_steps_per_second = (
+                loop_steps_per_second * _default_world_steps_per_loop_step
+            )
+        self.init_common(
+            n_loop_steps=n_loop_steps,
+            n_episodes=n_episodes,
+            loop_steps_per_second=loop_steps_per_second,
+            world_steps_per_second=world_steps_per_second,
+            speedup=speedup,
+            verbose=verbose,
+            **kwargs,
+        )
+
+        gravity = 9.8  # meters / second^2
+        cart_mass = 1.0  # kilogram
+        pole_mass = 0.1  # kilogram
+        half_length = 0.5  # meter
+        self.track_half_length = 2.4  # meter
+        pole_friction = 0.001  # Newton-meters-seconds / radian
+        self.init_physics(
+            initial_state=[0.0, 0.0, 0.0, 0.0],
+            params=[
+                gravity,
+                cart_mass,
+                pole_mass,
+                half_length,
+                self.track_half_length,
+                pole_friction,
+            ],
+            action_scale=10 * np.array([-1.0, -0.5, -0.25, 0.0, 0.25, 0.5, 1.0]),
+            # 5 x 16 x 5 x 6 = 2400 one-hot sensors, about as many as
+            # PendulumDiscreteOneHot.
+            sensor_bin_edges=[
+                np.linspace(-self.track_half_length, self.track_half_length, 6)[1:-1],
+                np.linspace(0.0, 2 * np.pi, 17)[1:-1],
+                np.linspace(-2.0, 2.0, 4),
+                np.linspace(-8.0, 8.0, 5),
+            ],
+        )
+        self.reset()
+
+    def reward(self):
+        return 1.0 - np.cos(self.state[1])
+
+
+class CartPoleDiscrete(CartPole):
+    name = "Discrete Valued Cart-pole"
+    sensor_type = "discrete"
+
+
+class CartPoleDiscreteOneHot(CartPole):
+    name = "Discrete Valued, One-Hot Cart-pole"
+    sensor_type = "one_hot"
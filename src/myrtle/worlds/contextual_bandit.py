@@ -1,5 +1,6 @@
 import numpy as np
 from myrtle.worlds.base_world import BaseWorld
+from myrtle.worlds.tools.bandit_core import BanditCore
 
 
 class ContextualBandit(BaseWorld):
@@ -18,12 +19,14 @@ class ContextualBandit(BaseWorld):
         n_loop_steps=1000,
         n_episodes=1,
         loop_steps_per_second=50,
+        seed=None,
         **kwargs,
     ):
         self.init_common(
             n_loop_steps=n_loop_steps,
             n_episodes=n_episodes,
             loop_steps_per_second=loop_steps_per_second,
+            seed=seed,
             **kwargs,
         )
         self.n_sensors = 4
@@ -32,26 +35,27 @@ class ContextualBandit(BaseWorld):
 
         # The highest paying bandit is 2 with average payout of .4 * 280 = 112.
         # Others are 50 or less.
-        self.bandit_payouts = [150, 200, 280, 320]
-        self.bandit_hit_rates = [0.3, 0.25, 0.4, 0.15]
+        self.bandit_payouts = np.array([150, 200, 280, 320], dtype=float)
+        self.bandit_hit_rates = np.array([0.3, 0.25, 0.4, 0.15])
+
+        self.bandit = BanditCore(seed=self.seed)
 
     def reset(self):
         self.bandit_order = np.arange(self.n_actions)
         self.sensors = np.zeros(self.n_sensors)
         self.actions = np.zeros(self.n_actions)
-        self.rewards = [0] * self.n_rewards
+        self.rewards = np.zeros(self.n_rewards)
 
     def sense(self):
         # Shuffle and sense the order of the bandits.
         self.bandit_order = np.arange(self.n_actions)
-        np.random.shuffle(self.bandit_order)
+        self.bandit.rng.shuffle(self.bandit_order)
         self.sensors = self.bandit_order.copy()
 
     def step_world(self):
         # Calculate the reward based on the shuffled order of the previous time step.
-        self.rewards = [0] * self.n_actions
-        for i in range(self.n_actions):
-            if np.random.sample() < self.bandit_hit_rates[self.bandit_order[i]]:
-                self.rewards[i] = (
-                    self.actions[i] * self.bandit_payouts[self.bandit_order[i]]
-                )
+        self.rewards = self.bandit.pull(
+            self.actions,
+            self.bandit_payouts[self.bandit_order],
+            self.bandit_hit_rates[self.bandit_order],
+        )
@@ -0,0 +1,159 @@
+import numpy as np
+from numba import njit
+from myrtle.worlds.physics_world import PhysicsWorld
+from myrtle.worlds.tools.physics import wrap_angle
+
+_default_world_steps_per_loop_step = 100
+
+
+@njit
+def accelerate(state, torque, params, accelerations):
+    gravity = params[0]
+    mass_1 = params[1]
+    mass_2 = params[2]
+    length_1 = params[3]
+    length_2 = params[4]
+    friction = params[5]
+
+    angle_1 = state[0]
+    angle_2 = state[1]
+    angular_velocity_1 = state[2]
+    angular_velocity_2 = state[3]
+    cos_difference = np.cos(angle_1 - angle_2)
+    sin_difference = np.sin(angle_1 - angle_2)
+
+    # Friction acts on the relative rotation at each joint.
+    # The friction at the second joint pushes back on the first arm too.
+    friction_torque_2 = friction * (angular_velocity_2 - angular_velocity_1)
+    generalized_force_1 = (
+        torque
+        - friction * angular_velocity_1
+        + friction_torque_2
+        - mass_2 * length_1 * length_2 * angular_velocity_2**2 * sin_difference
+        - (mass_1 + mass_2) * gravity * length_1 * np.sin(angle_1)
+    )
+    generalized_force_2 = (
+        -friction_torque_2
+        + mass_2 * length_1 * length_2 * angular_velocity_1**2 * sin_difference
+        - mass_2 * gravity * length_2 * np.sin(angle_2)
+    )
+
+    # Solve the 2 x 2 mass matrix equation for the accelerations.
+    m_11 = (mass_1 + mass_2) * length_1**2
+    m_12 = mass_2 * length_1 * length_2 * cos_difference
+    m_22 = mass_2 * length_2**2
+    determinant = m_11 * m_22 - m_12**2
+    accelerations[0] = (
+        m_22 * generalized_force_1 - m_12 * generalized_force_2
+    ) / determinant
+    accelerations[1] = (
+        m_11 * generalized_force_2 - m_12 * generalized_force_1
+    ) / determinant
+
+
+@njit
+def constrain(state, params):
+    state[0] = wrap_angle(state[0])
+    state[1] = wrap_angle(state[1])
+
+
+class DoublePendulum(PhysicsWorld):
+    """
+    Two arms, hinged end to end, with a weight at the end of each.
+    The base of the first arm is hinged to a fixed point and
+    it is the only joint with a motor. The arms start hanging
+    straight down and at rest. Reward comes from keeping the tip elevated.
+    Inverting both arms is optimal.
+
+    The arms are modeled as massless, with all their mass
+    at the ends. The motion is chaotic and the second arm can't be
+    controlled directly, making this a much harder version of `Pendulum`.
+
+    The fast, chaotic motion needs short time steps to simulate accurately,
+    so by default there are 100 world steps for each loop step.
+    Passing `paced_world_steps=False` runs them all in one compiled call.
+
+    State and sensor convention
+        [arm 1 angle, arm 2 angle, arm 1 angular velocity, arm 2 angular velocity]
+
+    Position convention
+        Angles are measured from straight down, for each arm.
+        0 radians is straight down,
+        pi / 2 radians is to the right
+        pi radians is straight up
+
+    Action convention
+        Positive actions are counter-clockwise torque on the first arm.
+        Negative actions are clockwise torque.
+        All torques are in Newton-meters.
+    """
+
+    name = "Double pendulum"
+    accelerate = staticmethod(accelerate)
+    constrain = staticmethod(constrain)
+
+    def __init__(
+        self,
+        n_loop_steps=1000,
+        n_episodes=1,
+        loop_steps_per_second=10,
+        world_steps_per_second=None,
+        speedup=8,
+        verbose=True,
+        **kwargs,
+    ):
+        if world_steps_per_second is None:
+            world_steps_per_second = (
+                loop_steps_per_second * _default_world_steps_per_loop_step
+            )
+        self.init_common(
+            n_loop_steps=n_loop_steps,
+            n_episodes=n_episodes,
+            loop_steps_per_second=loop_steps_per_second,
+            world_steps_per_second=world_steps_per_second,
+            speedup=speedup,
+            verbose=verbose,
+            **kwargs,
+        )
+
+        gravity = 9.8  # meters / second^2
+        mass_1 = 1.0  # kilogram
+        mass_2 = 1.0  # kilogram
+        self.length_1 = 1.0  # meter
+        self.length_2 = 1.0  # meter
+        friction = 0.1  # Newton-meters-seconds / radian
+        self.init_physics(
+            initial_state=[0.0, 0.0, 0.0, 0.0],
+            params=[gravity, mass_1, mass_2, self.length_1, self.length_2, friction],
+            action_scale=20 * np.array([-1.0, -0.5, -0.25, 0.0, 0.25, 0.5, 1.0]),
+            # 12 x 12 x 5 x 5 = 3600 one-hot sensors
+            sensor_bin_edges=[
+                np.linspace(0.0, 2 * np.pi, 13)[1:-1],
+                np.linspace(0.0, 2 * np.pi, 13)[1:-1],
+                np.linspace(-8.0, 8.0, 4),
+                np.linspace(-8.0, 8.0, 4),
+            ],
+        )
+        self.reset()
+
+    def reward(self):
+        # The height of the tip above its lowest point, relative to the
+        # total length of the arms.
+        # It falls in the same [0, 2] range as Pendulum's reward.
+        total_length = self.length_1 + self.length_2
+        height = (
+            total_length
+            - self.length_1 * np.cos(self.state[0])
+            - self.length_2 * np.cos(self.state[1])
+        )
+        return height / total_length
+
+
+class DoublePendulumDiscrete(DoublePendulum):
+    name = "Discrete Valued Double Pendulum"
+    sensor_type = "discrete"
+
+
+class DoublePendulumDiscreteOneHot(DoublePendulum):
+    name = "Discrete Valued, One-Hot Double Pendulum"
+    sensor_type = "one_hot"
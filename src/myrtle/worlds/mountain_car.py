@@ -0,0 +1,120 @@
+import numpy as np
+from numba import njit
+from myrtle.worlds.physics_world import PhysicsWorld
+
+_default_world_steps_per_loop_step = 4
+
+
+@njit
+def accelerate(state, force, params, accelerations):
+    gravity = params[0]
+    accelerations[0] = force - gravity * np.cos(3 * state[0])
+
+
+@njit
+def constrain(state, params):
+    min_position = params[1]
+    max_position = params[2]
+    max_speed = params[3]
+
+    if state[1] > max_speed:
+        state[1] = max_speed
+    elif state[1] < -max_speed:
+        state[1] = -max_speed
+
+    # The car stops dead at either end of the track.
+    if state[0] > max_position:
+        state[0] = max_position
+        state[1] = 0.0
+    elif state[0] < min_position:
+        state[0] = min_position
+        state[1] = 0.0
+
+
+class MountainCar(PhysicsWorld):
+    """
+    An underpowered car in a valley. It can't drive straight up the
+    hill on the right. It has to rock back and forth to build up momentum.
+    The car starts at rest at the bottom of the valley.
+    Reward comes from reaching the top of the hill on the right,
+    and keeps coming as long as the car stays there.
+
+    This is the mountain car of Moore (1990) and Sutton and Barto (2018),
+    with the per-step updates rewritten as accelerations, so that
+    it can be run at any world step rate. One step of the original
+    corresponds to 0.05 seconds. Rather than ending the episode,
+    reaching the goal starts the reward flowing.
+
+    State and sensor convention
+        [position, velocity]
+
+    Position convention
+        The height of the track at position x is sin(3x).
+        Position runs from -1.2 on the left to 0.6 on the right,
+        and the goal is 0.5 or more.
+
+    Action convention
+        Positive actions push to the right, negative to the left.
+    """
+
+    name = "Mountain car"
+    accelerate = staticmethod(accelerate)
+    constrain = staticmethod(constrain)
+
+    def __init__(
+        self,
+        n_loop_steps=1000,
+        n_episodes=1,
+        loop_steps_per_second=20,
+        world_steps_per_second=None,
+        speedup=8,
+        verbose=True,
+        **kwargs,
+    ):
+        if world_steps_per_second is None:
+            world_steps_per_second = (
+                loop_steps_per_second * _default_world_steps_per_loop_step
+            )
+        self.init_common(
+            n_loop_steps=n_loop_steps,
+            n_episodes=n_episodes,
+            loop_steps_per_second=loop_steps_per_second,
+            world_steps_per_second=world_steps_per_second,
+            speedup=speedup,
+            verbose=verbose,
+            **kwargs,
+        )
+
+        # The original's 0.0025 per step squared and 0.001 per step squared
+        # for gravity and the engine, converted to 0.05 second steps.
+        gravity = 1.0
+        self.min_position = -1.2
+        self.max_position = 0.6
+        max_speed = 1.4
+        self.goal_position = 0.5
+        # The valley floor is at -pi / 6.
+        self.init_physics(
+            initial_state=[-np.pi / 6, 0.0],
+            params=[gravity, self.min_position, self.max_position, max_speed],
+            action_scale=0.4 * np.array([-1.0, 0.0, 1.0]),
+            sensor_bin_edges=[
+                np.linspace(self.min_position, self.max_position, 21)[1:-1],
+                np.linspace(-max_speed, max_speed, 21)[1:-1],
+            ],
+        )
+        self.reset()
+
+    def reward(self):
+        if self.state[0] >= self.goal_position:
+            return 1.0
+        return 0.0
+
+
+class MountainCarDiscrete(MountainCar):
+    name = "Discrete Valued Mountain Car"
+    sensor_type = "discrete"
+
+
+class MountainCarDiscreteOneHot(MountainCar):
+    name = "Discrete Valued, One-Hot Mountain Car"
+    sensor_type = "one_hot"
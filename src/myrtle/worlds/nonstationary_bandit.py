@@ -1,8 +1,18 @@
 import numpy as np
 from myrtle.worlds.base_world import BaseWorld
+from myrtle.worlds.tools.bandit_core import BanditCore
 
 
 class NonStationaryBandit(BaseWorld):
+    """
+    A multi-armed bandit whose payouts and hit rates get shuffled
+    a third of the way through the run.
+
+    Setting `n_problems` lays that many independent copies of the bandit
+    side by side. Actions and rewards are concatenated, `n_arms` for each
+    problem.
+    """
+
     name = "Non-stationary bandit"
 
     def __init__(
@@ -10,27 +20,35 @@ class NonStationaryBandit(BaseWorld):
         n_loop_steps=1000,
         n_episodes=1,
         loop_steps_per_second=100,
+        n_problems=1,
+        seed=None,
         **kwargs,
     ):
         self.init_common(
             n_loop_steps=n_loop_steps,
             n_episodes=n_episodes,
             loop_steps_per_second=loop_steps_per_second,
+            seed=seed,
             **kwargs,
         )
-        self.n_sensors = 0
-        self.n_actions = 5
-        self.n_rewards = 5
         self.steps_per_second = 100
 
         self.time_step_switch = int(self.n_loop_steps / 3)
 
         # The highest paying bandit is 2 with average payout of .4 * 280 = 112.
         # Others are 100 or less.
-        self.bandit_payouts_pre = [150, 200, 280, 320, 500]
-        self.bandit_hit_rates_pre = [0.3, 0.3, 0.4, 0.2, 0.1]
-        self.bandit_payouts_post = [320, 500, 150, 200, 280]
-        self.bandit_hit_rates_post = [0.2, 0.1, 0.3, 0.3, 0.4]
+        self.bandit_payouts_pre = np.array([150, 200, 280, 320, 500], dtype=float)
+        self.bandit_hit_rates_pre = np.array([0.3, 0.3, 0.4, 0.2, 0.1])
+        self.bandit_payouts_post = np.array([320, 500, 150, 200, 280], dtype=float)
+        self.bandit_hit_rates_post = np.array([0.2, 0.1, 0.3, 0.3, 0.4])
+
+        self.n_arms = self.bandit_payouts_pre.size
+        self.n_problems = int(n_problems)
+        self.n_sensors = 0
+        self.n_actions = self.n_problems * self.n_arms
+        self.n_rewards = self.n_actions
+
+        self.bandit = BanditCore(seed=self.seed)
 
     def sense(self):
         if self.i_loop_step < self.time_step_switch:
@@ -40,7 +58,8 @@ class NonStationaryBandit(BaseWorld):
             bandit_hit_rates = self.bandit_hit_rates_post
             bandit_payouts = self.bandit_payouts_post
 
-        self.rewards = [0] * self.n_actions
-        for i in range(self.n_actions):
-            if np.random.sample() < bandit_hit_rates[i]:
-                self.rewards[i] = self.actions[i] * bandit_payouts[i]
+        self.rewards = self.bandit.pull(
+            np.reshape(self.actions, (self.n_problems, self.n_arms)),
+            bandit_payouts,
+            bandit_hit_rates,
+        ).ravel()
@@ -1,5 +1,7 @@
 import numpy as np
 from myrtle.worlds.base_world import BaseWorld
+from myrtle.worlds.tools.bandit_core import BanditCore
+from myrtle.worlds.tools.encoders import DiscreteEncoder, UniformBins
 
 
 class OneHotContextualBandit(BaseWorld):
@@ -21,12 +23,14 @@ class OneHotContextualBandit(BaseWorld):
         n_loop_steps=1000,
         n_episodes=1,
         loop_steps_per_second=50,
+        seed=None,
         **kwargs,
     ):
         self.init_common(
             n_loop_steps=n_loop_steps,
             n_episodes=n_episodes,
             loop_steps_per_second=loop_steps_per_second,
+            seed=seed,
             **kwargs,
         )
         self.n_sensors = 16
@@ -35,30 +39,33 @@ class OneHotContextualBandit(BaseWorld):
 
         # The highest paying bandit is 2 with average payout of .4 * 280 = 112.
         # Others are 50 or less.
-        self.bandit_payouts = [150, 200, 280, 320]
-        self.bandit_hit_rates = [0.3, 0.25, 0.4, 0.15]
+        self.bandit_payouts = np.array([150, 200, 280, 320], dtype=float)
+        self.bandit_hit_rates = np.array([0.3, 0.25, 0.4, 0.15])
+
+        self.bandit = BanditCore(seed=self.seed)
+
+        # One one-hot array for each position, showing which bandit is there.
+        self.sensor_encoder = DiscreteEncoder(
+            [UniformBins(0, self.n_actions, self.n_actions)] * self.n_actions
+        )
 
     def reset(self):
         self.bandit_order = np.arange(self.n_actions)
         self.sensors = np.zeros(self.n_sensors)
         self.actions = np.zeros(self.n_actions)
-        self.rewards = [0] * self.n_rewards
+        self.rewards = np.zeros(self.n_rewards)
 
     def sense(self):
         # Shuffle and sense the order of the bandits.
         self.bandit_order = np.arange(self.n_actions)
-        np.random.shuffle(self.bandit_order)
-        self.sensors = np.zeros(self.n_sensors)
-        for i_position, i_bandit in enumerate(self.bandit_order):
-            # Populate the one-hot sensed order
-            self.sensors[i_position * self.n_actions + i_bandit] = 1
+        self.bandit.rng.shuffle(self.bandit_order)
+        # Populate the one-hot sensed order.
+        self.sensors = self.encode_sensors(self.bandit_order)
 
     def step_world(self):
-        # Populate the rewards list.
-        self.rewards = [0] * self.n_actions
-        for i_position, i_bandit in enumerate(self.bandit_order):
-            # For the selected bandits, check whether they pay out
-            if np.random.sample() < self.bandit_hit_rates[i_bandit]:
-                self.rewards[i_position] = (
-                    self.actions[i_position] * self.bandit_payouts[i_bandit]
-                )
+        # For the selected bandits, check whether they pay out.
+        self.rewards = self.bandit.pull(
+            self.actions,
+            self.bandit_payouts[self.bandit_order],
+            self.bandit_hit_rates[self.bandit_order],
+        )
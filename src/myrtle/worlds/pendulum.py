@@ -1,8 +1,9 @@
 import json
 import numpy as np
+from numba import njit
 from myrtle.worlds.base_world import BaseWorld
 from myrtle.config import monitor_host, monitor_port
-from myrtle.worlds.tools.ring_buffer import RingBuffer
+from myrtle.worlds.tools.ring_buffer import RingBuffer, add_impulse, pop
 
 _default_world_steps_per_loop_step = 8
 
@@ -97,8 +98,8 @@ class Pendulum(BaseWorld):
         self.impulse = np.ones(impulse_length)
 
     def reset(self):
-        self.position = 0  # radians
-        self.velocity = 0  # radians per second
+        self.position = 0.0  # radians
+        self.velocity = 0.0  # radians per second
         self.torque_buffer = RingBuffer(self.world_steps_per_loop_step)
 
         self.reset_sensors()
@@ -110,31 +111,33 @@ class Pendulum(BaseWorld):
 
     def sense(self):
         # Calculate the reward based on the position of the pendulum.
-        self.rewards = [1.0 - np.cos(self.position)]
+        self.rewards = np.array([1.0 - np.cos(self.position)])
 
         self.step_sensors()
 
     def step_world(self):
-        # Add any new actions to the torque buffer.
-        torque_magnitude = np.sum(self.actions * self.action_scale)
-        self.torque_buffer.add(torque_magnitude * self.impulse)
-
-        applied_torque = self.torque_buffer.pop()
-
-        # Add in the effect of gravity.
-        moment_arm = np.sin(self.position) * self.length / 2
-        gravity_torque = self.mass * self.gravity * moment_arm
-
-        # Add in the effect of friction at the bearings.
-        friction_torque = self.friction * self.velocity
-        torque = applied_torque + gravity_torque + friction_torque
+        self.step_world_substeps(1)
 
-        # Add the discrete-time approximation of Newtonian mechanics, F = ma
-        self.velocity += torque * self.dt / self.inertia
-        new_position = self.position + self.velocity * self.dt
-
-        # Keep position in the range of [0, 2 pi)
-        self.position = np.mod(new_position, 2 * np.pi)
+    def step_world_substeps(self, n_steps):
+        # The physics all happen in a compiled kernel. Calling it once
+        # for several steps saves the Python overhead of calling it
+        # for each one.
+        torque_magnitude = np.sum(self.actions * self.action_scale)
+        self.position, self.velocity, self.torque_buffer.i = step_pendulum(
+            self.position,
+            self.velocity,
+            self.torque_buffer.x,
+            self.torque_buffer.i,
+            torque_magnitude,
+            self.impulse.size,
+            n_steps,
+            self.dt,
+            self.mass,
+            self.length,
+            self.gravity,
+            self.friction,
+            self.inertia,
+        )
 
     def step_sensors(self):
         self.sensors = np.array([self.position, self.velocity])
@@ -150,3 +153,55 @@ class Pendulum(BaseWorld):
             }
         )
         self.mq.put("pendulum_state", msg)
+
+
+@njit
+def step_pendulum(
+    position,
+    velocity,
+    torque_buffer,
+    i_torque_buffer,
+    torque_magnitude,
+    impulse_length,
+    n_steps,
+    dt,
+    mass,
+    length,
+    gravity,
+    friction,
+    inertia,
+):
+    """
+    Advance the pendulum `n_steps` world steps. The torque command is
+    added to the torque buffer at the first step, just as if the actions
+    had been read at the first step and none after.
+    `torque_buffer` and `i_torque_buffer` are the internals of
+    the torque `RingBuffer`. The buffer gets updated in place.
+
+    Returns the new position, velocity, and torque buffer position.
+    """
+    for i_step in range(n_steps):
+        # Add any new actions to the torque buffer. Actions only arrive once
+        # per call, then the torque buffer spreads them out over the steps.
+        if i_step == 0:
+            add_impulse(
+                torque_buffer, i_torque_buffer, torque_magnitude, impulse_length
+            )
+        applied_torque, i_torque_buffer = pop(torque_buffer, i_torque_buffer)
+
+        # Add in the effect of gravity.
+        moment_arm = np.sin(position) * length / 2
+        gravity_torque = mass * gravity * moment_arm
+
+        # Add in the effect of friction at the bearings.
+        friction_torque = friction * velocity
+        torque = applied_torque + gravity_torque + friction_torque
+
+        # Add the discrete-time approximation of Newtonian mechanics, F = ma
+        velocity += torque * dt / inertia
+        new_position = position + velocity * dt
+
+        # Keep position in the range of [0, 2 pi)
+        position = np.mod(new_position, 2 * np.pi)
+
+    return position, velocity, i_torque_buffer
@@ -1,5 +1,6 @@
 import numpy as np
 from myrtle.worlds.pendulum import Pendulum
+from myrtle.worlds.tools.encoders import BinEdges, DiscreteEncoder, UniformBins
 
 
 class PendulumDiscrete(Pendulum):
@@ -7,33 +8,18 @@ class PendulumDiscrete(Pendulum):
 
     def reset_sensors(self):
         self.n_positions = 36
-        positions = np.zeros(self.n_positions)
-
         self.velocity_bins = np.linspace(-15.0, 15.0, 61)
         self.n_velocities = self.velocity_bins.size + 1
-        velocities = np.zeros(self.n_velocities)
 
-        self.n_sensors = self.n_positions + self.n_velocities
-        self.sensors = np.concatenate((positions, velocities))
+        self.sensor_encoder = DiscreteEncoder(
+            [
+                UniformBins(0.0, 2 * np.pi, self.n_positions),
+                BinEdges(self.velocity_bins),
+            ]
+        )
+        self.n_sensors = self.sensor_encoder.n_outputs
+        self.sensors = np.zeros(self.n_sensors)
 
     def step_sensors(self):
-        epsilon = 1e-4
-        positions = np.zeros(self.n_positions)
-        # Find the discrete position bin.
-        # Add a small epsilon to account for weird numerical case where
-        # self.position is elmost exactly 2 pi.
-        i_position = int(self.n_positions * self.position / (2 * np.pi + epsilon))
-        if i_position == self.n_positions:
-            i_position = 0
-            print(f"position is too big {self.position}")
-        positions[i_position] = 1
-
-        velocities = np.zeros(self.n_velocities)
-        try:
-            i_velocity = 1 + np.where(self.velocity > self.velocity_bins)[0][-1]
-        except IndexError:
-            i_velocity = 0
-        velocities[i_velocity] = 1
-
-        self.sensors = np.concatenate((positions, velocities))
+        self.sensors = self.encode_sensors((self.position, self.velocity))
         self.write_pendulum_state()
@@ -1,5 +1,6 @@
 import numpy as np
 from myrtle.worlds.pendulum import Pendulum
+from myrtle.worlds.tools.encoders import BinEdges, ProductOneHotEncoder, UniformBins
 
 
 class PendulumDiscreteOneHot(Pendulum):
@@ -15,25 +16,20 @@ class PendulumDiscreteOneHot(Pendulum):
 
     def reset_sensors(self):
         self.n_positions = 36
-
         self.velocity_bins = np.linspace(-15.0, 15.0, 61)
         self.n_velocities = self.velocity_bins.size + 1
 
-        self.n_sensors = self.n_positions * self.n_velocities
+        # The state index is a combination of the position index
+        # and the velocity index.
+        self.sensor_encoder = ProductOneHotEncoder(
+            [
+                UniformBins(0.0, 2 * np.pi, self.n_positions),
+                BinEdges(self.velocity_bins),
+            ]
+        )
+        self.n_sensors = self.sensor_encoder.n_outputs
         self.sensors = np.zeros(self.n_sensors)
 
     def step_sensors(self):
-        self.sensors = np.zeros(self.n_sensors)
-
-        i_position = int(self.n_positions * self.position / (2 * np.pi))
-
-        try:
-            i_velocity = 1 + np.where(self.velocity > self.velocity_bins)[0][-1]
-        except IndexError:
-            i_velocity = 0
-
-        # The state index is a combination of the position index
-        # and the velocity index.
-        i_state = i_position * self.n_velocities + i_velocity
-        self.sensors[i_state] = 1
+        self.sensors = self.encode_sensors((self.position, self.velocity))
         self.write_pendulum_state()
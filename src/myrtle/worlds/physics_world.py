@@ -0,0 +1,119 @@
+import numpy as np
+from myrtle.worlds.base_world import BaseWorld
+from myrtle.worlds.tools.encoders import (
+    BinEdges,
+    DiscreteEncoder,
+    ProductOneHotEncoder,
+)
+from myrtle.worlds.tools.physics import integrate
+from myrtle.worlds.tools.ring_buffer import RingBuffer
+
+
+class PhysicsWorld(BaseWorld):
+    """
+    Extend this class to make a world out of a simulated mechanical system
+    with a single actuator, the way `Pendulum` is.
+
+    A world built on it provides compiled `accelerate()` and `constrain()`
+    functions, as described in `myrtle.worlds.tools.physics.integrate()`.
+    It also provides the initial state, an array of system parameters,
+    and the actions' scaling. The world's `__init__()` sets these
+    and then calls `init_physics()` and `reset()`.
+
+    Each action contributes its `action_scale` to the actuator command,
+    which goes through a delay line before taking effect, as in `Pendulum`.
+
+    There are three flavors of sensors, chosen by `sensor_type`,
+    matching the Pendulum family.
+        "continuous": the state variables, as is
+        "discrete": each state variable binned and one-hot encoded,
+            all concatenated together
+        "one_hot": a single one-hot array with an element for every
+            combination of state variable bins
+
+    The bins for each state variable are given by `sensor_bin_edges`,
+    a list with an array of edges for each. Sensor values in between
+    edges i - 1 and i fall in bin i. There is one more bin than there
+    are edges.
+    """
+
+    name = "Physics world"
+    sensor_type = "continuous"
+
+    # Compiled functions describing the system, filled in by each world.
+    # They are wrapped in staticmethod() so they don't get bound to the instance.
+    accelerate = None
+    constrain = None
+
+    def init_physics(self, initial_state, params, action_scale, sensor_bin_edges):
+        self.initial_state = np.array(initial_state, dtype=float)
+        self.params = np.array(params, dtype=float)
+        self.action_scale = np.array(action_scale, dtype=float)
+        self.sensor_bin_edges = [
+            np.array(bin_edges, dtype=float) for bin_edges in sensor_bin_edges
+        ]
+        self.n_bins = np.array([edges.size + 1 for edges in self.sensor_bin_edges])
+
+        self.n_actions = self.action_scale.size
+        self.n_rewards = 1
+
+        self.dt = 1.0 / self.world_steps_per_second
+        self.impulse_length = self.world_steps_per_loop_step
+
+    def reset(self):
+        self.state = self.initial_state.copy()
+        self.accelerations = np.zeros(self.state.size // 2)
+        self.delay_line = RingBuffer(self.world_steps_per_loop_step)
+        self.actions = np.zeros(self.n_actions)
+
+        self.reset_sensors()
+
+    def reset_sensors(self):
+        bins = [BinEdges(bin_edges) for bin_edges in self.sensor_bin_edges]
+        if self.sensor_type == "continuous":
+            self.sensor_encoder = None
+            self.n_sensors = self.state.size
+        elif self.sensor_type == "discrete":
+            self.sensor_encoder = DiscreteEncoder(bins)
+            self.n_sensors = self.sensor_encoder.n_outputs
+        elif self.sensor_type == "one_hot":
+            self.sensor_encoder = ProductOneHotEncoder(bins)
+            self.n_sensors = self.sensor_encoder.n_outputs
+        else:
+            raise ValueError(f"Unknown sensor_type {self.sensor_type}")
+        self.sensors = np.zeros(self.n_sensors)
+
+    def step_world(self):
+        self.step_world_substeps(1)
+
+    def step_world_substeps(self, n_steps):
+        command = np.sum(self.actions * self.action_scale)
+        self.delay_line.i = integrate(
+            self.state,
+            self.accelerations,
+            self.accelerate,
+            self.constrain,
+            self.params,
+            self.delay_line.x,
+            self.delay_line.i,
+            command,
+            self.impulse_length,
+            n_steps,
+            self.dt,
+        )
+
+    def sense(self):
+        self.rewards = np.array([self.reward()])
+        self.step_sensors()
+
+    def reward(self):
+        """
+        Override this with the reward for the current state.
+        """
+        return 0.0
+
+    def step_sensors(self):
+        if self.sensor_encoder is None:
+            self.sensors = self.state.copy()
+        else:
+            self.sensors = self.encode_sensors(self.state)
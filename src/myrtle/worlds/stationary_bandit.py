@@ -1,8 +1,17 @@
 import numpy as np
 from myrtle.worlds.base_world import BaseWorld
+from myrtle.worlds.tools.bandit_core import BanditCore
 
 
 class StationaryBandit(BaseWorld):
+    """
+    A multi-armed bandit with fixed payouts and hit rates.
+
+    Setting `n_problems` lays that many independent copies of the bandit
+    side by side. Actions and rewards are concatenated, `n_arms` for each
+    problem.
+    """
+
     name = "Stationary bandit"
 
     def __init__(
@@ -10,25 +19,33 @@ class StationaryBandit(BaseWorld):
         n_loop_steps=1000,
         n_episodes=1,
         loop_steps_per_second=100,
+        n_problems=1,
+        seed=None,
         **kwargs,
     ):
         self.init_common(
             n_loop_steps=n_loop_steps,
             n_episodes=n_episodes,
             loop_steps_per_second=loop_steps_per_second,
+            seed=seed,
             **kwargs,
         )
-        self.n_sensors = 0
-        self.n_actions = 5
-        self.n_rewards = 5
-
         # The highest paying bandit is 2 with average payout of .4 * 280 = 112.
         # Others are 100 or less.
-        self.bandit_payouts = [150, 200, 280, 320, 500]
-        self.bandit_hit_rates = [0.6, 0.5, 0.4, 0.3, 0.2]
+        self.bandit_payouts = np.array([150, 200, 280, 320, 500], dtype=float)
+        self.bandit_hit_rates = np.array([0.6, 0.5, 0.4, 0.3, 0.2])
+
+        self.n_arms = self.bandit_payouts.size
+        self.n_problems = int(n_problems)
+        self.n_sensors = 0
+        self.n_actions = self.n_problems * self.n_arms
+        self.n_rewards = self.n_actions
+
+        self.bandit = BanditCore(seed=self.seed)
 
     def sense(self):
-        self.rewards = [0] * self.n_actions
-        for i in range(self.n_actions):
-            if np.random.sample() < self.bandit_hit_rates[i]:
-                self.rewards[i] = self.actions[i] * self.bandit_payouts[i]
+        self.rewards = self.bandit.pull(
+            np.reshape(self.actions, (self.n_problems, self.n_arms)),
+            self.bandit_payouts,
+            self.bandit_hit_rates,
+        ).ravel()
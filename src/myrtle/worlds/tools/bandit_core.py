@@ -0,0 +1,74 @@
+import numpy as np
+
+_default_block_size = 2**16
+
+
+class BanditCore:
+    """
+    The reward engine shared by the bandit worlds.
+
+    Every arm gets a fresh uniform random number on every pull, whether or
+    not it was selected. Rather than ask the random number generator for
+    these one at a time, they are drawn in big blocks of `block_size`
+    and handed out in slices. With the randoms in hand, all the payouts are
+    computed in a single array expression, so thousands of arms
+    cost about the same as a handful.
+
+    `actions` can be one-dimensional, a single bandit problem, or
+    two-dimensional, (n_problems, n_arms), for simulating many
+    independent bandit problems at once. Payouts and hit rates broadcast
+    against the actions, so they can be shared by all the problems,
+    shape (n_arms,), or given separately for each, shape (n_problems, n_arms).
+
+    If no `seed` is given, one is drawn from NumPy's global random state,
+    so that `np.random.seed()` still makes runs repeatable.
+    """
+
+    def __init__(self, seed=None, block_size=_default_block_size):
+        if seed is None:
+            seed = np.random.randint(2**31)
+        self.rng = np.random.default_rng(seed)
+        self.block_size = int(block_size)
+        self.block = np.zeros(self.block_size)
+        # Start out with an empty block, so that the first draw fills it.
+        self.i_block = self.block_size
+
+    def uniforms(self, shape):
+        """
+        Get an array of uniform random numbers in [0, 1).
+
+        The result may be a view into the block, good until the next call.
+        Use it right away or copy it.
+        """
+        n = int(np.prod(shape))
+        if n > self.block_size:
+            return self.rng.random(shape)
+        if self.i_block + n > self.block_size:
+            self.rng.random(out=self.block)
+            self.i_block = 0
+        values = self.block[self.i_block : self.i_block + n].reshape(shape)
+        self.i_block += n
+        return values
+
+    def pull(self, actions, payouts, hit_rates, intermittency=0.0):
+        """
+        Parameters
+        ----------
+        actions: array of floats
+            Of shape (n_arms,) or (n_problems, n_arms).
+        payouts, hit_rates: arrays of floats
+            Anything that broadcasts against `actions`.
+        intermittency: float
+            The chance that any one reward goes missing (NaN).
+
+        Returns
+        -------
+        rewards: array of floats
+            The same shape as `actions`. A new array each time.
+        """
+        actions = np.asarray(actions, dtype=float)
+        hits = self.uniforms(actions.shape) < hit_rates
+        rewards = np.where(hits, actions * payouts, 0.0)
+        if intermittency > 0:
+            rewards[self.uniforms(actions.shape) < intermittency] = np.nan
+        return rewards
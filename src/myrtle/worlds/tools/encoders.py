@@ -0,0 +1,121 @@
+from bisect import bisect_left
+import numpy as np
+
+
+class UniformBins:
+    """
+    `n_bins` bins of equal width spanning from `low` to `high`.
+    Values below `low` land in the first bin and values at or above `high`
+    land in the last.
+    """
+
+    def __init__(self, low, high, n_bins):
+        self.low = float(low)
+        self.n_bins = int(n_bins)
+        self.scale = self.n_bins / (float(high) - self.low)
+
+    def bin(self, value):
+        i_bin = int((value - self.low) * self.scale)
+        if i_bin < 0:
+            return 0
+        if i_bin >= self.n_bins:
+            return self.n_bins - 1
+        return i_bin
+
+
+class BinEdges:
+    """
+    Bins divided by explicit edges, which must be sorted.
+    Values in between edges i - 1 and i fall in bin i,
+    so there is one more bin than there are edges.
+    A value that lands right on an edge falls in the lower bin,
+    the same as with `np.searchsorted()`.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.array(edges, dtype=float)
+        self.n_bins = self.edges.size + 1
+        # Binary search on a list is much quicker than np.searchsorted()
+        # for one value at a time.
+        self.edge_list = self.edges.tolist()
+
+    def bin(self, value):
+        return bisect_left(self.edge_list, value)
+
+
+class DiscreteEncoder:
+    """
+    Bin each of several values and one-hot encode it, then concatenate
+    the one-hot arrays, as in the discrete worlds like `PendulumDiscrete`.
+    There is one active element per value.
+
+    `bins` is a list with a `UniformBins` or `BinEdges` for each value.
+
+    `encode()` writes into a buffer that is allocated once and reused.
+    Only the elements that were active last time get cleared.
+    The buffer gets overwritten on the next call, so make a copy of it
+    before handing it to anything that might hold on to it.
+
+    `active()` returns just the indices of the active elements,
+    also in a reused buffer.
+    """
+
+    def __init__(self, bins):
+        self.bins = list(bins)
+        self.n_bins = np.array([value_bins.n_bins for value_bins in self.bins])
+        self.n_outputs = int(np.sum(self.n_bins))
+
+        # Each value's one-hot array starts after all the ones before it.
+        self.offsets = (np.cumsum(self.n_bins) - self.n_bins).tolist()
+
+        self.i_active = np.zeros(len(self.bins), dtype=int)
+        self.out = np.zeros(self.n_outputs)
+        # The elements of out that are currently set.
+        self.i_out = []
+
+    def find_active(self, values):
+        return [
+            offset + value_bins.bin(value)
+            for offset, value_bins, value in zip(self.offsets, self.bins, values)
+        ]
+
+    def active(self, values):
+        self.i_active[:] = self.find_active(values)
+        return self.i_active
+
+    def encode(self, values):
+        for i in self.i_out:
+            self.out[i] = 0.0
+        self.i_out = self.find_active(values)
+        for i in self.i_out:
+            self.out[i] = 1.0
+        return self.out
+
+
+class ProductOneHotEncoder(DiscreteEncoder):
+    """
+    Bin each of several values and combine the bins into a single
+    one-hot array, with one element for every combination of bins,
+    as in the one-hot worlds like `PendulumDiscreteOneHot`.
+    There is exactly one active element.
+
+    The index of the active element is the same as from
+    `np.ravel_multi_index(bin_indices, n_bins)`, so the first value's bin
+    changes the slowest and the last value's bin changes the fastest.
+    """
+
+    def __init__(self, bins):
+        super().__init__(bins)
+        self.n_outputs = int(np.prod(self.n_bins))
+
+        # How far apart neighboring bins of each value are in the output.
+        self.strides = np.cumprod(np.append(self.n_bins[1:], 1)[::-1])[::-1].tolist()
+
+        self.i_active = np.zeros(1, dtype=int)
+        self.out = np.zeros(self.n_outputs)
+
+    def find_active(self, values):
+        i_state = 0
+        for stride, value_bins, value in zip(self.strides, self.bins, values):
+            i_state += stride * value_bins.bin(value)
+        return [i_state]
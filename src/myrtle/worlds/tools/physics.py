@@ -0,0 +1,66 @@
+import numpy as np
+from numba import njit
+from myrtle.worlds.tools.ring_buffer import add_impulse, pop
+
+
+@njit
+def integrate(
+    state,
+    accelerations,
+    accelerate,
+    constrain,
+    params,
+    delay_line,
+    i_delay_line,
+    command,
+    impulse_length,
+    n_steps,
+    dt,
+):
+    """
+    Advance a mechanical system `n_steps` fixed time steps of `dt` seconds.
+
+    `state` holds all the positions followed by all the velocities, so it is
+    twice the size of `accelerations`. Both get updated in place.
+
+    `accelerate(state, actuation, params, accelerations)` and
+    `constrain(state, params)` are compiled functions that describe a
+    particular system. `accelerate()` fills in the accelerations for the
+    current state and actuation. `constrain()` takes care of anything
+    the equations of motion don't, like angles wrapping around
+    or running into a wall.
+
+    The actuator command passes through a delay line before being applied.
+    `delay_line` and `i_delay_line` are the internals of a `RingBuffer`.
+    The command is added at the first step and spread over the next
+    `impulse_length` steps, just as in `Pendulum`.
+
+    The integration is semi-implicit Euler: velocities get updated first,
+    then positions get updated using the new velocities. It is as cheap as
+    plain Euler, but much better behaved for oscillating systems.
+
+    Returns the new position in the delay line.
+    """
+    n_coords = accelerations.size
+    for i_step in range(n_steps):
+        # New commands only arrive once per call.
+        if i_step == 0:
+            add_impulse(delay_line, i_delay_line, command, impulse_length)
+        actuation, i_delay_line = pop(delay_line, i_delay_line)
+
+        accelerate(state, actuation, params, accelerations)
+        for i in range(n_coords):
+            state[n_coords + i] += accelerations[i] * dt
+            state[i] += state[n_coords + i] * dt
+
+        constrain(state, params)
+
+    return i_delay_line
+
+
+@njit
+def wrap_angle(angle):
+    """
+    Keep an angle in the range of [0, 2 pi)
+    """
+    return np.mod(angle, 2 * np.pi)
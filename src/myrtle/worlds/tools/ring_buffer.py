@@ -1,4 +1,5 @@
 import numpy as np
+from numba import njit
 
 
 class RingBuffer:
@@ -32,3 +33,77 @@ class RingBuffer:
         else:
             # If no wrapping is necessary
             self.x[self.i : self.i + m] += arr
+
+
+class BatchedRingBuffer:
+    """
+    A stack of ring buffers, one per row, that all advance together.
+    `pop()` returns one value per row and `add()` takes
+    an array with one row per buffer.
+    """
+
+    def __init__(self, n_rows, size):
+        self.n = size
+        self.x = np.zeros((n_rows, self.n), dtype=float)
+        self.i = 0
+
+    def pop(self):
+        val = self.x[:, self.i].copy()
+        self.x[:, self.i] = 0.0
+        self.i += 1
+        if self.i >= self.n:
+            self.i = 0
+        return val
+
+    def add(self, arr):
+        m = arr.shape[1]
+        if m > self.n:
+            raise IndexError(
+                f"Trying to add an array of {m} columns"
+                + f" to a ring buffer of size {self.n}."
+            )
+        n_left = self.n - self.i
+        if m > n_left:
+            # If wrapping is necessary
+            self.x[:, self.i :] += arr[:, :n_left]
+            n_wrap = m - n_left
+            self.x[:, :n_wrap] = arr[:, n_left:]
+
+        else:
+            # If no wrapping is necessary
+            self.x[:, self.i : self.i + m] += arr
+
+
+@njit
+def add_impulse(x, i, magnitude, impulse_length):
+    """
+    A compiled `RingBuffer.add()` for the common case of adding a constant
+    `magnitude` over the next `impulse_length` elements. `x` and `i` are
+    the ring buffer's array and current position, so that compiled world
+    kernels can work on a `RingBuffer`'s internals directly.
+    """
+    n = x.size
+    n_left = n - i
+    if impulse_length > n_left:
+        # If wrapping is necessary
+        for j in range(i, n):
+            x[j] += magnitude
+        for j in range(impulse_length - n_left):
+            x[j] = magnitude
+    else:
+        # If no wrapping is necessary
+        for j in range(i, i + impulse_length):
+            x[j] += magnitude
+
+
+@njit
+def pop(x, i):
+    """
+    A compiled `RingBuffer.pop()`. Returns the value and the new position.
+    """
+    val = x[i]
+    x[i] = 0.0
+    i += 1
+    if i >= x.size:
+        i = 0
+    return val, i